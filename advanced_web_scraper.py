@@ -3,13 +3,10 @@ import re
 import time
 import json
 from urllib.parse import urlparse
-from playwright.sync_api import sync_playwright
-import google.generativeai as genai
-from keys import GEMINI_KEY
-
-# Configure Gemini
-genai.configure(api_key=GEMINI_KEY)
-model = genai.GenerativeModel("gemini-2.0-flash-exp")
+import llm_router
+import tracing
+import cassette
+import document_extractor
 
 def extract_urls_from_files(articles_dir="clean_articles"):
     """Extract all URLs from article files with metadata"""
@@ -61,8 +58,15 @@ def extract_urls_from_files(articles_dir="clean_articles"):
     
     return urls_data
 
-def scrape_website_content(url, timeout=30000):
-    """Scrape content from a single website"""
+@tracing.traced("scrape.url")
+def scrape_website_content(url, timeout=30000, query=None):
+    """Scrape content from a single website; PDFs and other documents skip the browser"""
+    tracing.current_span().set("url", url)
+    document = document_extractor.extract_document(url, query)
+    if document is not None:
+        return document
+
+    from playwright.sync_api import sync_playwright
     
     try:
         with sync_playwright() as p:
@@ -83,8 +87,7 @@ def scrape_website_content(url, timeout=30000):
             })
             
             # Navigate to page
-            page.goto(url, wait_until="networkidle", timeout=timeout)
-            page.wait_for_timeout(3000)
+            cassette.goto(page, url, wait_ms=3000, wait_until="networkidle", timeout=timeout)
             
             # Get basic page info
             title = page.title()
@@ -192,6 +195,7 @@ def scrape_website_content(url, timeout=30000):
                     cleaned_lines.append(line)
             
             content = '\n'.join(cleaned_lines)
+            tracing.current_span().set("bytes", len(content))
             
             return {
                 'url': url,
@@ -203,6 +207,7 @@ def scrape_website_content(url, timeout=30000):
             }
             
     except Exception as e:
+        tracing.current_span().set("status", "failed")
         return {
             'url': url,
             'title': '',
@@ -240,7 +245,7 @@ Please provide a detailed, well-structured summary:
 """
     
     try:
-        response = model.generate_content(prompt)
+        response = llm_router.generate_content("page_summary", prompt)
         return response.text.strip()
     except Exception as e:
         print(f"  Error creating summary with Gemini: {e}")
@@ -347,7 +352,7 @@ def process_all_urls(articles_dir="clean_articles", output_dir="web_content"):
             print(f"  Query: {url_data['search_query']}")
             
             # Scrape content
-            web_content = scrape_website_content(url_data['url'])
+            web_content = scrape_website_content(url_data['url'], query=url_data['search_query'])
             
             if web_content['status'] == 'success':
                 print(f"  ✓ Scraped {web_content['content_length']} characters")
@@ -375,7 +380,7 @@ def process_all_urls(articles_dir="clean_articles", output_dir="web_content"):
             total_processed += 1
             
             # Be respectful to servers
-            time.sleep(2)
+            cassette.sleep(2)
     
     print(f"\n" + "=" * 80)
     print(f"PROCESSING COMPLETED")
@@ -384,6 +389,8 @@ def process_all_urls(articles_dir="clean_articles", output_dir="web_content"):
     print(f"Failed: {total_processed - total_successful}")
     print(f"Output directory: {output_dir}")
     print("=" * 80)
+    llm_router.print_usage_report()
+    tracing.flush()
 
 def main():
     """Main function"""
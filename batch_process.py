@@ -1,4 +1,6 @@
-import pandas as pd
+import re
+import tracing
+import priority_scheduler
 from main_serp import generate_queries, search_and_save
 
 SERPAPI_API_KEY = "YOUR_SERPAPI_KEY"
@@ -20,9 +22,28 @@ QUERY_KEYS = [
 
 KEY_TO_INDEX = {k: i for i, k in enumerate(QUERY_KEYS)}
 
-def process_csv(filepath, selected_keys, years_ahead=5):
-    df = pd.read_csv(filepath)
-    for idx, row in df.iterrows():
+@tracing.traced("borrower")
+def search_borrower(borrower_info, selected_keys, years_ahead=5):
+    """Run the selected queries for one borrower and save the articles"""
+    tracing.current_span().set("borrower_id", str(borrower_info["borrower_id"]))
+    queries = generate_queries(
+        borrower_info["job_title"],
+        borrower_info["company"],
+        borrower_info["industry"],
+        years_ahead
+    )
+
+    saved_files = []
+    for key in selected_keys:
+        attribute_key = re.sub(r"[^a-z0-9]+", "_", key.lower()).strip("_")
+        saved_files.extend(search_and_save(queries[KEY_TO_INDEX[key]], borrower_info["borrower_id"],
+                                           SERPAPI_API_KEY, attribute_key))
+    return saved_files
+
+def process_csv(filepath, selected_keys, years_ahead=5, progress=None):
+    """Search every borrower in the file, highest exposure first; `progress(done, message=...)` is called after each one"""
+    results = []
+    for row in priority_scheduler.iter_prioritized(filepath):
         borrower_info = {
             "borrower_id": str(row["borrower_id"]),
             "job_title": row["job_title"],
@@ -30,17 +51,19 @@ def process_csv(filepath, selected_keys, years_ahead=5):
             "industry": row["industry"]
         }
 
-        queries = generate_queries(
-            borrower_info["job_title"],
-            borrower_info["company"],
-            borrower_info["industry"],
-            years_ahead
-        )
-        selected_queries = [queries[KEY_TO_INDEX[key]] for key in selected_keys]
-
-        for query in selected_queries:
-            saved_files = search_and_save(query, borrower_info["borrower_id"], SERPAPI_API_KEY)
-            print(f"Borrower {borrower_info['borrower_id']} - Saved {len(saved_files)} articles.")
+        saved_files = search_borrower(borrower_info, selected_keys, years_ahead)
+        results.append({"borrower_id": borrower_info["borrower_id"], "saved_files": saved_files})
+
+        message = f"Borrower {borrower_info['borrower_id']} - Saved {len(saved_files)} articles."
+        print(message)
+        if progress:
+            progress(len(results), message=message)
+    return results
+
+def run_search_job(payload, progress):
+    """job_queue handler for the "borrower_search" job kind"""
+    results = process_csv(payload["csv_path"], payload["selected_keys"], payload.get("years_ahead", 5), progress)
+    return {"borrowers": len(results), "results": results}
 
 if __name__ == "__main__":
     # Example usage
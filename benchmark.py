@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import types
+import zlib
+import shutil
+import argparse
+import tempfile
+import threading
+import functools
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures")
+
+# Per-call latencies recorded while loan_repay_predictor.run_pipeline runs: a whole borrower,
+# one fused search, query pruning, summary + extraction, a chunk's scoring and its write
+STAGES = ["borrower", "search", "prune", "analyze", "score", "write"]
+
+# Real sleep, kept for the simulated network latency while the pipeline's politeness pauses are disabled
+_sleep = time.sleep
+
+# ---------------- Fixtures ----------------
+
+class FakeResponse:
+    """Just enough of requests.Response / a Gemini response for the pipeline code"""
+    def __init__(self, text="", data=None, status_code=200, usage=None):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+        self._data = data
+        self.usage_metadata = usage
+
+    def json(self):
+        return self._data if self._data is not None else json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} from fixture")
+
+class FakeSerpAPI:
+    """Replays recorded SerpAPI responses, with result links pointing at the static page server"""
+    def __init__(self, serp_dir, page_server, latency_ms=0):
+        self.responses = []
+        for name in sorted(os.listdir(serp_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(serp_dir, name), "r", encoding="utf-8") as f:
+                    self.responses.append(f.read().replace("{page_server}", page_server))
+        if not self.responses:
+            raise FileNotFoundError(f"No recorded SerpAPI responses in {serp_dir}")
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    def search(self, params):
+        # The same query always replays the same recording
+        self.calls += 1
+        if self.latency:
+            _sleep(self.latency)
+        query = (params or {}).get("q", "")
+        return FakeResponse(self.responses[zlib.crc32(query.encode("utf-8")) % len(self.responses)])
+
+class FakeGemini:
+    """Replays recorded LLM responses, picked by a phrase of the prompt"""
+    def __init__(self, responses_path, latency_ms=0):
+        with open(responses_path, "r", encoding="utf-8") as f:
+            self.responses = json.load(f)
+        self.latency = latency_ms / 1000
+
+    def model(self, model_name):
+        return types.SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, prompt):
+        if self.latency:
+            _sleep(self.latency)
+        text = next((r["text"] for r in self.responses if r["match"].lower() in prompt.lower()), "")
+        usage = types.SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        return FakeResponse(text, usage=usage)
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def static_page_server(pages_dir):
+    """Serve the recorded HTML pages on a local port; yields the base URL"""
+    handler = functools.partial(_QuietHandler, directory=pages_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@contextmanager
+def _patched(obj, name, value):
+    original = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, original)
+
+@contextmanager
+def offline_fixtures(fixtures_dir=FIXTURES_DIR, serp_latency_ms=0, llm_latency_ms=0):
+    """Route SerpAPI, page fetches and Gemini calls to local fixtures for the duration of the block"""
+    import requests
+    import llm_router
+
+    # keys.py holds real credentials and isn't needed offline
+    if "keys" not in sys.modules:
+        try:
+            import keys  # noqa: F401
+        except ImportError:
+            sys.modules["keys"] = types.SimpleNamespace(SERP_KEY="offline", GEMINI_KEY="offline")
+
+    with static_page_server(os.path.join(fixtures_dir, "pages")) as page_server:
+        serp = FakeSerpAPI(os.path.join(fixtures_dir, "serp"), page_server, serp_latency_ms)
+        gemini = FakeGemini(os.path.join(fixtures_dir, "llm_responses.json"), llm_latency_ms)
+        real_get = requests.get
+
+        def fake_get(url, params=None, **kwargs):
+            if url.startswith("https://serpapi.com"):
+                return serp.search(params)
+            if not url.startswith(page_server):
+                raise requests.exceptions.ConnectionError(f"Offline benchmark: no fixture for {url}")
+            return real_get(url, params=params, **kwargs)
+
+        with _patched(requests, "get", fake_get), \
+             _patched(llm_router, "_get_model", gemini.model), \
+             _patched(time, "sleep", lambda seconds: None):
+            yield page_server
+
+# ---------------- Pipeline ----------------
+
+def _peak_memory_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def make_portfolio(n_borrowers, seed=42):
+    """Synthetic borrowers for a benchmark run, without the attributes the pipeline looks up"""
+    from collect_data import generate_records
+    from risk_attributes import RISK_ATTRIBUTES
+    borrowers = generate_records(1, n_borrowers, seed)
+    return borrowers.drop(columns=RISK_ATTRIBUTES + ["college_education_cost", "loan_repayment_likelihood"])
+
+def _timed(timings, stage, func):
+    """`func`, recording each call's latency under `stage`"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage].append(time.perf_counter() - start)
+    return wrapper
+
+def _load_pruning_model(model_path):
+    if model_path and os.path.exists(model_path):
+        from compile_model import load_fast_predictor
+        return load_fast_predictor(model_path)
+    return None
+
+@contextmanager
+def timed_pipeline(timings, model_path=None):
+    """Time the stages of run_pipeline, with query pruning using `model_path` (off without one)"""
+    import borrower_io
+    import risk_scoring
+    import query_pruning
+    import loan_repay_predictor as predictor
+
+    model = _load_pruning_model(model_path)
+    with _patched(predictor, "analyze_borrower", _timed(timings, "borrower", predictor.analyze_borrower)), \
+         _patched(predictor, "search_web", _timed(timings, "search", predictor.search_web)), \
+         _patched(predictor, "summarize_external_signals",
+                  _timed(timings, "analyze", predictor.summarize_external_signals)), \
+         _patched(predictor, "extract_features_from_summary",
+                  _timed(timings, "analyze", predictor.extract_features_from_summary)), \
+         _patched(query_pruning, "load_model", lambda model_path=None: model), \
+         _patched(query_pruning, "prune_queries", _timed(timings, "prune", query_pruning.prune_queries)), \
+         _patched(risk_scoring, "score_rules", _timed(timings, "score", risk_scoring.score_rules)), \
+         _patched(borrower_io.TableWriter, "write", _timed(timings, "write", borrower_io.TableWriter.write)):
+        yield
+
+def run_benchmark(n_borrowers, fixtures_dir=FIXTURES_DIR, serp_latency_ms=0, llm_latency_ms=0, quiet=True,
+                  model_path=None, incremental=False, table_format="csv"):
+    """Run loan_repay_predictor.run_pipeline offline on a synthetic portfolio file
+
+    Searches go through search_fusion to the recorded SerpAPI backend. Borrowers are
+    ordered by the priority scheduler, pruned with the model at `model_path` if given,
+    and written with TableWriter as `table_format`. With `incremental`, a first run fills
+    the incremental state and the second, timed run reuses it.
+    Returns throughput, per-stage latency, LLM calls and memory.
+    """
+    import io
+    import contextlib
+    import llm_router
+    import borrower_io
+    import search_fusion
+    import loan_repay_predictor
+
+    timings = {stage: [] for stage in STAGES}
+    work_dir = tempfile.mkdtemp(prefix="loan_bench_")
+    model_path = os.path.abspath(model_path) if model_path else None
+    cwd = os.getcwd()
+
+    try:
+        # run_pipeline reads and writes its state, signal table and articles/ in the working directory
+        os.chdir(work_dir)
+        os.makedirs("articles")
+        input_path, output_path = f"borrowers.{table_format}", f"results.{table_format}"
+        borrower_io.write_table(make_portfolio(n_borrowers), input_path)
+
+        with offline_fixtures(fixtures_dir, serp_latency_ms, llm_latency_ms), \
+             _patched(search_fusion, "DEFAULT_BACKENDS", ["serpapi"]):
+            # The pipeline prints a lot per query; keep the benchmark output readable
+            output = io.StringIO() if quiet else sys.stdout
+            with contextlib.redirect_stdout(output):
+                if incremental:
+                    with timed_pipeline({stage: [] for stage in STAGES}, model_path):
+                        loan_repay_predictor.run_pipeline(input_path, output_path, incremental_mode=True)
+                llm_router.reset_usage()
+                start = time.perf_counter()
+                with timed_pipeline(timings, model_path):
+                    loan_repay_predictor.run_pipeline(input_path, output_path, incremental_mode=incremental)
+                elapsed = time.perf_counter() - start
+
+        results = borrower_io.read_table(output_path)
+        scored = int((results['risk_score'].notna() | results['decided_class'].notna()).sum())
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "borrowers": n_borrowers,
+        "seconds": elapsed,
+        "borrowers_per_second": n_borrowers / elapsed if elapsed else 0.0,
+        "stages": {stage: latency_summary(values) for stage, values in timings.items() if values},
+        "llm_calls": {row["task"]: row["calls"] for row in llm_router.get_usage_report()},
+        "peak_memory_mb": _peak_memory_mb(),
+        "scored": scored
+    }
+
+def latency_summary(seconds):
+    """p50/p95/p99/max in milliseconds"""
+    ms = np.asarray(seconds) * 1000
+    return {
+        "count": int(len(ms)),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max())
+    }
+
+# ---------------- Reporting ----------------
+
+def print_report(results):
+    for result in results:
+        print(f"\n{result['borrowers']} borrowers: {result['borrowers_per_second']:.2f} borrowers/s "
+              f"({result['seconds']:.2f}s), peak memory {result['peak_memory_mb']:.0f} MB")
+        print(f"  {'Stage':<8} {'Count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Max ms':>9}")
+        for stage, stats in result["stages"].items():
+            print(f"  {stage:<8} {stats['count']:>6} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                  f"{stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
+        print("  LLM calls: " + ", ".join(f"{task}={calls}" for task, calls in result["llm_calls"].items()))
+
+def compare_to_baseline(results, baseline_path, tolerance=0.2):
+    """Regressions against a saved run: throughput drop or p95 stage latency rise beyond the tolerance"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {result["borrowers"]: result for result in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["borrowers"])
+        if previous is None:
+            continue
+        if result["borrowers_per_second"] < previous["borrowers_per_second"] * (1 - tolerance):
+            regressions.append(f"{result['borrowers']} borrowers: {result['borrowers_per_second']:.2f} borrowers/s "
+                               f"vs {previous['borrowers_per_second']:.2f}")
+        for stage, stats in result["stages"].items():
+            before = previous["stages"].get(stage)
+            if before and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{result['borrowers']} borrowers, {stage}: p95 {stats['p95_ms']:.2f} ms "
+                                   f"vs {before['p95_ms']:.2f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--sizes", default="10,100", help="Comma-separated portfolio sizes")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with serp/, pages/ and llm_responses.json")
+    parser.add_argument("--serp-latency-ms", type=float, default=0, help="Simulated SerpAPI latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Simulated Gemini latency")
+    parser.add_argument("--model", default=None, help="Prune queries with this model (default: no pruning)")
+    parser.add_argument("--incremental", action="store_true", help="Time a second, incremental run")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Borrower and result file format")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    parser.add_argument("--trace", default=None, help="Also record spans to this OTLP/JSON lines file")
+    parser.add_argument("--baseline", default=None, help="Fail if slower than this saved JSON run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    if args.trace:
+        import tracing
+        tracing.enable(args.trace)
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",")]:
+        print(f"Benchmarking {size} borrowers...")
+        results.append(run_benchmark(size, args.fixtures, args.serp_latency_ms, args.llm_latency_ms,
+                                     quiet=not args.verbose, model_path=args.model,
+                                     incremental=args.incremental, table_format=args.format))
+    print_report(results)
+
+    if args.trace:
+        tracing.flush()
+        print()
+        tracing.print_breakdown(args.trace)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\n⚠️ Performance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,11 @@
 import os
 import re
 import time
-import pandas as pd
 from urllib.parse import quote
-from playwright.sync_api import sync_playwright
-import google.generativeai as genai
-from keys import GEMINI_KEY
+import llm_router
+import cassette
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_KEY)
-model = genai.GenerativeModel("gemini-2.0-flash-exp")
+# Playwright, pandas and the signal table are imported where they're used, so quick commands start fast
 
 def generate_queries(job_title, company, industry, years_ahead=5):
     """Generate specific queries for loan risk assessment"""
@@ -31,6 +27,7 @@ def generate_queries(job_title, company, industry, years_ahead=5):
 
 def scrape_duckduckgo_results(query, num_results=10):
     """Scrape search results from DuckDuckGo using Playwright"""
+    from playwright.sync_api import sync_playwright
     articles = []
     
     with sync_playwright() as p:
@@ -47,8 +44,7 @@ def scrape_duckduckgo_results(query, num_results=10):
             search_url = f"https://duckduckgo.com/?q={quote(query)}"
             print(f"  Searching: {query}")
             
-            page.goto(search_url, wait_until="networkidle", timeout=30000)
-            page.wait_for_timeout(2000)
+            cassette.goto(page, search_url, wait_ms=2000, wait_until="networkidle", timeout=30000)
             
             # DuckDuckGo result selectors
             result_elements = page.query_selector_all('[data-testid="result"]')
@@ -135,7 +131,7 @@ Your response (just the numbers):
 """
     
     try:
-        response = model.generate_content(ranking_prompt)
+        response = llm_router.generate_content("ranking", ranking_prompt)
         ranking_text = response.text.strip()
         
         # Parse the ranking
@@ -202,8 +198,13 @@ def search_single_query(query, borrower_id, output_dir="clean_articles"):
         print(f"    Error saving: {e}")
         return None
 
-def process_borrower_ddg(borrower_row, output_dir="clean_articles"):
-    """Process a single borrower with DuckDuckGo search"""
+def process_borrower_ddg(borrower_row, output_dir="clean_articles", signal_table=None):
+    """Process a single borrower with DuckDuckGo search
+
+    Queries whose attribute is already in the entity signal table are skipped.
+    """
+    from entity_signals import QUERY_ATTRIBUTES, known_attributes
+
     borrower_id = borrower_row['borrower_id']
     borrower_name = borrower_row['borrower_name']
     job_title = borrower_row['job_title']
@@ -219,42 +220,51 @@ def process_borrower_ddg(borrower_row, output_dir="clean_articles"):
     # Generate queries
     queries = generate_queries(job_title, company, industry)
     
+    # Skip queries already answered for this company/industry/job/region
+    known = known_attributes(borrower_row, signal_table) if signal_table is not None else set()
+    
     # Search each query
     saved_files = []
     for i, query in enumerate(queries):
+        if QUERY_ATTRIBUTES[i] in known:
+            print(f"  Query {i+1}/{len(queries)}: skipped ({QUERY_ATTRIBUTES[i]} precomputed)")
+            continue
         print(f"  Query {i+1}/{len(queries)}: {query[:60]}...")
         filename = search_single_query(query, borrower_id, output_dir)
         if filename:
             saved_files.append(filename)
         
         # Be polite to servers
-        time.sleep(1)
+        cassette.sleep(1)
     
-    print(f"  Completed: {len(saved_files)}/{len(queries)} queries saved")
+    print(f"  Completed: {len(saved_files)}/{len(queries) - len(known)} queries saved ({len(known)} precomputed)")
     return saved_files
 
 def process_borrowers_from_csv(csv_file, output_dir="clean_articles"):
     """Process all borrowers from CSV file"""
+    import priority_scheduler
+    from entity_signals import load_signal_table
+
     try:
-        # Read CSV
-        df = pd.read_csv(csv_file)
-        
         print(f"DuckDuckGo Borrower Article Searcher")
         print("=" * 60)
-        print(f"Found {len(df)} borrowers to process")
         print(f"Output directory: {output_dir}")
         
-        # Process each borrower
+        # Precomputed company/industry/job/region signals
+        signal_table = load_signal_table()
+        print(f"Entity signals loaded: {len(signal_table)}")
+        
+        # Highest-exposure borrowers first, so a stopped run has searched the ones that matter most
         total_files = 0
-        for index, row in df.iterrows():
+        for index, row in enumerate(priority_scheduler.iter_prioritized(csv_file)):
             try:
-                files = process_borrower_ddg(row, output_dir)
-                total_files += len(files)
-                
                 # Pause between borrowers
-                if index < len(df) - 1:
+                if index > 0:
                     print(f"  Pausing before next borrower...")
-                    time.sleep(5)
+                    cassette.sleep(5)
+                
+                files = process_borrower_ddg(row, output_dir, signal_table)
+                total_files += len(files)
                     
             except Exception as e:
                 print(f"  Error processing borrower {row.get('borrower_id', 'unknown')}: {e}")
@@ -262,6 +272,7 @@ def process_borrowers_from_csv(csv_file, output_dir="clean_articles"):
         
         print(f"\n=== Processing Complete ===")
         print(f"Total files saved: {total_files}")
+        llm_router.print_usage_report()
         
     except Exception as e:
         print(f"Error reading CSV file: {e}")
@@ -280,6 +291,7 @@ def main():
     
     # Ask user for confirmation
     try:
+        import pandas as pd
         df = pd.read_csv(csv_file)
         print(f"Found {len(df)} borrowers in {csv_file}")
         print(f"Each borrower will generate 12 searches")
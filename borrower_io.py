@@ -0,0 +1,250 @@
+import os
+import sys
+import time
+import pandas as pd
+from risk_attributes import RISK_ATTRIBUTES, as_risk_levels
+
+# Column types shared by the borrower, entity signal and result tables.
+# Columns not listed here are read as pandas infers them.
+NUMERIC_DTYPES = {
+    "loan_amount": "float64",
+    "loan_start_year": "Int16",
+    "repayments_on_time": "Int32",
+    "late_payments": "Int32",
+    "avg_days_late": "float32",
+    "average_days_late": "float32",
+    "age": "Int16",
+    "college_education_cost": "float64",
+    "risk_score": "float32",
+    "decided_class": "Int8",
+    "repayment_likelihood": "Int8",
+    "loan_repayment_likelihood": "Int8"
+}
+
+# Identifiers kept as text: IDs like "B-101" are valid, and "101" must not become 101.0
+STRING_COLUMNS = ["borrower_id"]
+
+# Low-cardinality text columns, stored dictionary-encoded. The Low/Medium/High
+# risk attributes use the fixed int8 vocabulary from risk_attributes.
+CATEGORICAL_COLUMNS = [
+    "job_title",
+    "company",
+    "industry",
+    "location",
+    "entity_type",
+    "attribute",
+    "criticality"
+] + RISK_ATTRIBUTES
+
+# Read identifiers from CSV as written, never through a number
+CSV_DTYPES = {column: str for column in STRING_COLUMNS}
+
+# Fields every borrower row needs before it can be searched or scored
+REQUIRED_COLUMNS = ["borrower_id", "job_title", "company", "industry"]
+
+# Long free text kept out of the result table so it isn't loaded with the scores
+TEXT_COLUMNS = ["explanation"]
+
+def is_parquet(path):
+    return str(path).endswith(".parquet")
+
+def coerce_dtypes(df, categories=True):
+    """Cast known columns to their table types; unparseable numbers become missing"""
+    df = df.copy()
+    for column in df.columns:
+        if column in NUMERIC_DTYPES:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(NUMERIC_DTYPES[column])
+        elif column in STRING_COLUMNS:
+            df[column] = df[column].astype("string").str.strip()
+        elif column in CATEGORICAL_COLUMNS:
+            if categories:
+                df[column] = as_risk_levels(df[column]) if column in RISK_ATTRIBUTES else df[column].astype("category")
+            elif isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype(object)
+    return df
+
+def arrow_schema(df):
+    """Arrow schema for a (coerced) table: typed numbers, dictionary-encoded categoricals"""
+    import pyarrow as pa
+
+    fields = []
+    for column in df.columns:
+        if column in NUMERIC_DTYPES:
+            arrow_type = pa.from_numpy_dtype(pd.api.types.pandas_dtype(NUMERIC_DTYPES[column].lower()))
+        elif column in RISK_ATTRIBUTES:
+            arrow_type = pa.dictionary(pa.int8(), pa.string(), ordered=True)
+        elif column in CATEGORICAL_COLUMNS:
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        elif column in STRING_COLUMNS or column in TEXT_COLUMNS or df[column].dtype == object or pd.api.types.is_string_dtype(df[column]):
+            arrow_type = pa.string()
+        else:
+            arrow_type = pa.Schema.from_pandas(df[[column]], preserve_index=False).field(column).type
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+def to_arrow(df):
+    """Typed Arrow table for a borrower/signal/result frame"""
+    import pyarrow as pa
+
+    df = coerce_dtypes(df)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.rename_categories(lambda value: str(value))
+    return pa.Table.from_pandas(df, schema=arrow_schema(df), preserve_index=False)
+
+def read_table(path, columns=None, categories=True):
+    """Read a borrower/signal/result table from Parquet (memory-mapped) or CSV.
+
+    With `categories=False` dictionary columns come back as plain strings,
+    for callers that add new values to them.
+    """
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        df = pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    else:
+        df = pd.read_csv(path, usecols=columns, dtype=CSV_DTYPES)
+    return coerce_dtypes(df, categories)
+
+def write_table(df, path):
+    """Write a table as Parquet or CSV depending on the file extension"""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        pq.write_table(to_arrow(df), path, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+
+def explanations_path(path):
+    """Side file holding the free-text columns of a Parquet result table"""
+    base, _ = os.path.splitext(path)
+    return base + "_explanations.parquet"
+
+def write_results(df, path):
+    """Write a result table; for Parquet the explanations go to a separate file keyed by borrower_id"""
+    text_columns = [column for column in TEXT_COLUMNS if column in df.columns]
+    if not is_parquet(path) or not text_columns:
+        write_table(df, path)
+        return
+
+    write_table(df.drop(columns=text_columns), path)
+    write_table(df[["borrower_id"] + text_columns], explanations_path(path))
+
+def read_explanations(path, borrower_ids=None):
+    """Explanations for a Parquet result table, optionally only for some borrowers"""
+    import pyarrow.parquet as pq
+
+    filters = [("borrower_id", "in", [str(b) for b in borrower_ids])] if borrower_ids is not None else None
+    return pq.read_table(explanations_path(path), filters=filters, memory_map=True).to_pandas()
+
+def read_results(path, with_explanations=False):
+    """Read a result table, joining the explanations back on only when asked"""
+    df = read_table(path)
+    if with_explanations and is_parquet(path) and os.path.exists(explanations_path(path)):
+        df = df.merge(read_explanations(path), on="borrower_id", how="left")
+    return df
+
+def validate_chunk(chunk, required=REQUIRED_COLUMNS, categories=False, source=""):
+    """Coerce one chunk to the table types and drop rows missing a required field
+
+    Required fields are checked on the values as read (blank text counts as missing),
+    so an ID that isn't a number is still a valid ID.
+    """
+    missing = [column for column in required if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"{source} is missing required columns: {', '.join(missing)}")
+
+    raw = chunk[required]
+    invalid = (raw.isna() | raw.apply(lambda values: values.astype("string").str.strip() == "").fillna(True)).any(axis=1)
+    chunk = coerce_dtypes(chunk, categories)
+    if invalid.any():
+        print(f"⚠️ Skipping {int(invalid.sum())} rows in {source} with missing {', '.join(required)}")
+        chunk = chunk[~invalid]
+    return chunk
+
+def iter_raw_chunks(path, chunksize=10_000, columns=None):
+    """Stream a table as read (CSV chunks or Parquet record batches), rows labelled by file position"""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        batches = (batch.to_pandas() for batch in
+                   pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunksize, columns=columns))
+    else:
+        batches = pd.read_csv(path, chunksize=chunksize, usecols=columns, dtype=CSV_DTYPES)
+
+    offset = 0
+    for chunk in batches:
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+def iter_borrower_chunks(path, chunksize=10_000, columns=None, required=REQUIRED_COLUMNS, categories=False):
+    """Stream a borrower table in validated chunks (CSV chunks or Parquet record batches).
+
+    Memory stays bounded by `chunksize` rows however large the file is. Rows keep
+    their position in the file as index label. Categoricals are off by default
+    since each chunk would get its own categories.
+    """
+    for chunk in iter_raw_chunks(path, chunksize, columns):
+        yield validate_chunk(chunk, required, categories, source=path)
+
+def iter_borrowers(path, chunksize=10_000, required=REQUIRED_COLUMNS):
+    """Stream borrower rows one at a time, reading the file chunk by chunk"""
+    for chunk in iter_borrower_chunks(path, chunksize, required=required):
+        for _, row in chunk.iterrows():
+            yield row
+
+class TableWriter:
+    """Write a table chunk by chunk to CSV or Parquet.
+
+    With `split_text`, free-text columns of a Parquet table go to the
+    explanations side file, as in write_results().
+    """
+
+    def __init__(self, path, split_text=False):
+        self.path = path
+        self.split_text = split_text and is_parquet(path)
+        self.rows = 0
+        self._writers = {}
+
+    def _write_parquet(self, df, path):
+        import pyarrow.parquet as pq
+        table = to_arrow(df)
+        writer = self._writers.get(path)
+        if writer is None:
+            writer = self._writers[path] = pq.ParquetWriter(path, table.schema, compression="zstd")
+        writer.write_table(table.cast(writer.schema))
+
+    def write(self, df):
+        if not is_parquet(self.path):
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        else:
+            text_columns = [column for column in TEXT_COLUMNS if column in df.columns] if self.split_text else []
+            self._write_parquet(df.drop(columns=text_columns), self.path)
+            if text_columns:
+                self._write_parquet(df[["borrower_id"] + text_columns], explanations_path(self.path))
+        self.rows += len(df)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def convert(source, destination):
+    """Convert a borrower/result table between CSV and Parquet"""
+    start = time.perf_counter()
+    df = read_results(source, with_explanations=True)
+    write_results(df, destination)
+    print(f"✅ {len(df):,} rows converted {source} -> {destination} in {time.perf_counter() - start:.2f}s")
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python borrower_io.py <source.csv|.parquet> <destination.csv|.parquet>")
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2])
+
+if __name__ == "__main__":
+    main()
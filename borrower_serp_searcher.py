@@ -1,15 +1,13 @@
 import os
 import re
 import time
-import pandas as pd
-import requests
 import json
-import google.generativeai as genai
-from keys import SERP_KEY, GEMINI_KEY
+from keys import SERP_KEY
+import llm_router
+import tracing
+import cassette
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_KEY)
-model = genai.GenerativeModel("gemini-2.5-flash")
+# requests, the signal table and the quota planner are imported where they're used, so quick commands start fast
 
 def generate_queries(job_title, company, industry, years_ahead=5):
     """Generate specific queries for loan risk assessment"""
@@ -29,8 +27,10 @@ def generate_queries(job_title, company, industry, years_ahead=5):
     ]
     return queries
 
+@tracing.traced("serpapi.search")
 def search_serpapi(query, num_results=15):
     """Search using SerpAPI Google Search"""
+    import requests
     articles = []
     
     try:
@@ -48,8 +48,9 @@ def search_serpapi(query, num_results=15):
         print(f"  Searching: {query}")
         
         # Make API request
-        response = requests.get("https://serpapi.com/search", params=params)
+        response = cassette.get("https://serpapi.com/search", params=params)
         response.raise_for_status()
+        tracing.current_span().set("bytes", len(response.content))
         
         data = response.json()
         
@@ -94,6 +95,8 @@ def search_serpapi(query, num_results=15):
             except Exception as e:
                 continue
         
+        tracing.current_span().set("results", len(articles))
+        
     except requests.exceptions.RequestException as e:
         print(f"    Error making SerpAPI request: {e}")
     except json.JSONDecodeError as e:
@@ -139,7 +142,7 @@ Your response (just the numbers):
 """
     
     try:
-        response = model.generate_content(ranking_prompt)
+        response = llm_router.generate_content("ranking", ranking_prompt)
         ranking_text = response.text.strip()
         
         # Parse the ranking
@@ -169,8 +172,10 @@ Your response (just the numbers):
         # Fallback: return first top_k articles
         return articles[:top_k]
 
+@tracing.traced("query")
 def search_single_query(query, borrower_id, output_dir="clean_articles"):
     """Search for a single query and save results"""
+    tracing.current_span().set("query", query)
     articles = search_serpapi(query, num_results=10)
     
     if not articles:
@@ -206,8 +211,14 @@ def search_single_query(query, borrower_id, output_dir="clean_articles"):
         print(f"    Error saving: {e}")
         return None
 
-def process_borrower_serp(borrower_row, output_dir="clean_articles"):
-    """Process a single borrower with SerpAPI search"""
+@tracing.traced("borrower")
+def process_borrower_serp(borrower_row, output_dir="clean_articles", signal_table=None):
+    """Process a single borrower with SerpAPI search
+
+    Queries whose attribute is already in the entity signal table are skipped.
+    """
+    from entity_signals import QUERY_ATTRIBUTES, known_attributes
+
     borrower_id = borrower_row['borrower_id']
     borrower_name = borrower_row['borrower_name']
     job_title = borrower_row['job_title']
@@ -223,70 +234,79 @@ def process_borrower_serp(borrower_row, output_dir="clean_articles"):
     # Generate queries
     queries = generate_queries(job_title, company, industry)
     
+    # Skip queries already answered for this company/industry/job/region
+    known = known_attributes(borrower_row, signal_table) if signal_table is not None else set()
+    tracing.current_span().set("borrower_id", str(borrower_id))
+    tracing.current_span().set("cache_hits", len(known))
+    
     # Search each query
     saved_files = []
     for i, query in enumerate(queries):
+        if QUERY_ATTRIBUTES[i] in known:
+            print(f"  Query {i+1}/{len(queries)}: skipped ({QUERY_ATTRIBUTES[i]} precomputed)")
+            continue
         print(f"  Query {i+1}/{len(queries)}: {query[:60]}...")
         filename = search_single_query(query, borrower_id, output_dir)
         if filename:
             saved_files.append(filename)
         
         # Be polite to the API
-        time.sleep(1)
+        cassette.sleep(1)
     
-    print(f"  Completed: {len(saved_files)}/{len(queries)} queries saved")
+    print(f"  Completed: {len(saved_files)}/{len(queries) - len(known)} queries saved ({len(known)} precomputed)")
     return saved_files
 
-def check_serpapi_quota():
-    """Check SerpAPI quota and usage"""
+def get_serpapi_quota():
+    """SerpAPI account info (plan, searches used/left), or None if it can't be fetched"""
     try:
-        response = requests.get(f"https://serpapi.com/account?api_key={SERP_KEY}")
+        response = cassette.get(f"https://serpapi.com/account?api_key={SERP_KEY}")
         if response.status_code == 200:
-            data = response.json()
-            print(f"SerpAPI Account Info:")
-            print(f"  Plan: {data.get('plan', 'Unknown')}")
-            print(f"  Searches this month: {data.get('total_searches_this_month', 0)}")
-            print(f"  Searches left: {data.get('searches_left_this_month', 0)}")
-            return True
+            return response.json()
     except Exception as e:
         print(f"Could not check SerpAPI quota: {e}")
+    return None
+
+def check_serpapi_quota():
+    """Check SerpAPI quota and usage"""
+    data = get_serpapi_quota()
+    if data is None:
         return False
+    print(f"SerpAPI Account Info:")
+    print(f"  Plan: {data.get('plan', 'Unknown')}")
+    print(f"  Searches this month: {data.get('total_searches_this_month', 0)}")
+    print(f"  Searches left: {data.get('searches_left_this_month', 0)}")
+    return True
+
+def process_borrowers_from_csv(csv_file, output_dir="clean_articles", quota=None):
+    """Process all borrowers from CSV file
+
+    Searches are planned against the remaining SerpAPI quota first: repeated and already
+    saved queries are copied, and whatever doesn't fit the budget goes to DuckDuckGo.
+    """
+    import quota_planner
 
-def process_borrowers_from_csv(csv_file, output_dir="clean_articles"):
-    """Process all borrowers from CSV file"""
     try:
-        # Read CSV
-        df = pd.read_csv(csv_file)
-        
         print(f"SerpAPI Borrower Article Searcher")
         print("=" * 60)
-        print(f"Found {len(df)} borrowers to process")
         print(f"Output directory: {output_dir}")
         
         # Check quota
         print("\nChecking SerpAPI quota...")
-        quota_ok = check_serpapi_quota()
-        if not quota_ok:
-            print("Warning: Could not verify SerpAPI quota")
+        if quota is None:
+            quota = quota_planner.remaining_quota()
+        if quota is None:
+            print("Warning: Could not verify SerpAPI quota, all searches go to DuckDuckGo")
         
-        # Process each borrower
-        total_files = 0
-        for index, row in df.iterrows():
-            try:
-                files = process_borrower_serp(row, output_dir)
-                total_files += len(files)
-                
-                # Pause between borrowers
-                if index < len(df) - 1:
-                    print(f"  Pausing before next borrower...")
-                    time.sleep(3)
-                    
-            except Exception as e:
-                print(f"  Error processing borrower {row.get('borrower_id', 'unknown')}: {e}")
-                continue
+        # Plan the minimum set of SerpAPI calls, highest-priority borrowers first
+        plan = quota_planner.plan_searches(quota_planner.load_borrowers(csv_file), quota, output_dir)
+        quota_planner.print_plan(plan, quota)
+        
+        saved_files = quota_planner.execute_plan(plan, output_dir)
         
         print(f"\n=== Processing Complete ===")
-        print(f"Total files saved: {total_files}")
+        print(f"Total files saved: {sum(len(files) for files in saved_files.values())}")
+        llm_router.print_usage_report()
+        tracing.flush()
         
     except Exception as e:
         print(f"Error reading CSV file: {e}")
@@ -305,10 +325,10 @@ def main():
     
     # Ask user for confirmation
     try:
-        df = pd.read_csv(csv_file)
-        print(f"Found {len(df)} borrowers in {csv_file}")
-        print(f"Each borrower will generate 12 searches")
-        print(f"Total searches: {len(df) * 12}")
+        import quota_planner
+        quota = quota_planner.remaining_quota()
+        plan = quota_planner.plan_searches(quota_planner.load_borrowers(csv_file), quota)
+        quota_planner.print_plan(plan, quota)
         
         proceed = input("\nProceed with searches? (y/n): ").lower().strip()
         if proceed != 'y':
@@ -316,7 +336,7 @@ def main():
             return
         
         # Process borrowers
-        process_borrowers_from_csv(csv_file)
+        process_borrowers_from_csv(csv_file, quota=quota)
         
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import types
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# off: normal network traffic, record: call the real backends and save every response,
+# replay: answer from the saved responses only (a missing one is an error)
+MODE = os.environ.get("LOAN_CASSETTE_MODE", "off").lower()
+CASSETTE_DIR = os.environ.get("LOAN_CASSETTE_DIR", "cassettes")
+
+# With LOAN_CASSETTE_REALTIME=1 a replay waits as long as the recorded call took
+REALTIME = os.environ.get("LOAN_CASSETTE_REALTIME", "0") == "1"
+
+# Never written to a cassette
+SECRET_PARAMS = {"api_key", "key", "token"}
+
+MODES = ("off", "record", "replay")
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode for a request that was never recorded"""
+
+def configure(mode=None, cassette_dir=None, realtime=None):
+    """Switch mode/directory at runtime (tests, benchmarks)"""
+    global MODE, CASSETTE_DIR, REALTIME
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {MODES}")
+        MODE = mode
+    if cassette_dir is not None:
+        CASSETTE_DIR = cassette_dir
+    if realtime is not None:
+        REALTIME = realtime
+
+def recording():
+    return MODE == "record"
+
+def replaying():
+    return MODE == "replay"
+
+def sleep(seconds):
+    """Politeness pause between requests, skipped when nothing goes over the network"""
+    if not replaying():
+        time.sleep(seconds)
+
+# ---------------- Storage ----------------
+
+def _strip_secrets(url):
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def _path(kind, request):
+    key = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+    return os.path.join(CASSETTE_DIR, kind, key + ".json")
+
+def save(kind, request, response, elapsed=0.0):
+    """Store one interaction; requests must already be free of credentials"""
+    path = _path(kind, request)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"request": request, "response": response, "elapsed": elapsed,
+                   "recorded": time.strftime("%Y-%m-%d %H:%M:%S")}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def load(kind, request):
+    """Recorded response for a request; raises CassetteMiss if there is none"""
+    path = _path(kind, request)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        raise CassetteMiss(f"No recorded {kind} response for {json.dumps(request)[:200]} in {CASSETTE_DIR}")
+    if REALTIME and entry.get("elapsed"):
+        time.sleep(entry["elapsed"])
+    return entry["response"]
+
+# ---------------- HTTP (SerpAPI, plain page fetches) ----------------
+
+class CassetteResponse:
+    """The parts of requests.Response the searchers use"""
+    def __init__(self, url, status_code, text, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+def get(url, params=None, **kwargs):
+    """requests.get() that is recorded or replayed depending on the mode"""
+    import requests
+
+    if MODE == "off":
+        return requests.get(url, params=params, **kwargs)
+
+    request = {"url": _strip_secrets(url),
+               "params": {k: str(v) for k, v in (params or {}).items() if k not in SECRET_PARAMS}}
+    if replaying():
+        recorded = load("http", request)
+        return CassetteResponse(request["url"], recorded["status_code"], recorded["text"], recorded["headers"])
+
+    start = time.perf_counter()
+    response = requests.get(url, params=params, **kwargs)
+    save("http", request, {"status_code": response.status_code, "text": response.text,
+                           "headers": {"Content-Type": response.headers.get("Content-Type", "")}},
+         time.perf_counter() - start)
+    return response
+
+# ---------------- Playwright page loads ----------------
+
+def goto(page, url, wait_ms=0, **goto_kwargs):
+    """page.goto() plus the settle wait; records the rendered page or replays it without network.
+
+    The recording is the DOM after scripts ran, so replay serves it as the main
+    document and aborts every other request - the scraper's own selectors and
+    text extraction still run against a real browser page.
+    """
+    request = {"url": url}
+
+    if replaying():
+        html = load("page", request)["html"]
+
+        def fulfill(route):
+            if route.request.is_navigation_request() and route.request.frame.parent_frame is None:
+                route.fulfill(status=200, content_type="text/html; charset=utf-8", body=html)
+            else:
+                route.abort()
+
+        page.route("**/*", fulfill)
+        page.goto(url, wait_until="domcontentloaded", timeout=goto_kwargs.get("timeout", 30000))
+        return
+
+    start = time.perf_counter()
+    page.goto(url, **goto_kwargs)
+    if wait_ms:
+        page.wait_for_timeout(wait_ms)
+    if recording():
+        save("page", request, {"html": page.content(), "final_url": page.url}, time.perf_counter() - start)
+
+# ---------------- LLM calls ----------------
+
+def replay_llm(model_name, prompt):
+    """Recorded response for a prompt in replay mode, otherwise None"""
+    if not replaying():
+        return None
+    recorded = load("llm", {"model": model_name, "prompt": prompt})
+    usage = types.SimpleNamespace(prompt_token_count=recorded["input_tokens"],
+                                  candidates_token_count=recorded["output_tokens"])
+    return types.SimpleNamespace(text=recorded["text"], usage_metadata=usage)
+
+def record_llm(model_name, prompt, response, elapsed=0.0):
+    """Save a real response when recording"""
+    if not recording():
+        return
+    usage = getattr(response, "usage_metadata", None)
+    save("llm", {"model": model_name, "prompt": prompt}, {
+        "text": response.text,
+        "input_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+        "output_tokens": getattr(usage, "candidates_token_count", 0) or 0
+    }, elapsed)
+
+def summary(cassette_dir=None):
+    """Number of recorded interactions per kind"""
+    root = cassette_dir or CASSETTE_DIR
+    if not os.path.exists(root):
+        return {}
+    return {kind: len([f for f in os.listdir(os.path.join(root, kind)) if f.endswith(".json")])
+            for kind in sorted(os.listdir(root)) if os.path.isdir(os.path.join(root, kind))}
+
+if MODE not in MODES:
+    raise ValueError(f"LOAN_CASSETTE_MODE must be one of {MODES}, got '{MODE}'")
+
+if __name__ == "__main__":
+    counts = summary()
+    print(f"Cassettes in {CASSETTE_DIR} (mode: {MODE})")
+    for kind, count in counts.items():
+        print(f"  {kind:<6} {count}")
+    if not counts:
+        print("  none recorded yet")
@@ -1,87 +1,29 @@
+import time
+import argparse
 import pandas as pd
 import numpy as np
-import random
+from risk_attributes import RISK_ATTRIBUTES, RISK_DTYPE
 
-# Seed for reproducibility
-np.random.seed(42)
+SEED = 42
 
-categories = ['Low', 'Medium', 'High']
 industries = ['Tech', 'Finance', 'Healthcare', 'Education', 'Manufacturing']
 locations = ['New York', 'San Francisco', 'Chicago', 'Boston', 'Austin']
+job_titles = ['Engineer', 'Manager', 'Analyst', 'Teacher', 'Nurse']
 
-def generate_categorical_score(val):
-    if val == 'Low':
-        return 1
-    elif val == 'Medium':
-        return 0
-    else:
-        return -1
-
-def generate_records(start_id, n_records):
-    records = []
-    for i in range(start_id, start_id + n_records):
-        borrower_id = i
-        borrower_name = f'Borrower_{i}'
-        loan_amount = np.random.randint(5000, 100000)
-        loan_start_year = np.random.randint(2010, 2024)
-        job_title = random.choice(['Engineer', 'Manager', 'Analyst', 'Teacher', 'Nurse'])
-        company = f'Company_{np.random.randint(1, 20)}'
-        industry = random.choice(industries)
-        repayments_on_time = np.random.randint(10, 60)
-        late_payments = np.random.randint(0, 10)
-        average_days_late = np.random.randint(0, 30)
-        age = np.random.randint(21, 65)
-        location = random.choice(locations)
-        
-        stock_performance_outlook = random.choice(categories)
-        industry_recession_or_growth = random.choice(categories)
-        company_M_and_A_possibility = random.choice(categories)
-        job_automation_risk = random.choice(categories)
-        job_market_demand = random.choice(categories)
-        product_relevance = random.choice(categories)
-        skilled_obsolescence = random.choice(categories)
-        replaceability_risk = random.choice(categories)
-        pollution_projection = random.choice(categories)
-        disease_risk_polluted_zone = random.choice(categories)
-        college_education_cost = np.random.randint(10000, 50000)
-        financial_burden_children = random.choice(categories)
-        
-        score = 0
-        score += (repayments_on_time / 10)
-        score -= (late_payments * 0.5)
-        score -= (average_days_late * 0.2)
-        
-        score += generate_categorical_score(job_market_demand) * 2
-        score += generate_categorical_score(product_relevance) * 2
-        score -= generate_categorical_score(job_automation_risk)
-        score -= generate_categorical_score(skilled_obsolescence)
-        score -= generate_categorical_score(replaceability_risk)
-        score += generate_categorical_score(stock_performance_outlook)
-        score -= generate_categorical_score(company_M_and_A_possibility)
-        score -= generate_categorical_score(industry_recession_or_growth)
-        score -= generate_categorical_score(financial_burden_children)
-        
-        if score >= 6:
-            label = 2
-        elif score >= 3:
-            label = 1
-        elif score >= 0:
-            label = 0
-        elif score >= -3:
-            label = -1
-        else:
-            label = -2
-
-        records.append([
-            borrower_id, borrower_name, loan_amount, loan_start_year, job_title,
-            company, industry, repayments_on_time, late_payments, average_days_late,
-            age, location, stock_performance_outlook, industry_recession_or_growth,
-            company_M_and_A_possibility, job_automation_risk, job_market_demand,
-            product_relevance, skilled_obsolescence, replaceability_risk,
-            pollution_projection, disease_risk_polluted_zone, college_education_cost,
-            financial_burden_children, label
-        ])
-    return records
+categorical_columns = RISK_ATTRIBUTES
+
+# Weight of each attribute in the repayment score (Low=1, Medium=0, High=-1)
+score_weights = {
+    'job_market_demand': 2,
+    'product_relevance': 2,
+    'job_automation_risk': -1,
+    'skilled_obsolescence': -1,
+    'replaceability_risk': -1,
+    'stock_performance_outlook': 1,
+    'company_M_and_A_possibility': -1,
+    'industry_recession_or_growth': -1,
+    'financial_burden_children': -1
+}
 
 columns = [
     'borrower_id', 'borrower_name', 'loan_amount', 'loan_start_year', 'job_title',
@@ -93,14 +35,124 @@ columns = [
     'financial_burden_children', 'loan_repayment_likelihood'
 ]
 
-# Generate 100 training samples
-train_records = generate_records(1, 100)
-df_train = pd.DataFrame(train_records, columns=columns)
-df_train.to_csv('borrowers_train.csv', index=False)
+def concentration_weights(n, concentration):
+    """Zipf-like draw weights: 0 is uniform, higher values pile borrowers onto the first few entries"""
+    weights = 1.0 / np.arange(1, n + 1) ** concentration
+    return weights / weights.sum()
+
+def score_labels(repayments_on_time, late_payments, average_days_late, category_codes):
+    """Repayment likelihood (-2..2) for whole columns at once.
+
+    `category_codes` maps attribute name to its Low/Medium/High codes (0/1/2).
+    """
+    score = repayments_on_time / 10 - late_payments * 0.5 - average_days_late * 0.2
+    for column, weight in score_weights.items():
+        # Low/Medium/High codes 0/1/2 score 1/0/-1
+        score = score + (1 - category_codes[column]) * weight
+
+    # < -3 -> -2, < 0 -> -1, < 3 -> 0, < 6 -> 1, else 2
+    return (np.digitize(score, [-3, 0, 3, 6]) - 2).astype(np.int8)
+
+def generate_borrowers(start_id, n_records, rng, n_companies=19, company_concentration=0.0,
+                       industry_concentration=0.0):
+    """Draw a block of synthetic borrowers column by column"""
+    ids = np.arange(start_id, start_id + n_records, dtype=np.int64)
+
+    company_codes = rng.choice(n_companies, n_records, p=concentration_weights(n_companies, company_concentration))
+    industry_codes = rng.choice(len(industries), n_records,
+                                p=concentration_weights(len(industries), industry_concentration))
+
+    repayments_on_time = rng.integers(10, 60, n_records, dtype=np.int32)
+    late_payments = rng.integers(0, 10, n_records, dtype=np.int32)
+    average_days_late = rng.integers(0, 30, n_records, dtype=np.int32)
+
+    category_codes = {column: rng.integers(0, 3, n_records, dtype=np.int8) for column in categorical_columns}
+
+    data = {
+        'borrower_id': ids,
+        'borrower_name': 'Borrower_' + ids.astype(str).astype(object),
+        'loan_amount': rng.integers(5000, 100000, n_records, dtype=np.int32),
+        'loan_start_year': rng.integers(2010, 2024, n_records, dtype=np.int16),
+        'job_title': pd.Categorical.from_codes(rng.integers(0, len(job_titles), n_records), job_titles),
+        'company': pd.Categorical.from_codes(company_codes, [f'Company_{i}' for i in range(1, n_companies + 1)]),
+        'industry': pd.Categorical.from_codes(industry_codes, industries),
+        'repayments_on_time': repayments_on_time,
+        'late_payments': late_payments,
+        'average_days_late': average_days_late,
+        'age': rng.integers(21, 65, n_records, dtype=np.int16),
+        'location': pd.Categorical.from_codes(rng.integers(0, len(locations), n_records), locations),
+        'college_education_cost': rng.integers(10000, 50000, n_records, dtype=np.int32),
+        'loan_repayment_likelihood': score_labels(repayments_on_time, late_payments,
+                                                  average_days_late, category_codes)
+    }
+    for column, codes in category_codes.items():
+        data[column] = pd.Categorical.from_codes(codes, dtype=RISK_DTYPE)
+
+    return pd.DataFrame(data)[columns]
+
+def generate_records(start_id, n_records, seed=SEED):
+    """Small borrower table for the train/test CSVs"""
+    return generate_borrowers(start_id, n_records, np.random.default_rng(seed))
+
+def generate_portfolio(output_path, n_records, chunk_size=1_000_000, seed=SEED, n_companies=19,
+                       company_concentration=0.0, industry_concentration=0.0):
+    """Write a large synthetic portfolio to Parquet one chunk at a time"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rng = np.random.default_rng(seed)
+    writer = None
+    written = 0
+    start = time.perf_counter()
+
+    try:
+        while written < n_records:
+            n_chunk = min(chunk_size, n_records - written)
+            chunk = generate_borrowers(written + 1, n_chunk, rng, n_companies,
+                                       company_concentration, industry_concentration)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            written += n_chunk
+            print(f"  {written:,}/{n_records:,} borrowers")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {n_records:,} borrowers written to '{output_path}' in {elapsed:.1f}s "
+          f"({n_records / elapsed:,.0f} rows/s)")
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic borrower data")
+    parser.add_argument("--portfolio", type=int, default=None,
+                        help="Write this many borrowers to Parquet instead of the train/test CSVs")
+    parser.add_argument("--output", default="borrowers_portfolio.parquet")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--companies", type=int, default=19)
+    parser.add_argument("--company-concentration", type=float, default=0.0,
+                        help="Zipf exponent for company sizes (0 = uniform)")
+    parser.add_argument("--industry-concentration", type=float, default=0.0,
+                        help="Zipf exponent for industry sizes (0 = uniform)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    if args.portfolio:
+        generate_portfolio(args.output, args.portfolio, args.chunk_size, args.seed, args.companies,
+                           args.company_concentration, args.industry_concentration)
+        return
+
+    # Generate 100 training samples
+    df_train = generate_records(1, 100, args.seed)
+    df_train.to_csv('borrowers_train.csv', index=False)
+
+    # Generate 20 test samples
+    df_test = generate_records(101, 20, args.seed + 1)
+    df_test.to_csv('borrowers_test.csv', index=False)
 
-# Generate 20 test samples
-test_records = generate_records(101, 20)
-df_test = pd.DataFrame(test_records, columns=columns)
-df_test.to_csv('borrowers_test.csv', index=False)
+    print("✅ Training and test data generated: 'borrowers_train.csv' and 'borrowers_test.csv'")
 
-print("✅ Training and test data generated: 'borrowers_train.csv' and 'borrowers_test.csv'")
+if __name__ == "__main__":
+    main()
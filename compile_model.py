@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import joblib
+
+MODEL_PATH = "trained_model_xgb.pkl"
+
+def compiled_paths(model_path=MODEL_PATH):
+    """Where the compiled artifacts for a model file live"""
+    base, _ = os.path.splitext(model_path)
+    return {'treelite': base + ".so", 'onnx': base + ".onnx"}
+
+def _load_classifier(model_path):
+    model = joblib.load(model_path)
+    if model.get_params().get("objective") == "multi:softmax":
+        raise ValueError("multi:softmax models only output labels; retrain with objective='multi:softprob' to compile")
+    return model
+
+def best_rounds(booster):
+    """Boosting rounds the model predicts with: up to the early-stopping best iteration if one was recorded"""
+    best = booster.attr("best_iteration")
+    return int(best) + 1 if best is not None else booster.num_boosted_rounds()
+
+def export_treelite(model_path=MODEL_PATH, output_path=None, parallel_comp=4):
+    """Compile the booster to a native shared library with treelite/tl2cgen"""
+    import treelite
+    import tl2cgen
+
+    output_path = output_path or compiled_paths(model_path)['treelite']
+    model = _load_classifier(model_path)
+
+    # Only the trees XGBClassifier.predict uses, as in the ONNX and XGBoost paths
+    booster = model.get_booster()
+    tl_model = treelite.frontend.from_xgboost(booster[:best_rounds(booster)])
+    tl2cgen.export_lib(tl_model, toolchain="gcc", libpath=output_path,
+                       params={"parallel_comp": parallel_comp})
+    print(f"✅ Native predictor written to {output_path}")
+    return output_path
+
+def export_onnx(model_path=MODEL_PATH, output_path=None):
+    """Convert the booster to an ONNX graph for onnxruntime"""
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+
+    output_path = output_path or compiled_paths(model_path)['onnx']
+    model = _load_classifier(model_path)
+    n_features = len(model.get_booster().feature_names)
+
+    # The converter expects f0..fN feature names, column order is unchanged
+    booster = model.get_booster().copy()
+    booster.feature_names = None
+    model._Booster = booster
+
+    onnx_model = convert_xgboost(model, initial_types=[("input", FloatTensorType([None, n_features]))])
+    with open(output_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"✅ ONNX predictor written to {output_path}")
+    return output_path
+
+class XGBoostPredictor:
+    """Fallback: in-place prediction on the XGBoost booster"""
+    backend = "xgboost"
+
+    def __init__(self, model):
+        self.booster = model.get_booster()
+        self.rounds = best_rounds(self.booster)
+
+    def predict_proba(self, X):
+        return self.booster.inplace_predict(X, iteration_range=(0, self.rounds))
+
+class TreelitePredictor:
+    """Predictor backed by a tl2cgen-compiled shared library"""
+    backend = "treelite"
+
+    def __init__(self, libpath):
+        import tl2cgen
+        self._tl2cgen = tl2cgen
+        self.predictor = tl2cgen.Predictor(libpath)
+
+    def predict_proba(self, X):
+        output = self.predictor.predict(self._tl2cgen.DMatrix(X, dtype="float32"))
+        return output.reshape(len(X), -1)
+
+class OnnxPredictor:
+    """Predictor backed by an onnxruntime CPU session"""
+    backend = "onnx"
+
+    def __init__(self, onnx_path):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict_proba(self, X):
+        _, probabilities = self.session.run(None, {self.input_name: X})
+        return probabilities
+
+class FastModel:
+    """Trained model metadata plus the fastest available predictor"""
+
+    def __init__(self, model, predictor):
+        self.model = model
+        self.predictor = predictor
+        self.backend = predictor.backend
+        self.feature_names = list(model.get_booster().feature_names)
+        # train_pipeline.py trains on labels shifted to start at 0 and records the shift
+        label_offset = int(model.get_booster().attr("label_offset") or 0)
+        self.classes_ = model.classes_ - label_offset
+        # softmax models only expose hard labels
+        self.outputs_probabilities = model.get_params().get("objective") != "multi:softmax"
+
+    def predict_proba(self, X):
+        if not self.outputs_probabilities:
+            raise ValueError("multi:softmax models don't output probabilities")
+        return self.predictor.predict_proba(np.ascontiguousarray(X, dtype=np.float32))
+
+    def predict(self, X):
+        if not self.outputs_probabilities:
+            return self.model.predict(X)
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+def load_fast_predictor(model_path=MODEL_PATH, prefer=("treelite", "onnx")):
+    """Load a compiled predictor if one is present, otherwise fall back to XGBoost"""
+    model = joblib.load(model_path)
+    paths = compiled_paths(model_path)
+    model_mtime = os.path.getmtime(model_path)
+
+    for backend in prefer:
+        path = paths[backend]
+        # Ignore artifacts compiled from an older model file
+        if not os.path.exists(path) or os.path.getmtime(path) < model_mtime:
+            continue
+        try:
+            predictor = TreelitePredictor(path) if backend == "treelite" else OnnxPredictor(path)
+            return FastModel(model, predictor)
+        except Exception as e:
+            print(f"Could not load {backend} predictor {path}: {e}")
+
+    return FastModel(model, XGBoostPredictor(model))
+
+def _time_calls(fn, X, repeats):
+    fn(X)  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+def benchmark(model_path=MODEL_PATH, batch_rows=100_000, repeats=50):
+    """Compare single-row and batch latency of every backend against XGBClassifier.predict"""
+    model = joblib.load(model_path)
+    feature_names = list(model.get_booster().feature_names)
+    rng = np.random.default_rng(0)
+
+    batch = rng.integers(0, 3, size=(batch_rows, len(feature_names))).astype(np.float32)
+    single = batch[:1]
+
+    candidates = [("XGBClassifier.predict", lambda X: model.predict(pd.DataFrame(X, columns=feature_names)))]
+    candidates.append(("xgboost inplace", FastModel(model, XGBoostPredictor(model)).predict))
+
+    paths = compiled_paths(model_path)
+    if os.path.exists(paths['treelite']):
+        candidates.append(("treelite", FastModel(model, TreelitePredictor(paths['treelite'])).predict))
+    if os.path.exists(paths['onnx']):
+        candidates.append(("onnxruntime", FastModel(model, OnnxPredictor(paths['onnx'])).predict))
+
+    print(f"{'Backend':<24} {'1 row (ms)':>12} {f'{batch_rows:,} rows (ms)':>20} {'rows/s':>14}")
+    for name, predict in candidates:
+        single_ms = _time_calls(predict, single, repeats)
+        batch_ms = _time_calls(predict, batch, max(3, repeats // 10))
+        print(f"{name:<24} {single_ms:>12.3f} {batch_ms:>20.1f} {batch_rows / (batch_ms / 1000):>14,.0f}")
+
+def main():
+    """Compile the trained model and benchmark it"""
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+
+    for export in (export_treelite, export_onnx):
+        try:
+            export(model_path)
+        except ImportError as e:
+            print(f"Skipping {export.__name__}: {e}")
+
+    benchmark(model_path)
+
+if __name__ == "__main__":
+    main()
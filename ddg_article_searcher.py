@@ -2,16 +2,12 @@ import os
 import re
 import time
 from urllib.parse import quote
-from playwright.sync_api import sync_playwright
-import google.generativeai as genai
-from keys import GEMINI_KEY
-
-# Configure Gemini
-genai.configure(api_key=GEMINI_KEY)
-model = genai.GenerativeModel("gemini-2.0-flash-exp")
+import llm_router
+import cassette
 
 def scrape_duckduckgo_results(query, num_results=10):
     """Scrape search results from DuckDuckGo using Playwright"""
+    from playwright.sync_api import sync_playwright
     articles = []
     
     with sync_playwright() as p:
@@ -28,8 +24,7 @@ def scrape_duckduckgo_results(query, num_results=10):
             search_url = f"https://duckduckgo.com/?q={quote(query)}"
             print(f"Searching DuckDuckGo: {search_url}")
             
-            page.goto(search_url, wait_until="networkidle", timeout=30000)
-            page.wait_for_timeout(3000)
+            cassette.goto(page, search_url, wait_ms=3000, wait_until="networkidle", timeout=30000)
             
             # DuckDuckGo result selectors
             result_elements = page.query_selector_all('[data-testid="result"]')
@@ -124,7 +119,7 @@ Your response (just the numbers):
 """
     
     try:
-        response = model.generate_content(ranking_prompt)
+        response = llm_router.generate_content("ranking", ranking_prompt)
         ranking_text = response.text.strip()
         
         # Parse the ranking
@@ -187,7 +182,7 @@ Create a clean, informative summary:
 """
     
     try:
-        response = model.generate_content(summary_prompt)
+        response = llm_router.generate_content("article_summary", summary_prompt)
         return response.text.strip()
     except Exception as e:
         print(f"Error creating summary with Gemini: {e}")
@@ -285,7 +280,7 @@ def main():
                 print(f"✗ Failed: {query}")
             
             # Be polite to the servers
-            time.sleep(3)
+            cassette.sleep(3)
             
         except Exception as e:
             print(f"Error processing query '{query}': {e}")
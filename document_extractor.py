@@ -0,0 +1,215 @@
+import os
+import re
+import sys
+import time
+import tempfile
+from urllib.parse import urlparse, unquote
+import tracing
+import cassette
+
+# Limits for one document: bytes downloaded, pages read, and pages passed on
+MAX_BYTES = int(os.environ.get("LOAN_DOC_MAX_BYTES", str(20 * 1024 * 1024)))
+MAX_PAGES = int(os.environ.get("LOAN_DOC_MAX_PAGES", "60"))
+RELEVANT_PAGES = int(os.environ.get("LOAN_DOC_RELEVANT_PAGES", "6"))
+
+FETCH_TIMEOUT = 20          # seconds to connect / between chunks
+CHUNK_BYTES = 64 * 1024
+SPOOL_BYTES = 1024 * 1024   # downloads larger than this spill to a temp file
+TEXT_PAGE_CHARS = 3000      # plain-text documents are split into pages this long
+
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+TEXT_TYPES = {"text/plain", "text/csv", "text/markdown", "application/json", "application/xml", "text/xml"}
+SUFFIX_TYPES = {".pdf": "application/pdf", ".txt": "text/plain", ".csv": "text/csv", ".json": "application/json"}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/pdf,*/*;q=0.8",
+}
+
+STOP_WORDS = {"the", "and", "for", "with", "from", "next", "years", "year", "what", "will", "outlook", "future"}
+
+def content_type(value):
+    """Bare media type of a Content-Type header ("application/pdf; qs=1" -> "application/pdf")"""
+    return (value or "").split(";")[0].strip().lower()
+
+def type_from_url(url):
+    """Media type implied by the URL's file extension, or None"""
+    return SUFFIX_TYPES.get(os.path.splitext(urlparse(url).path)[1].lower())
+
+def is_document(media_type):
+    """True for responses the browser shouldn't render (PDFs, text, other binaries)"""
+    return bool(media_type) and media_type not in HTML_TYPES
+
+def _result(url, title, content, status, error=None, media_type="", pages=0):
+    return {'url': url, 'title': title, 'content': content, 'content_length': len(content),
+            'status': status, 'error': error, 'content_type': media_type, 'pages': pages}
+
+def _title_from_url(url):
+    name = os.path.basename(unquote(urlparse(url).path))
+    return os.path.splitext(name)[0].replace("_", " ").replace("-", " ") or url
+
+def download(response, max_bytes=MAX_BYTES):
+    """Stream a response body into a spooled temp file; None if it's over max_bytes"""
+    declared = response.headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        return None
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    size = 0
+    for chunk in response.iter_content(CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            spool.close()
+            return None
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+def iter_pdf_pages(reader, max_pages=MAX_PAGES):
+    """(page number, text) for each page of a pypdf reader, extracted one page at a time up to max_pages"""
+    for number, page in enumerate(reader.pages, 1):
+        if number > max_pages:
+            return
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            print(f"  ⚠️ Page {number} unreadable: {e}")
+            text = ""
+        yield number, text
+
+def iter_text_pages(fileobj, max_pages=MAX_PAGES, encoding="utf-8"):
+    """(page number, text) for a plain-text document, split on form feeds or every TEXT_PAGE_CHARS"""
+    text = fileobj.read(TEXT_PAGE_CHARS * max_pages * 4).decode(encoding, errors="replace")
+    pages = [p for p in text.split("\f") if p.strip()] if "\f" in text else \
+        [text[i:i + TEXT_PAGE_CHARS] for i in range(0, len(text), TEXT_PAGE_CHARS)]
+    for number, page in enumerate(pages[:max_pages], 1):
+        yield number, page
+
+def query_terms(query):
+    """Lowercase words of a search query worth matching on a page"""
+    return {w for w in re.findall(r"[a-z0-9]+", (query or "").lower()) if len(w) > 2 and w not in STOP_WORDS}
+
+def relevant_pages(pages, query=None, limit=RELEVANT_PAGES):
+    """Up to `limit` pages that mention the query terms most, in document order
+
+    Without a query (or when no page mentions it) the first pages are kept.
+    """
+    pages = [(number, text) for number, text in pages if text.strip()]
+    terms = query_terms(query)
+    if terms:
+        scored = [(sum(text.lower().count(term) for term in terms), number, text) for number, text in pages]
+        matching = sorted((s for s in scored if s[0] > 0), key=lambda s: (-s[0], s[1]))[:limit]
+        if matching:
+            return [(number, text) for _, number, text in sorted(matching, key=lambda s: s[1])]
+    return pages[:limit]
+
+def clean_text(text):
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n\s*\n\s*\n+", "\n\n", text)
+    return text.strip()
+
+def extract_pages(fileobj, media_type, url, query=None):
+    """Title, the relevant pages' text and how many pages were read"""
+    if media_type == "application/pdf":
+        from pypdf import PdfReader
+        reader = PdfReader(fileobj)
+        title = ((reader.metadata.title if reader.metadata else None) or "").strip() or _title_from_url(url)
+        pages = list(iter_pdf_pages(reader))
+    else:
+        title = _title_from_url(url)
+        pages = list(iter_text_pages(fileobj))
+
+    kept = relevant_pages(pages, query)
+    content = "\n\n".join(f"[Page {number}]\n{clean_text(text)}" for number, text in kept)
+    return title, content, len(pages)
+
+def _fetch(url, query):
+    """Document result for a URL, or None if it turned out to be an HTML page"""
+    import requests
+
+    expected = type_from_url(url)
+    try:
+        response = requests.get(url, headers=HEADERS, stream=True, timeout=FETCH_TIMEOUT, allow_redirects=True)
+    except requests.RequestException as e:
+        if expected is None:
+            return None      # let the browser try it
+        return _result(url, '', '', 'failed', str(e), expected)
+
+    with response:
+        media_type = content_type(response.headers.get("Content-Type")) or expected or ""
+        # Servers often send PDFs as a generic binary type
+        if media_type in ("application/octet-stream", "binary/octet-stream") and expected:
+            media_type = expected
+        if response.status_code >= 400 and (expected or is_document(media_type)):
+            return _result(url, '', '', 'failed', f"HTTP {response.status_code}", expected or media_type)
+        if not is_document(media_type):
+            return None
+        if media_type != "application/pdf" and media_type not in TEXT_TYPES:
+            return _result(url, '', '', 'failed', f"Unsupported content type {media_type}", media_type)
+
+        fileobj = download(response)
+    if fileobj is None:
+        return _result(url, '', '', 'failed', f"Larger than {MAX_BYTES // (1024 * 1024)} MB", media_type)
+
+    with fileobj:
+        try:
+            title, content, pages = extract_pages(fileobj, media_type, url, query)
+        except ImportError:
+            return _result(url, '', '', 'failed', "pypdf not installed (pip install pypdf)", media_type)
+        except Exception as e:
+            return _result(url, '', '', 'failed', f"Unreadable document: {e}", media_type)
+
+    status = 'success' if len(content) > 100 else 'low_content'
+    return _result(url, title, content, status, None, media_type, pages)
+
+def extract_document(url, query=None):
+    """Text of a PDF or other non-HTML document at `url`, in the scrapers' result format
+
+    Returns None for HTML pages, which the caller renders in the browser as before.
+    Documents are streamed with a size cap (LOAN_DOC_MAX_BYTES), read page by page up
+    to LOAN_DOC_MAX_PAGES, and only the pages most relevant to `query` are kept.
+    Failures come back as 'failed' results straight away, without browser retries.
+    """
+    # The content-type probe is recorded too (HTML as {"html": true}), so a replay
+    # makes the same document/browser decision without touching the network
+    request = {"url": url, "query": query or ""}
+    if cassette.replaying():
+        try:
+            result = cassette.load("document", request)
+        except cassette.CassetteMiss:
+            return None
+        if result.get("html"):
+            return None
+    else:
+        start = time.perf_counter()
+        result = _fetch(url, query)
+        if cassette.recording():
+            cassette.save("document", request, {"html": True} if result is None else result,
+                          time.perf_counter() - start)
+
+    if result is not None:
+        span = tracing.current_span()
+        span.set("content_type", result['content_type'])
+        span.set("pages", result['pages'])
+        span.set("bytes", result['content_length'])
+        if result['status'] == 'failed':
+            span.set("status", "failed")
+    return result
+
+def main():
+    """Usage: python document_extractor.py <url> [query]"""
+    if len(sys.argv) < 2:
+        print("Usage: python document_extractor.py <url> [query]")
+        return
+    result = extract_document(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    if result is None:
+        print("HTML page, not a document; the browser scrapers handle it")
+        return
+    if result['status'] == 'failed':
+        print(f"⚠️ {result['error']}")
+        return
+    print(f"✅ {result['title']} ({result['content_type']}, {result['pages']} pages read, "
+          f"{result['content_length']} chars kept)\n")
+    print(result['content'][:3000])
+
+if __name__ == "__main__":
+    main()
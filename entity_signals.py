@@ -0,0 +1,225 @@
+import os
+import time
+import pandas as pd
+import borrower_io
+
+SIGNAL_TABLE_PATH = "entity_signals.csv"
+
+SIGNAL_COLUMNS = ['entity_type', 'entity_name', 'attribute', 'criticality', 'explanation', 'as_of']
+
+# Which entity each risk attribute actually describes
+ENTITY_ATTRIBUTES = {
+    "company": [
+        "stock_performance_outlook",
+        "company_M_and_A_possibility",
+        "product_relevance"
+    ],
+    "industry": [
+        "industry_recession_or_growth",
+        "job_market_demand"
+    ],
+    "job_title": [
+        "job_automation_risk",
+        "skilled_obsolescence",
+        "replaceability_risk"
+    ],
+    "region": [
+        "pollution_projection",
+        "disease_risk_polluted_zone",
+        "financial_burden_children"
+    ]
+}
+
+ATTRIBUTE_ENTITY = {attr: entity for entity, attrs in ENTITY_ATTRIBUTES.items() for attr in attrs}
+
+# Attribute answered by each of the 12 generate_queries() queries, in order
+QUERY_ATTRIBUTES = [
+    "stock_performance_outlook",
+    "industry_recession_or_growth",
+    "job_automation_risk",
+    "job_market_demand",
+    "company_M_and_A_possibility",
+    "product_relevance",
+    "skilled_obsolescence",
+    "replaceability_risk",
+    "pollution_projection",
+    "disease_risk_polluted_zone",
+    None,  # college education cost is numeric, not a shared signal
+    "financial_burden_children"
+]
+
+def entity_keys(borrowers):
+    """Entity name per borrower for each entity type.
+
+    Region is keyed by location when the table has one, otherwise by industry
+    (the region queries are phrased as "{industry} region").
+    """
+    region = borrowers['industry']
+    if 'location' in borrowers.columns:
+        region = borrowers['location'].where(borrowers['location'].notna(), borrowers['industry'])
+
+    return pd.DataFrame({
+        "company": borrowers['company'],
+        "industry": borrowers['industry'],
+        "job_title": borrowers['job_title'],
+        "region": region
+    }, index=borrowers.index).astype(str).apply(lambda col: col.str.strip())
+
+def load_signal_table(path=SIGNAL_TABLE_PATH):
+    """Load the entity signal table, or an empty one if it doesn't exist yet"""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+    if borrower_io.is_parquet(path):
+        return borrower_io.read_table(path, categories=False)
+    return pd.read_csv(path, dtype={'entity_name': str, 'as_of': str})
+
+def save_signal_table(table, path=SIGNAL_TABLE_PATH):
+    """Write the entity signal table"""
+    borrower_io.write_table(table, path)
+    print(f"Saved {len(table)} entity signals to {path}")
+
+def add_signals(table, entity_type, entity_name, signals, as_of=None):
+    """Add one entity's signals as a new dated version.
+
+    `signals` maps attribute -> {"criticality": ..., "explanation": ...}.
+    Re-adding the same entity on the same date replaces that version.
+    """
+    if entity_type not in ENTITY_ATTRIBUTES:
+        raise ValueError(f"Unknown entity type: {entity_type}")
+
+    as_of = as_of or time.strftime('%Y-%m-%d')
+    rows = []
+    for attr, value in signals.items():
+        if ATTRIBUTE_ENTITY.get(attr) != entity_type:
+            continue
+        if isinstance(value, dict):
+            criticality = value.get("criticality", "")
+            explanation = value.get("explanation", "")
+        else:
+            criticality, explanation = value, ""
+        rows.append([entity_type, str(entity_name).strip(), attr, criticality, explanation, as_of])
+
+    if not rows:
+        return table
+
+    new_rows = pd.DataFrame(rows, columns=SIGNAL_COLUMNS)
+    combined = pd.concat([table, new_rows], ignore_index=True)
+    return combined.drop_duplicates(subset=['entity_type', 'entity_name', 'attribute', 'as_of'], keep='last')
+
+def add_borrower_signals(table, borrower_row, signals, as_of=None):
+    """Split one borrower's attribute values onto the entities they describe"""
+    keys = entity_keys(pd.DataFrame([borrower_row])).iloc[0]
+    for entity_type in ENTITY_ATTRIBUTES:
+        table = add_signals(table, entity_type, keys[entity_type], signals, as_of)
+    return table
+
+def add_borrower_signal_frame(table, borrowers, criticality, explanation=None, as_of=None):
+    """Bulk version of add_borrower_signals for a whole borrower table.
+
+    `criticality` (and optionally `explanation`) hold one column per attribute,
+    aligned with `borrowers`. Missing values are not stored.
+    """
+    as_of = as_of or time.strftime('%Y-%m-%d')
+    keys = entity_keys(borrowers)
+
+    parts = []
+    for attr in criticality.columns:
+        entity_type = ATTRIBUTE_ENTITY.get(attr)
+        if entity_type is None:
+            continue
+        parts.append(pd.DataFrame({
+            'entity_type': entity_type,
+            'entity_name': keys[entity_type].to_numpy(),
+            'attribute': attr,
+            'criticality': criticality[attr].astype(object).to_numpy(),
+            'explanation': explanation[attr].to_numpy() if explanation is not None else "",
+            'as_of': as_of
+        }))
+
+    if not parts:
+        return table
+    new_rows = pd.concat(parts, ignore_index=True)
+    new_rows = new_rows[new_rows['criticality'].notna()]
+
+    combined = pd.concat([table, new_rows[SIGNAL_COLUMNS]], ignore_index=True)
+    return combined.drop_duplicates(subset=['entity_type', 'entity_name', 'attribute', 'as_of'], keep='last')
+
+def latest_signals(table, as_of=None):
+    """Most recent version of each (entity, attribute) on or before `as_of`"""
+    if as_of is not None:
+        table = table[table['as_of'] <= as_of]
+    table = table.sort_values('as_of', kind='stable')
+    return table.drop_duplicates(subset=['entity_type', 'entity_name', 'attribute'], keep='last')
+
+def join_entity_signals(borrowers, table, as_of=None, attributes=None):
+    """Join entity signals onto the borrower table, one merge per entity type.
+
+    Returns a frame aligned with `borrowers` holding one column per attribute;
+    attributes with no known signal are left as NaN.
+    """
+    attributes = attributes or list(ATTRIBUTE_ENTITY)
+    current = latest_signals(table, as_of)
+    keys = entity_keys(borrowers)
+
+    joined = pd.DataFrame(index=borrowers.index)
+    for entity_type, entity_attrs in ENTITY_ATTRIBUTES.items():
+        wanted = [attr for attr in entity_attrs if attr in attributes]
+        if not wanted:
+            continue
+
+        wide = (current[current['entity_type'] == entity_type]
+                .pivot(index='entity_name', columns='attribute', values='criticality')
+                .reindex(columns=wanted))
+        merged = keys[[entity_type]].merge(wide, how='left', left_on=entity_type, right_index=True)
+        joined[wanted] = merged[wanted].values
+
+    return joined[[attr for attr in attributes if attr in joined.columns]]
+
+def fill_missing_signals(borrowers, table, as_of=None):
+    """Fill absent or empty attribute columns from the entity signal table"""
+    joined = join_entity_signals(borrowers, table, as_of)
+    borrowers = borrowers.copy()
+    for attr in joined.columns:
+        if attr in borrowers.columns:
+            if isinstance(borrowers[attr].dtype, pd.CategoricalDtype):
+                borrowers[attr] = borrowers[attr].astype(object)
+            borrowers[attr] = borrowers[attr].where(borrowers[attr].notna() & (borrowers[attr] != ""), joined[attr])
+        else:
+            borrowers[attr] = joined[attr]
+    return borrowers
+
+def known_attributes(borrower_row, table, as_of=None):
+    """Set of attributes already known for this borrower's entities"""
+    joined = join_entity_signals(pd.DataFrame([borrower_row]), table, as_of).iloc[0]
+    return {attr for attr, value in joined.items() if pd.notna(value) and value != ""}
+
+def missing_entities(borrowers, table, as_of=None):
+    """Entities that still need web/LLM work, by entity type"""
+    joined = join_entity_signals(borrowers, table, as_of)
+    keys = entity_keys(borrowers)
+
+    missing = {}
+    for entity_type, entity_attrs in ENTITY_ATTRIBUTES.items():
+        incomplete = joined[entity_attrs].isna().any(axis=1)
+        missing[entity_type] = sorted(keys.loc[incomplete, entity_type].unique())
+    return missing
+
+def main():
+    """Show which borrower entities already have precomputed signals"""
+    table = load_signal_table()
+    borrowers = borrower_io.read_table("loan_data.csv")
+
+    print("Entity Signal Table")
+    print("=" * 60)
+    print(f"Signals stored: {len(table)}")
+    if len(table):
+        print(f"Latest version: {table['as_of'].max()}")
+
+    missing = missing_entities(borrowers, table)
+    for entity_type, names in missing.items():
+        total = entity_keys(borrowers)[entity_type].nunique()
+        print(f"  {entity_type:<10} {total - len(names)}/{total} known", end="")
+        print(f"  (missing: {', '.join(names)})" if names else "")
+
+if __name__ == "__main__":
+    main()
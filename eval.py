@@ -1,8 +1,8 @@
 import pandas as pd
 import xgboost as xgb
+from predict_likelihood import prepare_features
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, confusion_matrix
 
 # -------------------------
@@ -20,18 +20,10 @@ X_test = test_df.drop(columns=drop_cols + ['loan_repayment_likelihood'])
 y_test = test_df['loan_repayment_likelihood']
 
 # -------------------------
-# Encode Low/Medium/High columns
+# Encode Low/Medium/High columns (Low=0, Medium=1, High=2, as at prediction time)
 # -------------------------
-cat_cols = ['stock_performance_outlook', 'industry_recession_or_growth',
-            'company_M_and_A_possibility', 'job_automation_risk',
-            'job_market_demand', 'product_relevance', 'skilled_obsolescence',
-            'replaceability_risk', 'pollution_projection',
-            'disease_risk_polluted_zone', 'financial_burden_children']
-
-le = LabelEncoder()
-for col in cat_cols:
-    X_train[col] = le.fit_transform(X_train[col])
-    X_test[col] = le.transform(X_test[col])
+X_train = prepare_features(X_train)
+X_test = prepare_features(X_test, list(X_train.columns))
 
 # -------------------------
 # Train XGBoost classifier
@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import numbers
+import pandas as pd
+import borrower_io
+
+STATE_PATH = "scoring_state.json"
+# 2: borrowers store extracted 'features' instead of a 'risk_score'
+STATE_VERSION = 2
+REPORT_PATH = "rescore_report.csv"
+
+# Loan fields that force a rescore when they change
+LOAN_FIELDS = [
+    "loan_amount",
+    "loan_start_year",
+    "repayments_on_time",
+    "late_payments",
+    "avg_days_late"
+]
+
+# Header lines that change on every run without the evidence changing
+VOLATILE_LINE_PREFIXES = ("Date:", "Date Scraped:", "Content Length:")
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def fingerprint_loan_fields(row):
+    """Hash of the borrower's loan fields"""
+    values = {}
+    for field in LOAN_FIELDS:
+        if field in row and pd.notna(row[field]):
+            value = row[field]
+            values[field] = float(value) if isinstance(value, numbers.Number) else str(value)
+    return _sha256(json.dumps(values, sort_keys=True))
+
+def fingerprint_evidence(texts):
+    """Hash of search results / page content, ignoring whitespace differences"""
+    if isinstance(texts, str):
+        texts = [texts]
+    normalized = [re.sub(r'\s+', ' ', text or '').strip() for text in texts]
+    return _sha256("\n".join(normalized))
+
+def evidence_files(borrower_id, articles_dir="clean_articles", web_content_dir="web_content"):
+    """Saved search results and scraped pages belonging to a borrower"""
+    files = []
+    borrower_id = str(borrower_id)
+
+    if os.path.exists(articles_dir):
+        pattern = re.compile(rf'^[A-Z]+_{re.escape(borrower_id)}_')
+        files.extend(os.path.join(articles_dir, f) for f in os.listdir(articles_dir)
+                     if f.endswith('.txt') and pattern.match(f))
+
+    borrower_dir = os.path.join(web_content_dir, f"borrower_{borrower_id}")
+    if os.path.exists(borrower_dir):
+        files.extend(os.path.join(borrower_dir, f) for f in os.listdir(borrower_dir) if f.endswith('.txt'))
+
+    return sorted(files)
+
+def fingerprint_evidence_files(borrower_id, articles_dir="clean_articles", web_content_dir="web_content"):
+    """Hash of a borrower's saved evidence files with run-specific header lines removed"""
+    texts = []
+    for filepath in evidence_files(borrower_id, articles_dir, web_content_dir):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if not line.startswith(VOLATILE_LINE_PREFIXES)]
+        texts.append(os.path.basename(filepath) + "\n" + "".join(lines))
+    return fingerprint_evidence(texts)
+
+def load_state(path=STATE_PATH):
+    """Load fingerprints and scores from the previous run"""
+    if not os.path.exists(path):
+        return {'borrowers': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version', 1) < STATE_VERSION:
+        print(f"⚠️ {path} was written by an older version, its borrowers will be rescored")
+    return state
+
+def save_state(state, path=STATE_PATH):
+    """Persist fingerprints and scores for the next run"""
+    state['version'] = STATE_VERSION
+    state['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+def check_borrower(state, borrower_id, loan_hash, evidence_hash, need_features=False):
+    """Compare a borrower's fingerprints with the previous run.
+
+    Entries from an older state version (a stored 'risk_score', no 'features')
+    always count as changed, and so do entries without features when the caller
+    reuses them (`need_features`). Returns (changed, reasons).
+    """
+    previous = state['borrowers'].get(str(borrower_id))
+    if previous is None:
+        return True, ["new borrower"]
+    if 'features' not in previous:
+        return True, ["stored by an older version"]
+    if need_features and previous['features'] is None:
+        return True, ["no stored features"]
+
+    reasons = []
+    if previous.get('loan_hash') != loan_hash:
+        reasons.append("loan fields changed")
+    if previous.get('evidence_hash') != evidence_hash:
+        reasons.append("evidence changed")
+    return bool(reasons), reasons
+
+def previous_result(state, borrower_id):
+    """Extracted features and explanation stored for a borrower by the previous run"""
+    previous = state['borrowers'][str(borrower_id)]
+    return previous.get('features') or {}, previous.get('explanation', '')
+
+def record_borrower(state, borrower_id, loan_hash, evidence_hash, features=None, explanation=None):
+    """Store a borrower's fingerprints and latest extracted features"""
+    state['borrowers'][str(borrower_id)] = {
+        'loan_hash': loan_hash,
+        'evidence_hash': evidence_hash,
+        'features': features,
+        'explanation': explanation,
+        'scored_at': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+def write_report(report_rows, path=REPORT_PATH):
+    """Save and print what was rescored and what was skipped"""
+    report = pd.DataFrame(report_rows, columns=['borrower_id', 'action', 'reasons'])
+    report.to_csv(path, index=False)
+
+    skipped = (report['action'] == 'skipped').sum()
+    print(f"\nIncremental run: {len(report) - skipped} rescored, {skipped} skipped (unchanged)")
+    for _, row in report[report['action'] == 'rescored'].iterrows():
+        print(f"  Borrower {row['borrower_id']}: {row['reasons']}")
+    print(f"Report saved to {path}")
+    return report
+
+def plan_rescoring(df, state, articles_dir="clean_articles", web_content_dir="web_content", update=False):
+    """Check every borrower's saved evidence files and loan fields against the previous run.
+
+    With `update`, the new fingerprints of changed borrowers are stored so the
+    next run compares against this one.
+    """
+    rows = []
+    for _, row in df.iterrows():
+        borrower_id = row['borrower_id']
+        loan_hash = fingerprint_loan_fields(row)
+        evidence_hash = fingerprint_evidence_files(borrower_id, articles_dir, web_content_dir)
+        changed, reasons = check_borrower(state, borrower_id, loan_hash, evidence_hash)
+
+        if changed and update:
+            record_borrower(state, borrower_id, loan_hash, evidence_hash)
+        rows.append([borrower_id, 'rescored' if changed else 'skipped', "; ".join(reasons)])
+    return rows
+
+def main():
+    """Usage: python incremental.py [borrowers.csv] [--update]"""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    update = "--update" in sys.argv
+    csv_file = args[0] if args else "loan_data.csv"
+
+    df = borrower_io.read_table(csv_file)
+    state = load_state()
+
+    print(f"Checking {len(df)} borrowers against {STATE_PATH}")
+    write_report(plan_rescoring(df, state, update=update))
+    if update:
+        save_state(state)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import importlib
+import threading
+import subprocess
+import traceback
+from contextlib import closing
+
+JOB_DB_PATH = os.environ.get("LOAN_JOB_DB", "jobs.db")
+
+# Job kind -> "module:function" run by the worker, imported only when a job needs it
+JOB_HANDLERS = {
+    "borrower_search": "batch_process:run_search_job"
+}
+
+# A worker that hasn't checked in for this long is considered dead
+WORKER_TIMEOUT = 15
+
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job was cancelled from the UI"""
+
+def connect(db_path=None):
+    """Open the queue database, creating the tables on first use"""
+    conn = sqlite3.connect(db_path or JOB_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            total INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            message TEXT NOT NULL DEFAULT '',
+            result TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS workers (
+            pid INTEGER PRIMARY KEY,
+            heartbeat REAL NOT NULL
+        );
+    """)
+    return conn
+
+def _job_dict(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+def submit_job(kind, payload, total=0, db_path=None):
+    """Queue a job and return its id"""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    with closing(connect(db_path)) as conn:
+        cursor = conn.execute(
+            "INSERT INTO jobs (kind, payload, total, created_at) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(payload), total, time.time())
+        )
+        return cursor.lastrowid
+
+def get_job(job_id, db_path=None):
+    """Current status, progress and result of one job"""
+    with closing(connect(db_path)) as conn:
+        return _job_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+def list_jobs(limit=20, db_path=None):
+    """Most recent jobs first"""
+    with closing(connect(db_path)) as conn:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [_job_dict(row) for row in rows]
+
+def cancel_job(job_id, db_path=None):
+    """Cancel a queued job right away, or ask a running one to stop at its next progress update"""
+    with closing(connect(db_path)) as conn:
+        conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                     (time.time(), job_id))
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+
+def claim_next_job(conn):
+    """Atomically move the oldest queued job to running"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+        if row is not None:
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row['id']))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return _job_dict(row)
+
+def _progress_callback(conn, job_id):
+    def progress(done, total=None, message=""):
+        """Record progress; raises JobCancelled once the job has been cancelled"""
+        if total is None:
+            conn.execute("UPDATE jobs SET done = ?, message = ? WHERE id = ?", (done, message, job_id))
+        else:
+            conn.execute("UPDATE jobs SET done = ?, total = ?, message = ? WHERE id = ?",
+                         (done, total, message, job_id))
+        if conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]:
+            raise JobCancelled()
+    return progress
+
+def _finish(conn, job_id, status, message, result=None):
+    conn.execute("UPDATE jobs SET status = ?, message = ?, result = ?, finished_at = ? WHERE id = ?",
+                 (status, message, json.dumps(result) if result is not None else None, time.time(), job_id))
+
+def _heartbeat(conn):
+    conn.execute("INSERT OR REPLACE INTO workers (pid, heartbeat) VALUES (?, ?)", (os.getpid(), time.time()))
+
+def _heartbeat_loop(db_path, stop):
+    # Own connection and thread, so long-running handlers still count as alive
+    with closing(connect(db_path)) as conn:
+        while not stop.wait(WORKER_TIMEOUT / 3):
+            _heartbeat(conn)
+
+def run_job(conn, job):
+    """Run one claimed job with its handler and store the outcome"""
+    module_name, function_name = JOB_HANDLERS[job['kind']].split(":")
+    handler = getattr(importlib.import_module(module_name), function_name)
+
+    print(f"Running job {job['id']} ({job['kind']})")
+    try:
+        result = handler(job['payload'], _progress_callback(conn, job['id']))
+        _finish(conn, job['id'], "done", "Completed", result)
+        print(f"✅ Job {job['id']} done")
+    except JobCancelled:
+        _finish(conn, job['id'], "cancelled", "Cancelled")
+        print(f"Job {job['id']} cancelled")
+    except Exception as e:
+        _finish(conn, job['id'], "failed", f"{e}\n{traceback.format_exc()}")
+        print(f"⚠️ Job {job['id']} failed: {e}")
+
+def run_worker(poll_interval=1.0, once=False, db_path=None):
+    """Process queued jobs until stopped (or until the queue is empty with `once`)"""
+    conn = connect(db_path)
+
+    # Jobs left running by a worker that died are picked up again
+    if not worker_alive(db_path):
+        conn.execute("UPDATE jobs SET status = 'queued', done = 0 WHERE status = 'running'")
+    print(f"Job worker {os.getpid()} polling {db_path or JOB_DB_PATH}")
+
+    _heartbeat(conn)
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat_loop, args=(db_path, stop), daemon=True).start()
+
+    try:
+        while True:
+            job = claim_next_job(conn)
+            if job is not None:
+                run_job(conn, job)
+            elif once:
+                return
+            else:
+                time.sleep(poll_interval)
+    finally:
+        stop.set()
+        conn.execute("DELETE FROM workers WHERE pid = ?", (os.getpid(),))
+        conn.close()
+
+def worker_alive(db_path=None):
+    """Whether some worker has checked in recently"""
+    with closing(connect(db_path)) as conn:
+        row = conn.execute("SELECT MAX(heartbeat) FROM workers").fetchone()
+        return row[0] is not None and time.time() - row[0] < WORKER_TIMEOUT
+
+def ensure_worker(db_path=None, log_path="job_worker.log"):
+    """Start a background worker process unless one is already running"""
+    if worker_alive(db_path):
+        return False
+
+    env = dict(os.environ, LOAN_JOB_DB=db_path or JOB_DB_PATH)
+    with open(log_path, "a", encoding="utf-8") as log:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker"],
+                         stdout=log, stderr=subprocess.STDOUT, env=env, start_new_session=True)
+
+    # Wait for the first heartbeat so a second caller doesn't start another worker
+    for _ in range(50):
+        if worker_alive(db_path):
+            break
+        time.sleep(0.1)
+    return True
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+
+    if command == "worker":
+        run_worker()
+    elif command == "cancel" and len(sys.argv) > 2:
+        cancel_job(int(sys.argv[2]))
+        print(f"Cancellation requested for job {sys.argv[2]}")
+    elif command == "list":
+        for job in list_jobs():
+            print(f"{job['id']:>5}  {job['kind']:<16} {job['status']:<10} {job['done']}/{job['total']}  "
+                  f"{job['message'].splitlines()[0] if job['message'] else ''}")
+    else:
+        print("Usage: python job_queue.py [worker | list | cancel <job_id>]")
+
+if __name__ == "__main__":
+    main()
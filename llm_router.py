@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import threading
+import tracing
+import cassette
+
+# Task -> model mapping lives in a JSON file so it can be tuned without code changes
+ROUTING_CONFIG_PATH = os.environ.get(
+    "LLM_ROUTING_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_routing.json")
+)
+
+_config = None
+_models = {}
+_usage = {}
+_lock = threading.Lock()
+
+def load_routing_config(config_path=None):
+    """Load (or reload) the task-to-model routing config"""
+    global _config
+
+    path = config_path or ROUTING_CONFIG_PATH
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    if "tasks" not in config or "models" not in config:
+        raise ValueError(f"Routing config {path} must define 'tasks' and 'models'")
+
+    for task, model_name in config["tasks"].items():
+        if model_name not in config["models"]:
+            raise ValueError(f"Task '{task}' routes to unknown model '{model_name}'")
+
+    with _lock:
+        _config = config
+    return config
+
+def get_routing_config():
+    """Return the active routing config, loading it on first use"""
+    if _config is None:
+        load_routing_config()
+    return _config
+
+def model_for_task(task):
+    """Resolve the model name a task is routed to"""
+    config = get_routing_config()
+    tasks = config["tasks"]
+    if task in tasks:
+        return tasks[task]
+    return tasks[config.get("default_task", "general")]
+
+def _get_model(model_name):
+    """Create the Gemini client for a model the first time it is needed"""
+    with _lock:
+        if model_name not in _models:
+            import google.generativeai as genai
+            from keys import GEMINI_KEY
+
+            if not _models:
+                genai.configure(api_key=GEMINI_KEY)
+            _models[model_name] = genai.GenerativeModel(model_name)
+        return _models[model_name]
+
+def _record_usage(task, model_name, elapsed, input_tokens, output_tokens, failed=False):
+    """Accumulate latency, token and cost figures for a task"""
+    prices = get_routing_config()["models"].get(model_name, {})
+    cost = (input_tokens * prices.get("input_cost_per_million", 0.0) +
+            output_tokens * prices.get("output_cost_per_million", 0.0)) / 1_000_000
+
+    with _lock:
+        stats = _usage.setdefault(task, {
+            'task': task,
+            'model': model_name,
+            'calls': 0,
+            'failures': 0,
+            'total_seconds': 0.0,
+            'max_seconds': 0.0,
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'cost_usd': 0.0
+        })
+        stats['model'] = model_name
+        stats['calls'] += 1
+        stats['failures'] += 1 if failed else 0
+        stats['total_seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        stats['input_tokens'] += input_tokens
+        stats['output_tokens'] += output_tokens
+        stats['cost_usd'] += cost
+
+def generate_content(task, prompt):
+    """Send a prompt to the model routed for this task and return the Gemini response"""
+    model_name = model_for_task(task)
+
+    with tracing.span("llm.generate", task=task, model=model_name, bytes=len(prompt)) as span:
+        start = time.perf_counter()
+        try:
+            # Replayed responses never touch the Gemini client
+            response = cassette.replay_llm(model_name, prompt)
+            if response is None:
+                response = _get_model(model_name).generate_content(prompt)
+        except Exception:
+            _record_usage(task, model_name, time.perf_counter() - start, 0, 0, failed=True)
+            raise
+        elapsed = time.perf_counter() - start
+        cassette.record_llm(model_name, prompt, response, elapsed)
+
+        usage = getattr(response, "usage_metadata", None)
+        input_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        _record_usage(task, model_name, elapsed, input_tokens, output_tokens)
+        span.set("input_tokens", input_tokens)
+        span.set("output_tokens", output_tokens)
+
+    return response
+
+def get_usage_report():
+    """Per-task usage rows with average latency filled in"""
+    with _lock:
+        rows = [dict(stats) for stats in _usage.values()]
+
+    for row in rows:
+        row['avg_seconds'] = row['total_seconds'] / row['calls'] if row['calls'] else 0.0
+    return sorted(rows, key=lambda row: row['task'])
+
+def reset_usage():
+    """Clear accumulated usage figures"""
+    with _lock:
+        _usage.clear()
+
+def print_usage_report():
+    """Print per-task latency and cost accounting"""
+    rows = get_usage_report()
+    if not rows:
+        print("No LLM calls recorded")
+        return
+
+    print("\nLLM usage by task:")
+    print(f"  {'Task':<18} {'Model':<24} {'Calls':>5} {'Avg s':>7} {'Max s':>7} {'In tok':>9} {'Out tok':>9} {'Cost $':>9}")
+    total_cost = 0.0
+    for row in rows:
+        total_cost += row['cost_usd']
+        print(f"  {row['task']:<18} {row['model']:<24} {row['calls']:>5} "
+              f"{row['avg_seconds']:>7.2f} {row['max_seconds']:>7.2f} "
+              f"{row['input_tokens']:>9} {row['output_tokens']:>9} {row['cost_usd']:>9.4f}")
+    print(f"  Total cost: ${total_cost:.4f}")
+
+if __name__ == "__main__":
+    config = get_routing_config()
+    print(f"Routing config: {ROUTING_CONFIG_PATH}")
+    for task in sorted(config["tasks"]):
+        print(f"  {task:<18} -> {model_for_task(task)}")
@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import argparse
+import importlib
+import subprocess
+
+_START = time.perf_counter()
+
+# Commands handed to an existing script's main(); the module is only imported when its command runs
+PASSTHROUGH = {
+    "train": ("train_pipeline", "Train with hyperparameter search (train_pipeline.py)"),
+    "benchmark": ("benchmark", "Offline end-to-end benchmark (benchmark.py)"),
+    "jobs": ("job_queue", "Background job worker/list/cancel (job_queue.py)"),
+    "convert": ("borrower_io", "Convert a table between CSV and Parquet (borrower_io.py)"),
+    "synth": ("collect_data", "Generate synthetic borrowers (collect_data.py)"),
+    "signals": ("entity_signals", "Entity signal table (entity_signals.py)"),
+    "compile": ("compile_model", "Compile the model to native/ONNX (compile_model.py)"),
+    "rescore-plan": ("incremental", "Which borrowers need rescoring (incremental.py)"),
+    "plan": ("quota_planner", "Projected SerpAPI calls for a borrower file (quota_planner.py)"),
+    "priority": ("priority_scheduler", "Borrowers by risk exposure (priority_scheduler.py)"),
+    "prune": ("query_pruning", "Queries the model says can be skipped (query_pruning.py)"),
+    "fast": ("snippet_scoring", "Provisional scores from search snippets (snippet_scoring.py)"),
+    "extract": ("document_extractor", "Text of a PDF/document URL (document_extractor.py)"),
+}
+
+# Modules whose cold import time `startup` reports
+STARTUP_MODULES = [
+    "llm_router", "borrower_serp_searcher", "borrower_ddg_searcher", "search_fusion", "web_content_scraper",
+    "advanced_web_scraper", "loan_repay_predictor", "merge", "job_queue", "borrower_io", "benchmark"
+]
+
+_import_seconds = 0.0
+
+def _load(module_name):
+    """Import a command's module, keeping track of how long imports take"""
+    global _import_seconds
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_seconds += time.perf_counter() - start
+    return module
+
+# ---------------- Commands ----------------
+
+def cmd_quota(args):
+    _load("borrower_serp_searcher").check_serpapi_quota()
+
+def cmd_urls(args):
+    urls_data = _load("advanced_web_scraper").extract_urls_from_files(args.articles_dir)
+    unique_urls = list(dict.fromkeys(url_data['url'] for url_data in urls_data))
+    print(f"Found {len(unique_urls)} unique URLs in {args.articles_dir}:")
+    for i, url in enumerate(unique_urls, 1):
+        print(f"{i:3d}. {url}")
+
+def cmd_search(args):
+    if args.engine == "fused":
+        _load("search_fusion").process_borrowers_from_csv(args.csv, args.output_dir, args.backends)
+        return
+    module = "borrower_serp_searcher" if args.engine == "serp" else "borrower_ddg_searcher"
+    _load(module).process_borrowers_from_csv(args.csv, args.output_dir)
+
+def cmd_scrape(args):
+    _load("web_content_scraper").scrape_all_urls(args.articles_dir, args.output_dir,
+                                                  use_gemini_summary=not args.no_summary)
+
+def cmd_predict(args):
+    _load("loan_repay_predictor").run_pipeline(args.input, args.output, incremental_mode=args.incremental,
+                                                prioritize=not args.file_order, time_budget=args.time_budget)
+
+def cmd_merge(args):
+    _load("merge").merge_csv_with_responses(args.csv, args.responses, args.output, workers=args.workers)
+
+def import_time_ms(module_name):
+    """Cold import time of a module in a fresh interpreter, or (None, error)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    # The module's own line comes last; its cumulative column includes everything it imported
+    line = [l for l in result.stderr.splitlines() if l.startswith("import time:")][-1]
+    return int(line.split("|")[1]) / 1000, None
+
+def cmd_startup(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--help"], capture_output=True)
+    print(f"loan_cli.py --help: {(time.perf_counter() - start) * 1000:.0f} ms (whole process)\n")
+
+    print(f"  {'Module':<24} {'Import ms':>10}")
+    for module_name in args.modules or STARTUP_MODULES:
+        ms, error = import_time_ms(module_name)
+        if ms is None:
+            print(f"  {module_name:<24} {'failed':>10}  {error}")
+        else:
+            print(f"  {module_name:<24} {ms:>10.1f}")
+
+def run_passthrough(command, argv):
+    module_name, _ = PASSTHROUGH[command]
+    module = _load(module_name)
+    sys.argv = [f"{module_name}.py"] + argv
+    module.main()
+
+# ---------------- Parser ----------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="loan_cli.py", description="Loan monitoring command line")
+    parser.add_argument("--timing", action="store_true", help="Print import and run time of the command")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+
+    p = sub.add_parser("quota", help="Check the SerpAPI account quota")
+    p.set_defaults(func=cmd_quota)
+
+    p = sub.add_parser("urls", help="List the URLs the scrapers would visit")
+    p.add_argument("--articles-dir", default="clean_articles")
+    p.set_defaults(func=cmd_urls)
+
+    p = sub.add_parser("search", help="Search articles for every borrower in a file")
+    p.add_argument("csv")
+    p.add_argument("--engine", choices=["serp", "ddg", "fused"], default="serp")
+    p.add_argument("--backends", nargs="+", default=None, help="Backends for --engine fused")
+    p.add_argument("--output-dir", default="clean_articles")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("scrape", help="Scrape the pages behind the saved search results")
+    p.add_argument("--articles-dir", default="clean_articles")
+    p.add_argument("--output-dir", default="web_content")
+    p.add_argument("--no-summary", action="store_true", help="Skip the Gemini page summaries")
+    p.set_defaults(func=cmd_scrape)
+
+    p = sub.add_parser("predict", help="Search, summarize and score every borrower")
+    p.add_argument("--input", default="loan_data.csv")
+    p.add_argument("--output", default="repayability_results.csv")
+    p.add_argument("--incremental", action="store_true")
+    p.add_argument("--file-order", action="store_true", help="Score in file order instead of highest exposure first")
+    p.add_argument("--time-budget", type=float, default=None, help="Stop after this many seconds")
+    p.set_defaults(func=cmd_predict)
+
+    p = sub.add_parser("merge", help="Merge per-borrower Gemini responses into the borrower table")
+    p.add_argument("csv")
+    p.add_argument("responses")
+    p.add_argument("output")
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("startup", help="Measure cold-start import time of the pipeline modules")
+    p.add_argument("modules", nargs="*")
+    p.set_defaults(func=cmd_startup)
+
+    for command, (_, help_text) in PASSTHROUGH.items():
+        p = sub.add_parser(command, help=help_text, add_help=False)
+        p.add_argument("args", nargs=argparse.REMAINDER)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        build_parser().print_help()
+        return
+
+    started = time.perf_counter()
+    try:
+        if args.command in PASSTHROUGH:
+            run_passthrough(args.command, args.args)
+        else:
+            args.func(args)
+    except ImportError as e:
+        print(f"⚠️ '{args.command}' needs a module that isn't available: {e}")
+        sys.exit(1)
+
+    if args.timing:
+        total = time.perf_counter() - _START
+        print(f"\n⏱️ {args.command}: imports {_import_seconds * 1000:.0f} ms, "
+              f"command {(time.perf_counter() - started - _import_seconds) * 1000:.0f} ms, "
+              f"total {total * 1000:.0f} ms since start")
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,18 @@
-import pandas as pd
-import requests
 import json
-from google.generativeai import configure, GenerativeModel
-from playwright.sync_api import sync_playwright
 from urllib.parse import quote
-import time
 import re
-from keys import GEMINI_KEY
+import sys
+import llm_router
+import tracing
+import cassette
 
-# --------------------- Gemini API Setup ---------------------
-configure(api_key=GEMINI_KEY)
-gemini = GenerativeModel("gemini-2.5-flash")
+# pandas and the table/scoring modules are imported inside the functions that need them,
+# so importing a single helper (e.g. from debug_search.py) stays cheap
 
 # --------------------- Load Borrower Data ---------------------
 def load_data(filepath):
-    df = pd.read_csv(filepath)
+    import borrower_io
+    df = borrower_io.read_table(filepath)
     return df
 
 # --------------------- Web Search Agent ---------------------
@@ -33,10 +31,12 @@ def generate_queries(job_title, company, industry, years_ahead=5):
         f"cost of college education in {industry} region over next {years_ahead} years",
         f"financial burden of children entering college in {industry} region"
     ]
+    return queries
 
 # Web scraping with Playwright
 def scrape_search_results(query, num_results=10):
     """Scrape search results from Google using Playwright with multiple fallback strategies"""
+    from playwright.sync_api import sync_playwright
     articles = []
     
     with sync_playwright() as p:
@@ -64,10 +64,8 @@ def scrape_search_results(query, num_results=10):
             search_url = f"https://www.google.com/search?q={quote(query)}&num={num_results}&hl=en"
             print(f"Navigating to: {search_url}")
             
-            page.goto(search_url, wait_until="networkidle", timeout=30000)
-            
             # Wait for results to load
-            page.wait_for_timeout(3000)
+            cassette.goto(page, search_url, wait_ms=3000, wait_until="networkidle", timeout=30000)
             
             # Debug: Check if we can see the page content
             page_title = page.title()
@@ -164,6 +162,7 @@ def scrape_search_results(query, num_results=10):
 
 def scrape_duckduckgo_results(query, num_results=10):
     """Fallback search using DuckDuckGo (more scraping-friendly)"""
+    from playwright.sync_api import sync_playwright
     articles = []
     
     with sync_playwright() as p:
@@ -180,8 +179,7 @@ def scrape_duckduckgo_results(query, num_results=10):
             search_url = f"https://duckduckgo.com/?q={quote(query)}"
             print(f"Trying DuckDuckGo: {search_url}")
             
-            page.goto(search_url, wait_until="networkidle", timeout=30000)
-            page.wait_for_timeout(3000)
+            cassette.goto(page, search_url, wait_ms=3000, wait_until="networkidle", timeout=30000)
             
             # DuckDuckGo result selectors
             result_elements = page.query_selector_all('[data-testid="result"]')
@@ -263,7 +261,7 @@ Your response (just the numbers):
 """
     
     try:
-        response = gemini.generate_content(ranking_prompt)
+        response = llm_router.generate_content("ranking", ranking_prompt)
         ranking_text = response.text.strip()
         
         # Parse the ranking
@@ -293,19 +291,17 @@ Your response (just the numbers):
         # Fallback: return first top_k articles
         return articles[:top_k]
 
+@tracing.traced("query")
 def search_web(query, borrower_id=None, num_results=3):
     """Main search function using Playwright + Gemini ranking with fallback options"""
+    tracing.current_span().set("query", query)
     print(f"Searching for: {query}")
     
-    # Try Google first
-    scraped_articles = scrape_search_results(query, num_results * 3)
-    
-    # If Google fails, try DuckDuckGo
-    if not scraped_articles:
-        print("Google search failed, trying DuckDuckGo...")
-        scraped_articles = scrape_duckduckgo_results(query, num_results * 3)
+    # Query the search backends in parallel and fuse their results
+    import search_fusion
+    scraped_articles = search_fusion.search(query, num_results * 3)
     
-    # If both fail, return a simple message
+    # If every backend fails, return a simple message
     if not scraped_articles:
         print(f"No articles found for query: {query}")
         # Create a minimal fallback response
@@ -345,7 +341,7 @@ def search_web(query, borrower_id=None, num_results=3):
         print(f"Error saving articles to file: {e}")
     
     # Be polite to the web servers
-    time.sleep(2)
+    cassette.sleep(2)
     
     return "\n\n".join(formatted_articles)
 
@@ -363,7 +359,7 @@ Act as a financial analyst. Based on the information below, assess the following
 TEXTS:
 {raw_texts}
 """
-    response = gemini.generate_content(full_prompt)
+    response = llm_router.generate_content("borrower_summary", full_prompt)
     return response.text
 
 # --------------------- Feature Extraction ---------------------
@@ -372,7 +368,7 @@ def extract_features_from_summary(summary_text):
 Extract the following as structured JSON (keys: stock_projection, industry_health, automation_risk, acquisition_risk, skill_relevance, product_demand) from this:
 {summary_text}
 """
-    response = gemini.generate_content(prompt)
+    response = llm_router.generate_content("json_extraction", prompt)
     try:
         return json.loads(response.text)
     except:
@@ -380,30 +376,185 @@ Extract the following as structured JSON (keys: stock_projection, industry_healt
         print(response.text)
         return {}
 
+# Extracted feature filled from each entity signal, and its value for the signal's criticality
+SIGNAL_FEATURES = {
+    "stock_performance_outlook": ("stock_projection", {"Low": "positive", "Medium": "neutral", "High": "negative"}),
+    "industry_recession_or_growth": ("industry_health", {"Low": "growing", "Medium": "stable", "High": "shrinking"}),
+    "job_automation_risk": ("automation_risk", {"Low": "low", "Medium": "medium", "High": "high"}),
+    "company_M_and_A_possibility": ("acquisition_risk", {"Low": "low", "Medium": "medium", "High": "high"}),
+    "skilled_obsolescence": ("skill_relevance", {"Low": "relevant", "Medium": "declining", "High": "obsolete"}),
+    "product_relevance": ("product_demand", {"Low": "growing", "Medium": "stable", "High": "declining"})
+}
+
+def signal_features(known):
+    """Extracted-feature values implied by known attribute criticalities ({attribute: Low/Medium/High})"""
+    features = {}
+    for attribute, (feature, values) in SIGNAL_FEATURES.items():
+        value = values.get(str(known.get(attribute, "")).strip().capitalize())
+        if value:
+            features[feature] = value
+    return features
+
 # --------------------- Scoring Function ---------------------
-def compute_risk_score(features):
+def compute_risk_score(features, rules=None):
+    """Score a single borrower; rule weights come from risk_weights.json"""
+    import risk_scoring
+    rules = rules if rules is not None else risk_scoring.load_rule_weights()
     score = 0
-    if features.get("automation_risk") == "high":
-        score += 2
-    if features.get("stock_projection") == "negative":
-        score += 2
-    if features.get("industry_health") == "shrinking":
-        score += 1
-    if features.get("skill_relevance") == "obsolete":
-        score += 2
+    for rule in rules:
+        if features.get(rule["feature"]) == rule["value"]:
+            score += rule["weight"]
     return score
 
 # --------------------- Main Pipeline ---------------------
-def process_borrower(row):
+@tracing.traced("borrower")
+def analyze_borrower(row, state=None, report=None, signal_table=None):
+    """Search and summarize one borrower, returning (features, summary, decided_class).
+
+    Queries whose attribute is already known (the borrower's row, or `signal_table` for
+    its company, industry, job and region) are not issued, and the known values fill the
+    matching features. `decided_class` is the trained model's class when query pruning
+    showed no search could change it; such a borrower is not searched and has no rule
+    risk score. With nothing left to search, no summary or extraction call is made.
+    With a `state` from a previous run, the summary and extraction steps are
+    skipped when neither the search results nor the loan fields changed.
+    """
+    tracing.current_span().set("borrower_id", str(row.get('borrower_id', '')))
     queries = generate_queries(row['job_title'], row['company'], row['industry'])
-    raw_info = "\n".join([search_web(q) for q in queries])
-    summary = summarize_external_signals(row['company'], row['job_title'], row['industry'], raw_info)
-    features = extract_features_from_summary(summary)
-    risk_score = compute_risk_score(features)
-    return risk_score, summary
+
+    # Answers already known: the entity signal table for this borrower's entities,
+    # overridden by values the borrower's own row already has
+    import pandas as pd
+    import query_pruning
+    from entity_signals import join_entity_signals
+    known = {}
+    if signal_table is not None and len(signal_table):
+        known = join_entity_signals(pd.DataFrame([row]), signal_table).iloc[0].dropna().to_dict()
+    known.update({feature: row[feature] for feature in query_pruning.QUERY_FEATURES
+                  if feature in row and pd.notna(row[feature]) and row[feature] != ""})
+    answered = {i for i, feature in enumerate(query_pruning.QUERY_FEATURES) if feature in known}
+    if answered:
+        print(f"Borrower {row.get('borrower_id', '')}: {len(answered)} of {len(queries)} queries already answered "
+              f"by the borrower file or the entity signal table")
+        tracing.current_span().set("cache_hits", len(answered))
+
+    # Skip queries whose answer can't change the trained model's predicted class
+    pruning = query_pruning.prune_queries(row, known=known)
+    decided = pruning['decided_class'] is not None and bool(pruning['unknown'])
+    # A decided borrower needs no evidence at all
+    pruned = set(range(len(queries))) - answered if decided else set(pruning['pruned'])
+    if pruned:
+        searches, llm_calls = query_pruning.savings(len(pruned), len(pruned) if decided else len(pruning['unknown']))
+        print(f"Borrower {row.get('borrower_id', '')}: skipping {len(pruned)} of {len(queries)} queries that can't change "
+              f"the prediction (saves {searches} searches, {llm_calls} LLM calls"
+              f"{'' if pruning['exact'] else '; estimated from sampled answers'})")
+        tracing.current_span().set("queries_pruned", len(pruned))
+    skip = answered | pruned
+    raw_info = "\n".join([search_web(q) for i, q in enumerate(queries) if i not in skip])
+
+    if state is not None:
+        import incremental
+        borrower_id = row['borrower_id']
+        loan_hash = incremental.fingerprint_loan_fields(row)
+        evidence_hash = incremental.fingerprint_evidence(raw_info)
+        changed, reasons = incremental.check_borrower(state, borrower_id, loan_hash, evidence_hash,
+                                                     need_features=True)
+
+        if not changed:
+            print(f"Borrower {borrower_id}: evidence and loan fields unchanged, reusing previous features")
+            tracing.current_span().set("cache_hits", len(answered) + 1)
+            report.append([borrower_id, 'skipped', ''])
+            features, summary = incremental.previous_result(state, borrower_id)
+            return {**features, **signal_features(known)}, summary, pruning['decided_class'] if decided else None
+
+    # Nothing was searched, so there is nothing to summarize or extract
+    if decided:
+        summary = (f"No search needed: the model predicts class {pruning['decided_class']} "
+                   f"whatever the open queries would return.")
+        features = {}
+    elif len(skip) == len(queries):
+        summary = "No search needed: every attribute is already known or can't change the prediction."
+        features = {}
+    else:
+        summary = summarize_external_signals(row['company'], row['job_title'], row['industry'], raw_info)
+        features = extract_features_from_summary(summary)
+
+    if state is not None:
+        incremental.record_borrower(state, borrower_id, loan_hash, evidence_hash, features, summary)
+        report.append([borrower_id, 'rescored', "; ".join(reasons)])
+
+    # Known attributes are filled in at scoring time, so a newer signal table version is always used
+    return {**features, **signal_features(known)}, summary, pruning['decided_class'] if decided else None
+
+def process_borrower(row, state=None, report=None):
+    """Search, summarize and score one borrower (no score when the model's class was decided)"""
+    features, summary, decided_class = analyze_borrower(row, state, report)
+    return (None if decided_class is not None else compute_risk_score(features)), summary
+
+def run_pipeline(input_path="loan_data.csv", output_path="repayability_results.csv", incremental_mode=False,
+                 chunksize=1000, prioritize=True, time_budget=None):
+    """Score every borrower, optionally only those whose inputs changed since the last run
+
+    With `prioritize` the highest-exposure borrowers are scored first and results are written
+    every few borrowers, so a run stopped early or cut off by `time_budget` (seconds) has
+    already scored the ones that matter most. Without it borrowers stream in file order.
+    """
+    import time
+    import pandas as pd
+    import borrower_io
+    import incremental
+    import risk_scoring
+    import priority_scheduler
+
+    from entity_signals import load_signal_table
+
+    state = incremental.load_state() if incremental_mode else None
+    signal_table = load_signal_table()
+    report = []
+    deadline = time.time() + time_budget if time_budget else None
+
+    if prioritize:
+        chunks = priority_scheduler.iter_prioritized_chunks(
+            input_path, min(chunksize, priority_scheduler.WRITE_EVERY), deadline)
+    else:
+        chunks = borrower_io.iter_borrower_chunks(input_path, chunksize=chunksize)
+
+    # Borrowers are read and written chunk by chunk, so large files start right away
+    with tracing.span("pipeline", input=input_path, incremental=incremental_mode) as run, \
+         borrower_io.TableWriter(output_path, split_text=True) as writer:
+        for chunk in chunks:
+            analyses = []
+            for _, row in chunk.iterrows():
+                if deadline is not None and time.time() >= deadline:
+                    break
+                analyses.append(analyze_borrower(row, state, report, signal_table))
+            chunk = chunk.iloc[:len(analyses)].copy()
+
+            # Score the whole chunk's feature table in one vectorized pass. Borrowers whose
+            # model class was decided by query pruning report that class, not a rule score.
+            if len(chunk):
+                features = pd.DataFrame([features for features, _, _ in analyses], index=chunk.index)
+                decided = pd.Series([decided for _, _, decided in analyses], index=chunk.index, dtype="Int8")
+                chunk['risk_score'] = pd.Series(risk_scoring.score_rules(features), index=chunk.index).where(decided.isna())
+                chunk['decided_class'] = decided
+                chunk['pruned'] = decided.notna()
+                chunk['explanation'] = [summary for _, summary, _ in analyses]
+                writer.write(chunk)
+                print(f"Scored {writer.rows} borrowers so far")
+            if deadline is not None and time.time() >= deadline:
+                print(f"⚠️ Time budget of {time_budget}s reached after {writer.rows} borrowers")
+                break
+        run.set("borrowers", writer.rows)
+
+    print(f"Done. Output saved to {output_path}")
+
+    if incremental_mode:
+        incremental.save_state(state)
+        incremental.write_report(report)
+    llm_router.print_usage_report()
+    tracing.flush()
 
 if __name__ == "__main__":
-    df = load_data("loan_data.csv")
-    df['risk_score'], df['explanation'] = zip(*df.apply(process_borrower, axis=1))
-    df.to_csv("repayability_results.csv", index=False)
-    print("Done. Output saved to repayability_results.csv")
+    budget = sys.argv[sys.argv.index("--time-budget") + 1] if "--time-budget" in sys.argv else None
+    run_pipeline(incremental_mode="--incremental" in sys.argv, prioritize="--file-order" not in sys.argv,
+                 time_budget=float(budget) if budget else None)
@@ -1,6 +1,8 @@
 import os
 import requests
 from bs4 import BeautifulSoup
+import tracing
+import cassette
 
 def generate_queries(job_title, company, industry, years_ahead=5):
     queries = [
@@ -19,7 +21,9 @@ def generate_queries(job_title, company, industry, years_ahead=5):
     ]
     return queries
 
+@tracing.traced("query")
 def search_and_save(query, borrower_id, serpapi_api_key, attribute_key, clean=True):
+    tracing.current_span().set("query", query)
     os.makedirs("articles/html", exist_ok=True)
     os.makedirs("articles/clean", exist_ok=True)
 
@@ -30,8 +34,10 @@ def search_and_save(query, borrower_id, serpapi_api_key, attribute_key, clean=Tr
         "num": "5"
     }
 
-    response = requests.get("https://serpapi.com/search", params=params, verify=False)
-    data = response.json()
+    with tracing.span("serpapi.search", bytes=0) as search:
+        response = cassette.get("https://serpapi.com/search", params=params, verify=False)
+        search.set("bytes", len(response.content))
+        data = response.json()
 
     saved_files = []
 
@@ -40,7 +46,9 @@ def search_and_save(query, borrower_id, serpapi_api_key, attribute_key, clean=Tr
             link = result.get("link")
             if link:
                 try:
-                    page = requests.get(link, timeout=10, verify=False)
+                    with tracing.span("scrape.url", url=link) as fetch:
+                        page = cassette.get(link, timeout=10, verify=False)
+                        fetch.set("bytes", len(page.content))
                     raw_html = page.text
 
                     html_filename = f"articles/html/{borrower_id}_{attribute_key}_{idx+1}.html"
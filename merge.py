@@ -1,57 +1,244 @@
-import pandas as pd
+import os
+import re
+import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import borrower_io
+from entity_signals import (SIGNAL_TABLE_PATH, load_signal_table, save_signal_table, add_borrower_signals,
+                            add_borrower_signal_frame, fill_missing_signals, missing_entities)
+from risk_attributes import RISK_ATTRIBUTES, as_risk_levels
 
-def merge_csv_with_text_json(csv_file_path, response_file_path, output_file_path):
-    # List of attribute columns (ordered)
-    attribute_columns = [
-        "stock_performance_outlook",
-        "industry_recession_or_growth",
-        "company_M_and_A_possibility",
-        "job_automation_risk",
-        "job_market_demand",
-        "product_relevance",
-        "replaceability_risk",
-        "pollution_projection",
-        "disease_risk_polluted_zone",
-        "financial_burden_children"
-    ]
-
-    # Load CSV
-    df = pd.read_csv(csv_file_path)
-
-    # Read response.txt
-    with open(response_file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+def parse_response_text(content):
+    """Parse one Gemini response and map each attribute column to its criticality and explanation"""
+    content = content.strip()
 
-    # Remove "json" word
+    # Remove "json" word (and code fences, if Gemini added them)
+    if content.startswith("```"):
+        content = content.strip("`").strip()
     if content.startswith("json"):
         json_str = content[len("json"):].strip()
     else:
         json_str = content
 
     # Load as JSON object
-    response_json = json.loads(json_str)
+    return parse_response_json(json.loads(json_str))
+
+def attribute_key(name):
+    """Normalized attribute name: "Company M&A Possibility" and "company_M_and_A_possibility" match"""
+    name = str(name).strip().lower().replace("&", "_and_")
+    return re.sub(r"[^a-z0-9]+", "_", name).strip("_")
+
+ATTRIBUTE_KEYS = {attribute_key(attr): attr for attr in RISK_ATTRIBUTES}
+
+def parse_response_json(response_json):
+    """Map an already-parsed response object onto RISK_ATTRIBUTES by key name.
+
+    Raises ValueError naming any unknown or missing attributes, so a response
+    is never merged into the wrong columns.
+    """
+    if not isinstance(response_json, dict):
+        raise ValueError("response is not a JSON object")
+
+    signals = {}
+    unknown = []
+    for key, value in response_json.items():
+        attr_name = ATTRIBUTE_KEYS.get(attribute_key(key))
+        if attr_name is None:
+            unknown.append(str(key))
+            continue
+        value = value if isinstance(value, dict) else {}
+        signals[attr_name] = {
+            "criticality": value.get("criticality", ""),
+            "explanation": value.get("explanation", "")
+        }
 
-    # Get criticality values in order
-    criticality_values = []
-    for key in response_json:
-        crit = response_json[key].get("criticality", "")
-        criticality_values.append(crit)
+    missing = [attr for attr in RISK_ATTRIBUTES if attr not in signals]
+    if unknown or missing:
+        problems = []
+        if unknown:
+            problems.append(f"unknown attributes: {', '.join(unknown)}")
+        if missing:
+            problems.append(f"missing attributes: {', '.join(missing)}")
+        raise ValueError("; ".join(problems))
+    return signals
 
-    # Check number of attributes matches
-    if len(criticality_values) != len(attribute_columns):
-        raise ValueError("Number of attributes in response does not match expected attribute columns!")
+def parse_response_file(response_file_path):
+    """Read a Gemini response file and map each attribute column to its criticality and explanation"""
+    with open(response_file_path, "r", encoding="utf-8") as f:
+        return parse_response_text(f.read())
+
+def merge_csv_with_text_json(csv_file_path, response_file_path, output_file_path, signal_table_path=None):
+    # Load CSV
+    df = borrower_io.read_table(csv_file_path)
 
-    # Add each attribute column to the CSV DataFrame
-    for attr_name, crit_value in zip(attribute_columns, criticality_values):
-        df[attr_name] = crit_value
+    signals = parse_response_file(response_file_path)
+
+    # Add each attribute column to the CSV DataFrame, encoded as Low/Medium/High
+    criticality = pd.Series({attr: signal["criticality"] for attr, signal in signals.items()}, dtype=object)
+    levels = as_risk_levels(criticality)
+    invalid = levels.isna() & criticality.notna() & (criticality != "")
+    if invalid.any():
+        print(f"⚠️ Invalid criticality for {', '.join(levels.index[invalid])}, left missing")
+    for attr_name in signals:
+        df[attr_name] = levels[attr_name]
+
+    # Store the values on their company/industry/job/region so later borrowers can reuse them.
+    # The response describes one borrower, so it is only recorded for a one-row table.
+    if signal_table_path:
+        if len(df) == 1:
+            table = load_signal_table(signal_table_path)
+            table = add_borrower_signals(table, df.iloc[0], signals)
+            save_signal_table(table, signal_table_path)
+        else:
+            print(f"⚠️ One response for {len(df)} borrowers, not recorded in {signal_table_path} "
+                  f"(use merge_csv_with_responses with a response per borrower)")
 
     # Save merged CSV
-    df.to_csv(output_file_path, index=False)
+    borrower_io.write_table(df, output_file_path)
     print(f"✅ Combined CSV saved to: {output_file_path}")
 
+def borrower_id_from_path(path):
+    """Borrower id from a per-borrower response file name, e.g. response_101.txt -> 101, response_B-7.json -> B-7"""
+    borrower_id = re.sub(r"^response[_-]?", "", os.path.splitext(os.path.basename(path))[0])
+    if not borrower_id:
+        raise ValueError("file name has no borrower id")
+    return borrower_id
+
+def validate_criticality(criticality):
+    """Encode criticality values, splitting off responses with anything but Low/Medium/High.
+
+    Returns (levels, errors) where `levels` only holds the valid responses.
+    """
+    levels = criticality.apply(as_risk_levels)
+    invalid = levels.isna() & criticality.notna()
+    bad_rows = invalid.any(axis=1)
+
+    errors = [f"borrower {borrower_id}: invalid criticality for {', '.join(invalid.columns[row])}"
+              for borrower_id, row in zip(criticality.index[bad_rows], invalid[bad_rows].to_numpy())]
+    return levels[~bad_rows], errors
+
+def _parse_response_item(item):
+    """Parse one response file or JSONL line; returns (borrower_id, signals, error)"""
+    source, line = item
+    try:
+        if line is None:
+            borrower_id = borrower_id_from_path(source)
+            signals = parse_response_file(source)
+        else:
+            record = json.loads(line)
+            borrower_id = str(record.pop("borrower_id")).strip()
+            response = record.get("response", record)
+            signals = parse_response_text(response) if isinstance(response, str) else parse_response_json(response)
+        return borrower_id, signals, None
+    except Exception as e:
+        return None, None, f"{source}: {e}"
+
+def _response_items(responses_path):
+    if os.path.isdir(responses_path):
+        files = sorted(os.path.join(responses_path, name) for name in os.listdir(responses_path)
+                       if name.endswith((".txt", ".json")))
+        return [(path, None) for path in files]
+
+    with open(responses_path, "r", encoding="utf-8") as f:
+        return [(f"{responses_path}:{i}", line) for i, line in enumerate(f, 1) if line.strip()]
+
+def load_responses(responses_path, workers=None):
+    """Parse a directory of per-borrower response files or a JSONL file in parallel.
+
+    Returns (criticality, explanation, errors): two frames indexed by borrower_id
+    with one column per attribute (criticality as Low/Medium/High categoricals),
+    and the responses that failed to parse or validate.
+    """
+    items = _response_items(responses_path)
+    workers = workers or min(len(items) // 500 + 1, os.cpu_count() or 1)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_response_item, items, chunksize=max(1, len(items) // (workers * 4))))
+    else:
+        results = [_parse_response_item(item) for item in items]
+
+    errors = [error for _, _, error in results if error]
+    parsed = [(borrower_id, signals) for borrower_id, signals, error in results if not error]
+
+    borrower_ids = pd.Index([borrower_id for borrower_id, _ in parsed], name="borrower_id")
+    criticality = pd.DataFrame([{attr: s["criticality"] for attr, s in signals.items()} for _, signals in parsed],
+                               index=borrower_ids, columns=RISK_ATTRIBUTES)
+    explanation = pd.DataFrame([{attr: s["explanation"] for attr, s in signals.items()} for _, signals in parsed],
+                               index=borrower_ids, columns=RISK_ATTRIBUTES)
+
+    # A borrower answered twice keeps its last response
+    keep = ~borrower_ids.duplicated(keep="last")
+    criticality, invalid = validate_criticality(criticality[keep])
+    return criticality, explanation[keep].loc[criticality.index], errors + invalid
+
+def merge_csv_with_responses(csv_file_path, responses_path, output_file_path, signal_table_path=None, workers=None):
+    """Join per-borrower Gemini responses (directory or JSONL) onto the borrower table by borrower_id"""
+    df = borrower_io.read_table(csv_file_path, categories=False)
+    criticality, explanation, errors = load_responses(responses_path, workers)
+
+    # One left join for the whole table, rows keep their order
+    ids = df["borrower_id"].astype(str)
+    joined = criticality.reindex(ids).set_axis(df.index)
+    for attr in RISK_ATTRIBUTES:
+        values = joined[attr].astype(object)
+        if attr in df.columns:
+            df[attr] = df[attr].where(values.isna(), values)
+        else:
+            df[attr] = values
+
+    matched = ids.isin(criticality.index)
+
+    # Store the values on their company/industry/job/region so later borrowers can reuse them
+    if signal_table_path:
+        table = load_signal_table(signal_table_path)
+        table = add_borrower_signal_frame(table, df[matched], joined[matched],
+                                          explanation.reindex(ids).set_axis(df.index)[matched])
+        save_signal_table(table, signal_table_path)
+
+    borrower_io.write_table(df, output_file_path)
+
+    unused = criticality.index.difference(pd.Index(ids))
+    print(f"✅ Merged responses for {int(matched.sum())}/{len(df)} borrowers into: {output_file_path}")
+    if len(unused):
+        print(f"⚠️ {len(unused)} responses have no matching borrower_id: {', '.join(map(str, unused[:10]))}")
+    if errors:
+        print(f"⚠️ {len(errors)} responses failed validation:")
+        for error in errors[:10]:
+            print(f"  {error}")
+
+    return {'matched': int(matched.sum()), 'unmatched_borrowers': int((~matched).sum()),
+            'unused_responses': len(unused), 'errors': errors}
+
+def merge_csv_with_entity_signals(csv_file_path, output_file_path, signal_table_path=SIGNAL_TABLE_PATH, as_of=None):
+    """Build the processed borrower CSV from precomputed entity signals (no web or LLM calls)"""
+    df = borrower_io.read_table(csv_file_path)
+    table = load_signal_table(signal_table_path)
+
+    merged = fill_missing_signals(df, table, as_of)
+
+    missing = {k: v for k, v in missing_entities(df, table, as_of).items() if v}
+    if missing:
+        print("⚠️ Some entities have no precomputed signals yet:")
+        for entity_type, names in missing.items():
+            print(f"  {entity_type}: {', '.join(names)}")
+
+    borrower_io.write_table(merged, output_file_path)
+    print(f"✅ Combined CSV saved to: {output_file_path}")
+    return missing
+
 # Example usage
 if __name__ == "__main__":
+    # Bulk mode: python merge.py <borrowers.csv> <responses dir|responses.jsonl> <output.csv> [--record-signals]
+    # --record-signals also stores each borrower's values in the entity signal table
+    record_signals = "--record-signals" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--record-signals"]
+    if len(args) == 3:
+        merge_csv_with_responses(args[0], args[1], args[2],
+                                 signal_table_path=SIGNAL_TABLE_PATH if record_signals else None)
+        sys.exit(0)
+
     csv_file_path = "./your_uploaded_borrower_file.csv"
     response_file_path = "./responses/response.txt"
     output_file_path = "./processed/processed_borrower.csv"
@@ -1,6 +1,6 @@
 import pandas as pd
 import xgboost as xgb
-from sklearn.preprocessing import LabelEncoder
+from predict_likelihood import prepare_features
 from sklearn.metrics import classification_report
 
 # Load data
@@ -15,17 +15,9 @@ y_train = train_df['loan_repayment_likelihood']
 X_test = test_df.drop(columns=drop_cols + ['loan_repayment_likelihood'])
 y_test = test_df['loan_repayment_likelihood']
 
-# Encode categorical (Low/Medium/High) columns numerically
-cat_cols = ['stock_performance_outlook', 'industry_recession_or_growth',
-            'company_M_and_A_possibility', 'job_automation_risk',
-            'job_market_demand', 'product_relevance', 'skilled_obsolescence',
-            'replaceability_risk', 'pollution_projection',
-            'disease_risk_polluted_zone', 'financial_burden_children']
-
-le = LabelEncoder()
-for col in cat_cols:
-    X_train[col] = le.fit_transform(X_train[col])
-    X_test[col] = le.transform(X_test[col])
+# Encode Low/Medium/High columns with the shared encoding (Low=0, Medium=1, High=2)
+X_train = prepare_features(X_train)
+X_test = prepare_features(X_test, list(X_train.columns))
 
 # Train XGBoost model
 model = xgb.XGBClassifier(objective='multi:softmax', num_class=5, eval_metric='mlogloss', use_label_encoder=False)
@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from predict_likelihood import prepare_features
+from compile_model import load_fast_predictor
+import borrower_io
+
+MODEL_PATH = "trained_model_xgb.pkl"
+
+class ModelServer:
+    """Keeps one XGBoost model loaded and micro-batches concurrent prediction requests
+
+    Uses the compiled treelite/ONNX predictor when one has been exported
+    (see compile_model.py), otherwise the XGBoost booster itself.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, max_batch_rows=4096, max_wait_ms=5, latency_window=10000):
+        self.model_path = model_path
+        self.model_mtime = os.path.getmtime(model_path)
+        self.model = load_fast_predictor(model_path)
+        self.feature_names = self.model.feature_names
+
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self._stats_lock = threading.Lock()
+
+        self._worker = threading.Thread(target=self._run, name="model-server", daemon=True)
+        self._worker.start()
+
+    def predict_batch(self, borrowers):
+        """Predict labels and class probabilities for a borrower table, bypassing the queue"""
+        X = prepare_features(borrowers, self.feature_names)
+
+        if not self.model.outputs_probabilities:
+            return self.model.predict(X), None
+
+        probabilities = self.model.predict_proba(X)
+        labels = self.model.classes_[probabilities.argmax(axis=1)]
+        return labels, probabilities
+
+    def submit(self, borrowers):
+        """Queue a borrower table (or a single borrower dict) and return a Future of (labels, probabilities)"""
+        if isinstance(borrowers, dict):
+            borrowers = pd.DataFrame([borrowers])
+        future = Future()
+        self._queue.put((borrowers, future, time.perf_counter()))
+        return future
+
+    def predict(self, borrowers, timeout=None):
+        """Blocking predict through the micro-batcher"""
+        return self.submit(borrowers).result(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            # Collect whatever else arrives within the wait window
+            batch = [item]
+            rows = len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while rows < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch):
+        combined = pd.concat([frame for frame, _, _ in batch], ignore_index=True)
+        try:
+            labels, probabilities = self.predict_batch(combined)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        offset = 0
+        for frame, future, submitted_at in batch:
+            end = offset + len(frame)
+            future.set_result((labels[offset:end],
+                               probabilities[offset:end] if probabilities is not None else None))
+            offset = end
+
+            with self._stats_lock:
+                self._latencies.append(finished - submitted_at)
+
+        with self._stats_lock:
+            self._batch_sizes.append(len(batch))
+
+    def latency_stats(self):
+        """p50/p99 request latency (ms) and average requests per model call"""
+        with self._stats_lock:
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = list(self._batch_sizes)
+
+        if len(latencies) == 0:
+            return {'requests': 0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'avg_batch_requests': 0.0}
+
+        return {
+            'requests': len(latencies),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'avg_batch_requests': sum(batch_sizes) / len(batch_sizes)
+        }
+
+    def close(self):
+        """Stop the batching thread"""
+        self._queue.put(None)
+        self._worker.join()
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+def get_model_server(model_path=MODEL_PATH):
+    """Process-wide server for a model file, reloaded only when the file changes"""
+    with _servers_lock:
+        server = _servers.get(model_path)
+        if server is not None and server.model_mtime != os.path.getmtime(model_path):
+            server.close()
+            server = None
+        if server is None:
+            server = ModelServer(model_path)
+            _servers[model_path] = server
+        return server
+
+def close(model_path=None):
+    """Stop and forget the shared server for a model file (every server if None)"""
+    with _servers_lock:
+        paths = list(_servers) if model_path is None else [model_path]
+        servers = [_servers.pop(path) for path in paths if path in _servers]
+    for server in servers:
+        server.close()
+
+def reload(model_path=MODEL_PATH):
+    """Load the model file again even if it hasn't changed, replacing the shared server"""
+    close(model_path)
+    return get_model_server(model_path)
+
+def main():
+    """Fire concurrent single-borrower requests at the server and report latency"""
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "./processed/processed_borrower.csv"
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    df = borrower_io.read_table(csv_path)
+    server = get_model_server()
+    rows = [df.iloc[[i % len(df)]] for i in range(n_requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(server.predict, rows))
+    elapsed = time.perf_counter() - start
+
+    stats = server.latency_stats()
+    print(f"Requests: {stats['requests']} in {elapsed:.2f}s ({n_requests / elapsed:,.0f} req/s)")
+    print(f"Latency p50: {stats['p50_ms']:.2f} ms, p99: {stats['p99_ms']:.2f} ms")
+    print(f"Average requests per model call: {stats['avg_batch_requests']:.1f}")
+    print(f"Predictor backend: {server.model.backend}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from predict_likelihood import predict_likelihood  # Your function from above
+from ui_cache import cached_predictions, get_cached_model_server, cache_controls
 
 # File paths
 csv_file_path = "./processed/processed_borrower.csv"
@@ -8,13 +8,16 @@ model_path = "./trained_model_xgb.pkl"
 
 st.title("Borrower Repayment Likelihood")
 
+cache_controls()
+
 if st.button("Show Likelihood Prediction"):
-    # Predict
-    predictions, probabilities = predict_likelihood(csv_file_path, model_path)
+    # Predict (cached until the CSV or the model file changes)
+    predictions, probabilities = cached_predictions(csv_file_path, model_path)
 
     # For now, just show first borrower prediction
     pred_label = predictions[0]
-    pred_prob = probabilities[0]
+    # multi:softmax models only return labels
+    probability_line = f"<p><b>Probabilities:</b> {probabilities[0]}</p>" if probabilities is not None else ""
 
     # Create overlay effect with CSS
     st.markdown(
@@ -51,7 +54,7 @@ if st.button("Show Likelihood Prediction"):
         <div class="popup">
             <h3>Repayment Likelihood</h3>
             <p><b>Predicted Label:</b> {pred_label}</p>
-            <p><b>Probabilities:</b> {pred_prob}</p>
+            {probability_line}
             <p><i>Explanation: To be added later here...</i></p>
             <button onclick="window.location.reload();">Close</button>
         </div>
@@ -59,5 +62,8 @@ if st.button("Show Likelihood Prediction"):
         unsafe_allow_html=True,
     )
 
+    stats = get_cached_model_server(model_path).latency_stats()
+    st.caption(f"Model server: {stats['requests']} requests, p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+
 else:
     st.write("Click the button above to see the likelihood as a pop-up.")
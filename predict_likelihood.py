@@ -1,52 +1,58 @@
 import pandas as pd
-import joblib
+import borrower_io
+from entity_signals import load_signal_table, fill_missing_signals
+from risk_scoring import build_feature_matrix
+from risk_attributes import RISK_ATTRIBUTES
+from compile_model import load_fast_predictor
 
-def prepare_features(df):
+DROP_COLS = [
+    "borrower_id",
+    "borrower_name",
+    "job_title",
+    "company",
+    "industry",
+    "location"
+]
+
+CATEGORICAL_COLS = RISK_ATTRIBUTES
+
+def prepare_features(df, feature_names=None):
     # Drop columns you don't want
-    df = df.drop(columns=[
-        "borrower_id",
-        "borrower_name",
-        "job_title",
-        "company",
-        "industry",
-        "location"
-    ])
-
-    # Encode categorical columns
-    categorical_cols = [
-        "stock_performance_outlook",
-        "industry_recession_or_growth",
-        "company_M_and_A_possibility",
-        "job_automation_risk",
-        "job_market_demand",
-        "product_relevance",
-        "skilled_obsolescence",
-        "replaceability_risk",
-        "pollution_projection",
-        "disease_risk_polluted_zone",
-        "financial_burden_children"
-    ]
-
-    for col in categorical_cols:
-        df[col] = df[col].map({"Low": 0, "Medium": 1, "High": 2})
-
-    return df
+    feature_names = feature_names or [col for col in df.columns if col not in DROP_COLS]
+
+    # Encode all Low/Medium/High columns in one pass (Low=0, Medium=1, High=2)
+    return build_feature_matrix(df, feature_names, CATEGORICAL_COLS)
+
+def load_borrowers(csv_path):
+    """Processed borrower table with missing attributes filled from the entity signals"""
+    df = borrower_io.read_table(csv_path)
+    return fill_missing_signals(df, load_signal_table())
+
+def predict_likelihood(csv_path, model_path="trained_model_xgb.pkl"):
+    """Predict labels and class probabilities for every borrower in the CSV.
+
+    The model stays loaded in a shared ModelServer between calls.
+    """
+    from model_server import get_model_server
+
+    df = load_borrowers(csv_path)
+    return get_model_server(model_path).predict(df)
 
 def main():
     # Path to processed CSV
     csv_path = "./processed/processed_borrower.csv"
 
-    # Load CSV
-    df = pd.read_csv(csv_path)
+    # Load CSV, attributes not in the CSV come from the precomputed entity signals
+    df = load_borrowers(csv_path)
 
     # Save borrower ids and names for reference later
     borrower_info = df[["borrower_id", "borrower_name"]]
 
-    # Prepare features
-    X = prepare_features(df.copy())
+    # Load trained model (compiled predictor if one was exported)
+    model = load_fast_predictor("trained_model_xgb.pkl")
 
-    # Load trained model
-    model = joblib.load("trained_model_xgb.pkl")
+    # Prepare features in the column order the model was trained on
+    X = prepare_features(df, model.feature_names)
 
     # Predict likelihood
     predictions = model.predict(X)
@@ -57,7 +63,7 @@ def main():
 
     # Save output to new CSV
     output_path = "./processed/borrower_predictions.csv"
-    output_df.to_csv(output_path, index=False)
+    borrower_io.write_table(output_df, output_path)
 
     print(f"✅ Predictions saved to {output_path}")
     print(output_df)
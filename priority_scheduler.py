@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import heapq
+import itertools
+import threading
+from datetime import datetime
+import pandas as pd
+import borrower_io
+
+# Exposure = loan_amount x delinquency x staleness
+LATE_SHARE_WEIGHT = 2.0    # every instalment paid late triples exposure
+DAYS_LATE_WEIGHT = 1.0     # averaging DAYS_LATE_CAP days late doubles it
+DAYS_LATE_CAP = 90
+STALENESS_WEIGHT = 1.0     # never scored, or scored STALE_DAYS ago, doubles it
+STALE_DAYS = 30
+
+# Prioritized runs write results this often, so an interrupted run keeps its most important scores
+WRITE_EVERY = int(os.environ.get("LOAN_PRIORITY_WRITE_EVERY", "25"))
+
+# Ordering keeps one (row position, exposure) entry per borrower and reads the rows back
+# PRIORITY_WINDOW at a time, one pass over the file each. Files with more rows than
+# MAX_PRIORITIZED_ROWS are streamed in file order instead.
+PRIORITY_WINDOW = int(os.environ.get("LOAN_PRIORITY_WINDOW", "10000"))
+MAX_PRIORITIZED_ROWS = int(os.environ.get("LOAN_PRIORITY_MAX_ROWS", "200000"))
+READ_CHUNK = 10_000
+
+def _column(borrowers, name):
+    if name not in borrowers.columns:
+        return pd.Series(0.0, index=borrowers.index)
+    return pd.to_numeric(borrowers[name], errors='coerce').astype(float).fillna(0.0).clip(lower=0)
+
+def last_scored_times(state_path=None):
+    """{borrower_id: scored_at} from the incremental scoring state, if there is one"""
+    import incremental
+    state = incremental.load_state(state_path or incremental.STATE_PATH)
+    return {borrower_id: entry.get('scored_at') for borrower_id, entry in state['borrowers'].items()
+            if entry.get('scored_at')}
+
+def exposure_scores(borrowers, scored_at=None, now=None):
+    """Risk exposure of each borrower, aligned with the frame's index"""
+    amount = _column(borrowers, 'loan_amount')
+    late = _column(borrowers, 'late_payments')
+    on_time = _column(borrowers, 'repayments_on_time')
+    paid = late + on_time
+    late_share = (late / paid.where(paid > 0)).fillna(0.0)
+    days_late = _column(borrowers, 'avg_days_late').clip(upper=DAYS_LATE_CAP) / DAYS_LATE_CAP
+    delinquency = 1 + LATE_SHARE_WEIGHT * late_share + DAYS_LATE_WEIGHT * days_late
+
+    # Days since the last score; borrowers never scored count as fully stale
+    now = now or datetime.now()
+    scored_at = scored_at or {}
+    ages = [(now - datetime.strptime(scored_at[b], '%Y-%m-%d %H:%M:%S')).total_seconds() / 86400
+            if b in scored_at else STALE_DAYS for b in borrowers['borrower_id'].astype(str)]
+    staleness = 1 + STALENESS_WEIGHT * pd.Series(ages, index=borrowers.index).clip(0, STALE_DAYS) / STALE_DAYS
+
+    return (amount * delinquency * staleness).rename('exposure')
+
+class PriorityScheduler:
+    """Max-heap of work keyed by priority.
+
+    Safe to submit() from other threads while a run is popping work: anything
+    more urgent than what's queued is served next, ahead of borrowers that were
+    scheduled earlier. Submitting a key again changes its priority.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, key, item, priority):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key][-1] = False   # lazily dropped when popped
+            entry = [-priority, next(self._counter), key, item, True]
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+
+    def cancel(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                entry[-1] = False
+
+    def pop(self):
+        """(key, item, priority) of the most urgent work, or None when empty"""
+        with self._lock:
+            while self._heap:
+                neg_priority, _, key, item, active = heapq.heappop(self._heap)
+                if active:
+                    del self._entries[key]
+                    return key, item, -neg_priority
+            return None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def drain(self, deadline=None):
+        """Pop work until the queue is empty or the deadline (time.time()) passes"""
+        while True:
+            if deadline is not None and time.time() >= deadline:
+                if len(self):
+                    print(f"⚠️ Time budget reached, {len(self)} lower-priority items left unprocessed")
+                return
+            popped = self.pop()
+            if popped is None:
+                return
+            yield popped
+
+def schedule_borrowers(borrowers, scored_at=None, scheduler=None):
+    """Queue every row of a borrower frame under its exposure, keyed by index label
+
+    Keys are row labels, not borrower_ids, so several loans of one borrower are all queued.
+    """
+    scheduler = scheduler if scheduler is not None else PriorityScheduler()
+    for index, exposure in exposure_scores(borrowers, scored_at).items():
+        scheduler.submit(index, index, float(exposure))
+    return scheduler
+
+def load_borrowers(path):
+    """Whole borrower table, validated (for callers that need every row at once)"""
+    return borrower_io.validate_chunk(borrower_io.read_table(path, categories=False), source=path)
+
+def schedule_file(path, scored_at=None, scheduler=None):
+    """Stream a borrower file and queue each row's file position under its exposure
+
+    Only the queue entries are kept, not the rows. Returns None if the file has
+    more than MAX_PRIORITIZED_ROWS valid rows.
+    """
+    scheduler = scheduler if scheduler is not None else PriorityScheduler()
+    rows = 0
+    for chunk in borrower_io.iter_borrower_chunks(path, READ_CHUNK):
+        rows += len(chunk)
+        if rows > MAX_PRIORITIZED_ROWS:
+            return None
+        schedule_borrowers(chunk, scored_at, scheduler)
+    return scheduler
+
+def read_rows(path, labels):
+    """Rows at the given file positions, in the order given, from one pass over the file"""
+    wanted = set(labels)
+    parts = [chunk[chunk.index.isin(wanted)] for chunk in borrower_io.iter_raw_chunks(path, READ_CHUNK)]
+    return borrower_io.coerce_dtypes(pd.concat(parts), categories=False).loc[labels]
+
+def _window_chunks(path, labels, chunksize):
+    window = read_rows(path, labels)
+    for start in range(0, len(window), chunksize):
+        yield window.iloc[start:start + chunksize]
+
+def iter_prioritized_chunks(path, chunksize=WRITE_EVERY, deadline=None, scheduler=None):
+    """Borrower frames of up to `chunksize` rows, highest exposure first
+
+    The file is streamed, never loaded whole: a first pass computes exposures, then rows
+    are read back PRIORITY_WINDOW at a time in priority order. Work submitted to the
+    scheduler during a run is picked up from the next window.
+    """
+    scheduler = schedule_file(path, last_scored_times(), scheduler)
+    if scheduler is None:
+        print(f"⚠️ {path} has more than {MAX_PRIORITIZED_ROWS} borrowers, processing them in file order")
+        yield from borrower_io.iter_borrower_chunks(path, chunksize)
+        return
+
+    labels = []
+    for _, index, _ in scheduler.drain(deadline):
+        labels.append(index)
+        if len(labels) >= PRIORITY_WINDOW:
+            yield from _window_chunks(path, labels, chunksize)
+            labels = []
+    if labels:
+        yield from _window_chunks(path, labels, chunksize)
+
+def iter_prioritized(path, deadline=None, scheduler=None):
+    """Borrower rows from a file, highest exposure first (drop-in for borrower_io.iter_borrowers)"""
+    for chunk in iter_prioritized_chunks(path, WRITE_EVERY, deadline, scheduler):
+        for _, row in chunk.iterrows():
+            yield row
+
+def main():
+    """Usage: python priority_scheduler.py <borrowers.csv> [top_n]"""
+    if len(sys.argv) < 2:
+        print("Usage: python priority_scheduler.py <borrowers.csv> [top_n]")
+        return
+    borrowers = load_borrowers(sys.argv[1])
+    top_n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    borrowers['exposure'] = exposure_scores(borrowers, last_scored_times())
+    columns = ['borrower_id', 'loan_amount', 'late_payments', 'avg_days_late', 'exposure']
+    print(borrowers.sort_values('exposure', ascending=False)[[c for c in columns if c in borrowers.columns]]
+          .head(top_n).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import os
+import sys
+import itertools
+import numpy as np
+import pandas as pd
+from entity_signals import QUERY_ATTRIBUTES, load_signal_table, join_entity_signals
+from risk_attributes import RISK_ATTRIBUTES
+from risk_scoring import build_feature_matrix
+
+MODEL_PATH = os.environ.get("LOAN_PRUNING_MODEL", "trained_model_xgb.pkl")
+ENABLED = os.environ.get("LOAN_QUERY_PRUNING", "1") != "0"
+REPORT_PATH = "query_pruning_report.csv"
+
+# Model feature answered by each of generate_queries()'s 12 queries
+QUERY_FEATURES = [attribute or "college_education_cost" for attribute in QUERY_ATTRIBUTES]
+
+# Answers a query can come back with: Low/Medium/High codes, or a cost across the training range
+RISK_CODES = [0.0, 1.0, 2.0]
+COLLEGE_COST_VALUES = [10000.0, 30000.0, 50000.0]
+
+# Loan fields named differently in loan_data.csv and the training data
+FIELD_ALIASES = {"average_days_late": "avg_days_late"}
+
+# Counterfactual checks try every answer of the queries being pruned against every setting
+# (missing or answered) of the other open queries when there are at most EXACT_LIMIT of them.
+# Beyond that they sample: how many settings of the others, and how many answer combinations.
+EXACT_LIMIT = int(os.environ.get("LOAN_PRUNING_EXACT_LIMIT", "20000"))
+SCENARIOS = 16
+MAX_COMBOS = 81
+
+# Work saved by skipping a query: one search and one ranking call. Summary and feature
+# extraction (two calls) are saved too when no query is left for the borrower.
+SEARCHES_PER_QUERY = 1
+LLM_CALLS_PER_QUERY = 1
+LLM_CALLS_PER_BORROWER = 2
+
+_models = {}
+
+def load_model(model_path=MODEL_PATH):
+    """Trained model used for pruning, or None (pruning off) if there isn't one"""
+    if model_path not in _models:
+        if not ENABLED or not os.path.exists(model_path):
+            if ENABLED:
+                print(f"⚠️ No model at {model_path}, query pruning is off")
+            _models[model_path] = None
+        else:
+            from compile_model import load_fast_predictor
+            _models[model_path] = load_fast_predictor(model_path)
+    return _models[model_path]
+
+def feature_importance(model):
+    """Share of the model's total gain per feature, largest first"""
+    gain = pd.Series(model.model.get_booster().get_score(importance_type='total_gain'), dtype=float)
+    gain = gain.reindex(model.feature_names, fill_value=0.0)
+    return (gain / gain.sum()).sort_values(ascending=False)
+
+def _answers(feature):
+    return COLLEGE_COST_VALUES if feature == "college_education_cost" else RISK_CODES
+
+def _base_vector(borrower_row, model, known=None):
+    """Model input for what's already known about a borrower; everything else missing"""
+    values = {}
+    for feature in model.feature_names:
+        value = borrower_row.get(feature, borrower_row.get(FIELD_ALIASES.get(feature, feature)))
+        if known is not None and feature in known and pd.notna(known[feature]):
+            value = known[feature]
+        values[feature] = value
+    frame = pd.DataFrame([values], columns=model.feature_names)
+    return build_feature_matrix(frame, model.feature_names, RISK_ATTRIBUTES).to_numpy()[0]
+
+def _grid(choices):
+    rows = list(itertools.product(*choices))
+    return np.array(rows, dtype=np.float32).reshape(len(rows), len(choices))
+
+def _combos(features, limit, rng):
+    """Answer combinations for a set of features: all of them, or a sample with the extremes"""
+    choices = [_answers(feature) for feature in features]
+    if np.prod([len(c) for c in choices]) <= limit:
+        return _grid(choices)
+    sampled = [[c[0] for c in choices], [c[-1] for c in choices]]
+    sampled += [[rng.choice(c) for c in choices] for _ in range(limit - 2)]
+    return np.array(sampled, dtype=np.float32)
+
+def is_exhaustive(varied, others):
+    """True if class_invariant checks every combination rather than a sample"""
+    size = np.prod([len(_answers(f)) for f in varied]) * np.prod([len(_answers(f)) + 1 for f in others])
+    return bool(size <= EXACT_LIMIT)
+
+def class_invariant(model, base, varied, others, rng):
+    """True if no answers to the `varied` features change the predicted class,
+    for each setting of the `others` (still unknown) features.
+
+    Exact when is_exhaustive(varied, others); otherwise only sampled settings are
+    checked, so True is an estimate (False always means a counterexample was found).
+    """
+    positions = {name: i for i, name in enumerate(model.feature_names)}
+    varied_idx = [positions[f] for f in varied]
+    other_idx = [positions[f] for f in others]
+
+    if is_exhaustive(varied, others):
+        combos = _grid([_answers(f) for f in varied])
+        scenarios = _grid([[np.nan] + _answers(f) for f in others])
+    else:
+        combos = _combos(varied, MAX_COMBOS, rng)
+        if others:
+            # Others left missing, at their extremes, and at random answers
+            scenarios = np.vstack([np.full((1, len(others)), np.nan, dtype=np.float32),
+                                   _combos(others, SCENARIOS - 1, rng)])
+        else:
+            scenarios = np.empty((1, 0), dtype=np.float32)
+
+    X = np.tile(base.astype(np.float32), (len(scenarios) * len(combos), 1))
+    X[:, other_idx] = np.repeat(scenarios, len(combos), axis=0)
+    X[:, varied_idx] = np.tile(combos, (len(scenarios), 1))
+    predicted = np.asarray(model.predict(X)).reshape(len(scenarios), len(combos))
+    return bool((predicted == predicted[:, :1]).all())
+
+def prune_queries(borrower_row, model=None, known=None, seed=0):
+    """Which of the borrower's queries can be skipped because no answer changes the predicted class
+
+    `known` holds attribute values already available (e.g. from the entity signal table);
+    those queries aren't issued anyway. Queries are tried least important first, and each
+    is only pruned if the class stays fixed with it and every query pruned before it varied
+    together. Returns {'pruned': [query indexes], 'unknown': [...], 'decided_class': class or None,
+    'exact': bool}; 'exact' is False when a pruning check had to sample the answer space,
+    making the result a (likely but not guaranteed) estimate.
+    """
+    model = model if model is not None else load_model()
+    unknown = [i for i, feature in enumerate(QUERY_FEATURES)
+               if not (known is not None and pd.notna(known.get(feature)))
+               and pd.isna(borrower_row.get(feature))]
+    if model is None:
+        return {'pruned': [], 'unknown': unknown, 'decided_class': None, 'exact': True}
+
+    rng = np.random.default_rng(seed)
+    base = _base_vector(borrower_row, model, known)
+    importance = feature_importance(model)
+
+    # Queries whose feature the model doesn't use can't matter
+    pruned = [i for i in unknown if QUERY_FEATURES[i] not in importance.index]
+    candidates = sorted((i for i in unknown if i not in pruned), key=lambda i: importance[QUERY_FEATURES[i]])
+
+    exact = True
+    for i in candidates:
+        trial = pruned + [i]
+        varied = [QUERY_FEATURES[j] for j in trial if QUERY_FEATURES[j] in importance.index]
+        others = [QUERY_FEATURES[j] for j in candidates if j not in trial]
+        if class_invariant(model, base, varied, others, rng):
+            pruned.append(i)
+            exact = exact and is_exhaustive(varied, others)
+
+    decided = None
+    if len(pruned) == len(unknown):
+        decided = model.predict(base.reshape(1, -1).astype(np.float32))[0].item()
+    return {'pruned': sorted(pruned), 'unknown': unknown, 'decided_class': decided, 'exact': exact}
+
+def savings(n_pruned, n_unknown):
+    """(searches, LLM calls) saved by skipping n_pruned of a borrower's n_unknown queries"""
+    llm_calls = n_pruned * LLM_CALLS_PER_QUERY
+    if n_unknown and n_pruned == n_unknown:
+        llm_calls += LLM_CALLS_PER_BORROWER
+    return n_pruned * SEARCHES_PER_QUERY, llm_calls
+
+def pruning_report(borrowers, model=None, signal_table=None):
+    """Per-borrower queries needed, pruned and the searches/LLM calls that saves"""
+    model = model if model is not None else load_model()
+    if signal_table is None:
+        signal_table = load_signal_table()
+    known = join_entity_signals(borrowers, signal_table)
+
+    rows = []
+    for index, row in borrowers.iterrows():
+        result = prune_queries(row, model, known.loc[index].to_dict())
+        searches, llm_calls = savings(len(result['pruned']), len(result['unknown']))
+        rows.append({
+            'borrower_id': row['borrower_id'],
+            'queries': len(QUERY_FEATURES),
+            'already_known': len(QUERY_FEATURES) - len(result['unknown']),
+            'pruned': len(result['pruned']),
+            'searches_saved': searches,
+            'llm_calls_saved': llm_calls,
+            'decided_class': result['decided_class'],
+            'exact': result['exact'],
+            'pruned_queries': ", ".join(QUERY_FEATURES[i] for i in result['pruned'])
+        })
+    return pd.DataFrame(rows)
+
+def print_report(report, importance=None):
+    """Importance table and totals for a pruning report"""
+    if importance is not None:
+        print("Feature importance (share of total gain) for the queried attributes:")
+        for feature in sorted(set(QUERY_FEATURES), key=lambda f: -importance.get(f, 0.0)):
+            print(f"  {feature:<30} {importance.get(feature, 0.0):6.1%}")
+        print()
+
+    issued = (report['queries'] - report['already_known']).sum()
+    print(f"📉 Query pruning over {len(report)} borrowers")
+    print(f"  Queries without a known answer: {issued}")
+    print(f"  Pruned (can't change the class): {report['pruned'].sum()} ({report['pruned'].sum() / max(issued, 1):.0%})")
+    print(f"  Searches saved:                  {report['searches_saved'].sum()}"
+          f" ({report['searches_saved'].mean():.1f} per borrower)")
+    print(f"  LLM calls saved:                 {report['llm_calls_saved'].sum()}"
+          f" ({report['llm_calls_saved'].mean():.1f} per borrower)")
+    print(f"  Borrowers needing no search:     {report['decided_class'].notna().sum()}")
+    estimated = (~report['exact'].astype(bool)).sum()
+    if estimated:
+        print(f"  ⚠️ {estimated} borrowers' pruning is estimated from sampled answers, not checked exhaustively")
+
+def main():
+    """Usage: python query_pruning.py <borrowers.csv> [model.pkl]"""
+    if len(sys.argv) < 2:
+        print("Usage: python query_pruning.py <borrowers.csv> [model.pkl]")
+        return
+    import borrower_io
+
+    model = load_model(sys.argv[2] if len(sys.argv) > 2 else MODEL_PATH)
+    if model is None:
+        return
+    borrowers = borrower_io.read_table(sys.argv[1], categories=False)
+    report = pruning_report(borrowers, model)
+    print_report(report, feature_importance(model))
+    report.to_csv(REPORT_PATH, index=False)
+    print(f"✅ Per-borrower report written to {REPORT_PATH}")
+
+if __name__ == "__main__":
+    main()
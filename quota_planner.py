@@ -0,0 +1,191 @@
+import os
+import re
+import sys
+import time
+import pandas as pd
+import cassette
+import query_pruning
+from entity_signals import QUERY_ATTRIBUTES, load_signal_table, join_entity_signals
+from priority_scheduler import exposure_scores, last_scored_times, load_borrowers
+
+# Searches kept back from every plan for ad-hoc use
+RESERVE = int(os.environ.get("LOAN_SERP_RESERVE", "10"))
+PLAN_PATH = "serp_plan.csv"
+
+# What happens to each (borrower, query):
+#   precomputed - attribute already in the entity signal table, no search
+#   pruned      - no answer to the query can change the model's predicted class
+#   cached      - this borrower already has a saved result file for the query
+#   copy        - another borrower's saved result for the same query is copied
+#   duplicate   - the same query runs earlier in this plan; its result is copied
+#   serpapi     - paid SerpAPI call within the budget
+#   free        - over budget, routed to DuckDuckGo
+ACTIONS = ["precomputed", "pruned", "cached", "copy", "duplicate", "serpapi", "free"]
+
+def safe_query(query):
+    """File name part of a query, as the searchers write it"""
+    return re.sub(r'[^\w\s-]', '', query).replace(' ', '_')[:50]
+
+def saved_queries(articles_dir="clean_articles"):
+    """{query: {borrower_id: filename}} for every saved search result file"""
+    saved = {}
+    if not os.path.exists(articles_dir):
+        return saved
+    for filename in sorted(os.listdir(articles_dir)):
+        if not filename.endswith('.txt'):
+            continue
+        query = borrower_id = None
+        with open(os.path.join(articles_dir, filename), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('Search Query:'):
+                    query = line.replace('Search Query:', '').strip()
+                elif line.startswith('Borrower ID:'):
+                    borrower_id = line.replace('Borrower ID:', '').strip()
+                elif line.startswith('='):
+                    break
+        if query and borrower_id:
+            saved.setdefault(query, {})[borrower_id] = os.path.join(articles_dir, filename)
+    return saved
+
+def remaining_quota():
+    """Searches left on the SerpAPI account, or None if it can't be checked"""
+    try:
+        from borrower_serp_searcher import get_serpapi_quota
+    except ImportError as e:
+        print(f"⚠️ Can't check SerpAPI quota: {e}")
+        return None
+    data = get_serpapi_quota()
+    return None if data is None else int(data.get('searches_left_this_month', 0))
+
+def plan_searches(borrowers, quota, articles_dir="clean_articles", signal_table=None, priority=None, reserve=RESERVE,
+                  prune=True):
+    """One row per (borrower, query) saying how it will be answered
+
+    Borrowers are planned highest priority first, so when the budget runs out it's
+    the lowest-priority borrowers whose searches go to the free backend.
+    `priority` maps the borrower frame to a score Series (default: risk exposure).
+    With `prune`, queries that can't change the trained model's prediction are dropped.
+    """
+    from borrower_ddg_searcher import generate_queries
+
+    if signal_table is None:
+        signal_table = load_signal_table()
+    signals = join_entity_signals(borrowers, signal_table)
+    known = signals.notna()
+    model = query_pruning.load_model() if prune else None
+    scores = priority(borrowers) if priority else exposure_scores(borrowers, last_scored_times())
+    saved = saved_queries(articles_dir)
+    budget = max(0, (quota or 0) - reserve)
+
+    planned = {}
+    rows = []
+    for index in scores.sort_values(ascending=False, kind='stable').index:
+        row = borrowers.loc[index]
+        borrower_id = str(row['borrower_id'])
+        pruned = set(query_pruning.prune_queries(row, model, signals.loc[index].to_dict())['pruned']) \
+            if model is not None else set()
+        for i, query in enumerate(generate_queries(row['job_title'], row['company'], row['industry'])):
+            attribute = QUERY_ATTRIBUTES[i]
+            source = ""
+            if attribute is not None and attribute in known.columns and known.at[index, attribute]:
+                action = "precomputed"
+            elif i in pruned:
+                action = "pruned"
+            elif borrower_id in saved.get(query, {}):
+                action, source = "cached", saved[query][borrower_id]
+            elif query in saved:
+                action, source = "copy", next(iter(saved[query].values()))
+            elif query in planned:
+                action, source = "duplicate", planned[query]
+            elif budget > 0:
+                action, budget = "serpapi", budget - 1
+                planned[query] = borrower_id
+            else:
+                action = "free"
+                planned[query] = borrower_id
+            rows.append({'borrower_id': borrower_id, 'priority': float(scores[index]), 'query_index': i,
+                         'query': query, 'action': action, 'source': source})
+
+    return pd.DataFrame(rows, columns=['borrower_id', 'priority', 'query_index', 'query', 'action', 'source'])
+
+def print_plan(plan, quota, reserve=RESERVE):
+    """Projected calls for a plan"""
+    counts = plan['action'].value_counts().reindex(ACTIONS, fill_value=0)
+    quota_text = "unknown" if quota is None else f"{quota}"
+    print(f"📋 Search plan: {plan['borrower_id'].nunique()} borrowers, {len(plan)} queries")
+    print(f"  Precomputed (entity signals): {counts['precomputed']}")
+    print(f"  Pruned (can't change class):  {counts['pruned']}")
+    print(f"  Already saved:                {counts['cached']}")
+    print(f"  Copied from other borrowers:  {counts['copy'] + counts['duplicate']}")
+    print(f"  Unique searches needed:       {counts['serpapi'] + counts['free']}")
+    print(f"  SerpAPI calls:                {counts['serpapi']} (quota left {quota_text}, reserve {reserve})")
+    print(f"  Routed to DuckDuckGo:         {counts['free']}")
+    if counts['free']:
+        lowest = plan[plan['action'] == 'serpapi']['priority'].min() if counts['serpapi'] else None
+        print(f"⚠️ Quota covers {counts['serpapi']} of {counts['serpapi'] + counts['free']} searches"
+              + (f"; borrowers below priority {lowest:,.0f} use DuckDuckGo" if lowest is not None else ""))
+
+def copy_result(source_file, borrower_id, output_dir="clean_articles"):
+    """Save another borrower's search result under this borrower"""
+    with open(source_file, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    query = lines[0].replace('Search Query:', '').strip()
+    lines = [f"Borrower ID: {borrower_id}\n" if line.startswith('Borrower ID:') else line for line in lines]
+
+    prefix = os.path.basename(source_file).split('_')[0]
+    filename = f"{output_dir}/{prefix}_{borrower_id}_{safe_query(query)}.txt"
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    return filename
+
+def execute_plan(plan, output_dir="clean_articles"):
+    """Run a plan: paid and free searches, then copies of shared results
+
+    Returns the saved files by borrower. A duplicate whose first search failed
+    falls back to a free search.
+    """
+    import borrower_ddg_searcher
+    if (plan['action'] == 'serpapi').any():
+        import borrower_serp_searcher
+
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}      # query -> file saved by this run
+    saved_files = {}
+    for row in plan.itertuples(index=False):
+        filename = None
+        if row.action == "pruned":
+            continue
+        if row.action in ("precomputed", "cached"):
+            filename = row.source or None
+        elif row.action == "copy":
+            filename = copy_result(row.source, row.borrower_id, output_dir)
+        elif row.action == "duplicate" and results.get(row.query):
+            filename = copy_result(results[row.query], row.borrower_id, output_dir)
+        else:
+            if row.action == "serpapi":
+                filename = borrower_serp_searcher.search_single_query(row.query, row.borrower_id, output_dir)
+            else:
+                filename = borrower_ddg_searcher.search_single_query(row.query, row.borrower_id, output_dir)
+            results[row.query] = filename
+            cassette.sleep(1)
+
+        if filename:
+            saved_files.setdefault(row.borrower_id, []).append(filename)
+    return saved_files
+
+def main():
+    """Usage: python quota_planner.py <borrowers.csv> [quota]"""
+    if len(sys.argv) < 2:
+        print("Usage: python quota_planner.py <borrowers.csv> [quota]")
+        return
+
+    borrowers = load_borrowers(sys.argv[1])
+    quota = int(sys.argv[2]) if len(sys.argv) > 2 else remaining_quota()
+    start = time.time()
+    plan = plan_searches(borrowers, quota)
+    print_plan(plan, quota)
+    plan.to_csv(PLAN_PATH, index=False)
+    print(f"✅ Plan written to {PLAN_PATH} in {time.time() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
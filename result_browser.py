@@ -0,0 +1,165 @@
+import os
+import numpy as np
+import pandas as pd
+import borrower_io
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Columns matched by the free-text search box
+SEARCH_COLUMNS = ["borrower_id", "borrower_name", "job_title", "company", "industry", "location"]
+
+SCORE_COLUMN = "risk_score"
+
+EVIDENCE_PREVIEW_CHARS = 3000
+
+def _text_mask(column, text):
+    # Categorical columns only match against their (few) categories, not every row
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        matched = column.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        return np.isin(column.cat.codes.to_numpy(), np.flatnonzero(matched))
+    return column.astype(str).str.contains(text, case=False, regex=False, na=False).to_numpy()
+
+def filter_mask(df, search="", min_score=None, max_score=None, industries=None, score_column=SCORE_COLUMN):
+    """Boolean mask of the rows matching the browser filters"""
+    mask = np.ones(len(df), dtype=bool)
+
+    if search:
+        text_mask = np.zeros(len(df), dtype=bool)
+        for column in SEARCH_COLUMNS:
+            if column in df.columns:
+                text_mask |= _text_mask(df[column], search)
+        mask &= text_mask
+
+    if score_column in df.columns and (min_score is not None or max_score is not None):
+        scores = pd.to_numeric(df[score_column], errors="coerce").to_numpy(dtype=float)
+        if min_score is not None:
+            mask &= scores >= min_score
+        if max_score is not None:
+            mask &= scores <= max_score
+
+    if industries and "industry" in df.columns:
+        mask &= df["industry"].astype(str).isin([str(i) for i in industries]).to_numpy()
+
+    return mask
+
+def _sort_key(column):
+    # Float keys with NaN for missing values, so missing rows always sort last
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy().astype(float)
+        codes[codes < 0] = np.nan
+        return codes
+    if pd.api.types.is_numeric_dtype(column.dtype):
+        return column.to_numpy(dtype=float, na_value=np.nan)
+    codes, _ = pd.factorize(column, sort=True)
+    codes = codes.astype(float)
+    codes[codes < 0] = np.nan
+    return codes
+
+def row_order(df, sort_by=None, ascending=True, **filters):
+    """Positions of the filtered rows in display order"""
+    positions = np.flatnonzero(filter_mask(df, **filters))
+    if sort_by and sort_by in df.columns and len(positions):
+        key = _sort_key(df[sort_by])[positions]
+        order = np.argsort(key if ascending else -key, kind="stable")
+        positions = positions[order]
+    return positions
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
+def get_page(df, positions, page, page_size):
+    """Rows of one page (1-based); only this slice of the table is materialized"""
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
+
+def load_explanation(borrower_id, df=None, results_path=None):
+    """Explanation text of one borrower, read from the side file only when requested"""
+    if results_path and borrower_io.is_parquet(results_path) and os.path.exists(borrower_io.explanations_path(results_path)):
+        explanations = borrower_io.read_explanations(results_path, [borrower_id])
+        return explanations["explanation"].iloc[0] if len(explanations) else ""
+
+    if df is not None and "explanation" in df.columns:
+        rows = df.loc[df["borrower_id"].astype(str) == str(borrower_id), "explanation"]
+        return rows.iloc[0] if len(rows) and pd.notna(rows.iloc[0]) else ""
+    return ""
+
+def load_evidence(borrower_id, files=None, max_chars=EVIDENCE_PREVIEW_CHARS):
+    """(path, text preview) for each saved article of one borrower"""
+    if files is None:
+        from incremental import evidence_files
+        files = evidence_files(borrower_id)
+
+    evidence = []
+    for path in files:
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                evidence.append((path, f.read(max_chars)))
+        except OSError as e:
+            evidence.append((path, f"Could not read file: {e}"))
+    return evidence
+
+def render_result_browser(df, key="results", results_path=None, evidence_files=None):
+    """Paginated, filterable table with per-borrower explanation and evidence on demand"""
+    import streamlit as st
+
+    with st.expander("Filter and sort", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            search = st.text_input("Search", key=f"{key}_search",
+                                   help="Borrower id, name, job title, company, industry or location")
+        with col2:
+            default_sort = SCORE_COLUMN if SCORE_COLUMN in df.columns else "borrower_id"
+            columns = list(df.columns)
+            sort_by = st.selectbox("Sort by", columns, key=f"{key}_sort",
+                                   index=columns.index(default_sort) if default_sort in columns else 0)
+        with col3:
+            ascending = st.radio("Order", ("Descending", "Ascending"), key=f"{key}_order",
+                                 horizontal=True) == "Ascending"
+
+        min_score = max_score = None
+        scores = pd.to_numeric(df[SCORE_COLUMN], errors="coerce") if SCORE_COLUMN in df.columns else None
+        if scores is not None and scores.notna().any() and scores.min() < scores.max():
+            low, high = float(scores.min()), float(scores.max())
+            min_score, max_score = st.slider("Risk score", low, high, (low, high), key=f"{key}_score")
+
+        industries = None
+        if "industry" in df.columns:
+            industries = st.multiselect("Industry", sorted(df["industry"].dropna().astype(str).unique()),
+                                        key=f"{key}_industry")
+
+    positions = row_order(df, sort_by, ascending, search=search, min_score=min_score,
+                          max_score=max_score, industries=industries)
+
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = page_count(len(positions), page_size)
+    # Filters can shrink the result below the page the user was on
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+
+    page_df = get_page(df, positions, page, page_size)
+    st.dataframe(page_df.drop(columns=borrower_io.TEXT_COLUMNS, errors="ignore"), hide_index=True)
+    start = (page - 1) * page_size
+    st.caption(f"Rows {min(start + 1, len(positions))}-{start + len(page_df)} of {len(positions)} "
+               f"(filtered from {len(df)})")
+
+    if "borrower_id" not in page_df.columns or page_df.empty:
+        return
+
+    borrower_id = st.selectbox("Borrower details", page_df["borrower_id"].tolist(), index=None,
+                               placeholder="Select a borrower on this page", key=f"{key}_details")
+    if borrower_id is None:
+        return
+
+    with st.expander("Explanation", expanded=True):
+        explanation = load_explanation(borrower_id, df, results_path)
+        st.write(explanation or "No explanation stored for this borrower.")
+
+    with st.expander("Article evidence"):
+        files = evidence_files.get(str(borrower_id), []) if evidence_files is not None else None
+        evidence = load_evidence(borrower_id, files)
+        if not evidence:
+            st.write("No saved articles for this borrower.")
+        for path, text in evidence:
+            st.markdown(f"**{os.path.basename(path)}**")
+            st.text(text)
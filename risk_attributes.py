@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# The eleven Low/Medium/High attributes used by the model, in training order
+RISK_ATTRIBUTES = [
+    "stock_performance_outlook",
+    "industry_recession_or_growth",
+    "company_M_and_A_possibility",
+    "job_automation_risk",
+    "job_market_demand",
+    "product_relevance",
+    "skilled_obsolescence",
+    "replaceability_risk",
+    "pollution_projection",
+    "disease_risk_polluted_zone",
+    "financial_burden_children"
+]
+
+# Fixed vocabulary: Low=0, Medium=1, High=2, anything else is missing (code -1).
+# With three categories pandas stores the codes as int8.
+RISK_LEVELS = ["Low", "Medium", "High"]
+RISK_DTYPE = pd.CategoricalDtype(RISK_LEVELS, ordered=True)
+_LEVEL_INDEX = pd.Index(RISK_LEVELS)
+
+def as_risk_levels(values):
+    """Series of Low/Medium/High values as the shared int8 categorical.
+
+    Case and surrounding whitespace are ignored ("high " -> "High").
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.dtype == RISK_DTYPE:
+        return values
+    codes = _LEVEL_INDEX.get_indexer(values)
+
+    # Only values that didn't match exactly go through string normalization
+    unmatched = (codes < 0) & values.notna().to_numpy()
+    if unmatched.any():
+        codes[unmatched] = _LEVEL_INDEX.get_indexer(values[unmatched].astype(str).str.strip().str.capitalize())
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=RISK_DTYPE), index=values.index, name=values.name)
+
+def encode_risk_attributes(frame, columns=None):
+    """Copy of `frame` with every risk attribute column converted to RISK_DTYPE"""
+    columns = columns or [column for column in RISK_ATTRIBUTES if column in frame.columns]
+    frame = frame.copy()
+    for column in columns:
+        frame[column] = as_risk_levels(frame[column])
+    return frame
+
+def risk_codes(frame, columns):
+    """Low/Medium/High columns as a float32 matrix of 0/1/2 codes, NaN where missing"""
+    encoded = np.empty((len(frame), len(columns)), dtype=np.float32)
+    for i, column in enumerate(columns):
+        encoded[:, i] = as_risk_levels(frame[column]).cat.codes.to_numpy()
+    encoded[encoded < 0] = np.nan
+    return encoded
@@ -0,0 +1,273 @@
+import os
+import re
+import time
+import importlib
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse, parse_qs, parse_qsl, urlencode
+import llm_router
+import tracing
+import cassette
+
+# Search backends as "module:function"; each takes (query, num_results) and returns
+# [{'title', 'link', 'snippet'}, ...] best first. Modules are imported on first use.
+BACKENDS = {
+    "serpapi": "borrower_serp_searcher:search_serpapi",
+    "duckduckgo": "borrower_ddg_searcher:scrape_duckduckgo_results",
+    "google": "loan_repay_predictor:scrape_search_results",
+}
+# Free backends only by default: paid SerpAPI searches go through the quota planner
+# (quota_planner.py), or are opted into with LOAN_SEARCH_BACKENDS=serpapi,google,duckduckgo
+DEFAULT_BACKENDS = [b.strip() for b in os.environ.get("LOAN_SEARCH_BACKENDS", "google,duckduckgo").split(",") if b.strip()]
+
+RRF_K = 60                                                               # reciprocal-rank fusion constant
+SEARCH_TIMEOUT = float(os.environ.get("LOAN_SEARCH_TIMEOUT", "45"))      # seconds to wait for slow backends
+GRACE_SECONDS = float(os.environ.get("LOAN_SEARCH_GRACE", "0.25"))       # extra wait for backends finishing right after
+MIN_SNIPPET_CHARS = 40                                                   # a hit with a shorter snippet isn't "high quality"
+BACKEND_THREADS = int(os.environ.get("LOAN_SEARCH_BACKEND_THREADS", "2"))  # calls per backend at once, abandoned ones included
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src", "ocid", "cmpid"}
+
+_resolved = {}
+_executors = {}
+_executors_lock = threading.Lock()
+
+def _resolve(name, spec):
+    """Backend function for a "module:function" spec (or a callable); None if it can't be imported"""
+    if callable(spec):
+        return spec
+    if spec not in _resolved:
+        module_name, func_name = spec.split(":")
+        try:
+            _resolved[spec] = getattr(importlib.import_module(module_name), func_name)
+        except ImportError as e:
+            print(f"⚠️ Search backend '{name}' unavailable: {e}")
+            _resolved[spec] = None
+    return _resolved[spec]
+
+def _backend_table(backends):
+    """Normalize a list of backend names or a {name: spec} dict"""
+    if backends is None:
+        backends = DEFAULT_BACKENDS
+    if not isinstance(backends, dict):
+        backends = {name: BACKENDS[name] for name in backends}
+    table = {}
+    for name, spec in backends.items():
+        func = _resolve(name, spec)
+        if func is not None:
+            table[name] = func
+    return table
+
+def _executor(name):
+    """Shared thread pool for one backend
+
+    A call search() stops waiting for keeps its thread until it finishes (a Playwright
+    backend keeps its browser open that long), so sharing the pool across searches caps
+    the abandoned work of each backend at BACKEND_THREADS calls instead of letting it
+    pile up query after query.
+    """
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=BACKEND_THREADS, thread_name_prefix=f"search-{name}")
+        return _executors[name]
+
+def normalize_url(url):
+    """Key for URL dedupe: no scheme, www., fragment, trailing slash or tracking parameters"""
+    parsed = urlparse((url or "").strip())
+
+    # DuckDuckGo sometimes links through its redirector
+    if parsed.netloc.endswith("duckduckgo.com") and parsed.path.startswith("/l/"):
+        target = parse_qs(parsed.query).get("uddg")
+        if target:
+            return normalize_url(target[0])
+
+    host = parsed.netloc.lower()
+    if not host:
+        return ""
+    if host.startswith("www."):
+        host = host[4:]
+
+    params = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                    if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    key = host + parsed.path.rstrip("/")
+    return f"{key}?{urlencode(params)}" if params else key
+
+def fuse(results_by_backend, k=RRF_K, weights=None):
+    """Reciprocal-rank fusion of several backends' result lists, deduplicated by URL
+
+    Each article gets sum(weight / (k + rank)) over the backends that returned it and
+    keeps the longest snippet seen. Adds 'rrf_score' and 'engines'.
+    """
+    fused = {}
+    for name, articles in results_by_backend.items():
+        weight = (weights or {}).get(name, 1.0)
+        for rank, article in enumerate(articles, 1):
+            key = normalize_url(article.get('link'))
+            if not key:
+                continue
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = dict(article, engines=[], rrf_score=0.0)
+            elif len(article.get('snippet') or "") > len(entry.get('snippet') or ""):
+                entry['snippet'] = article['snippet']
+            # Only a backend's best rank for a URL counts
+            if name not in entry['engines']:
+                entry['engines'].append(name)
+                entry['rrf_score'] += weight / (k + rank)
+
+    return sorted(fused.values(), key=lambda a: -a['rrf_score'])
+
+def is_quality_hit(article):
+    """A result worth stopping for: has a title and a real snippet"""
+    return bool(article.get('title')) and len(article.get('snippet') or "") >= MIN_SNIPPET_CHARS
+
+def _run_backend(name, func, query, num_results):
+    with tracing.span("search.backend", backend=name) as span:
+        try:
+            articles = func(query, num_results) or []
+        except Exception as e:
+            print(f"    ⚠️ {name} search failed: {e}")
+            articles = []
+        span.set("results", len(articles))
+        return articles
+
+def search(query, num_results=10, backends=None, enough=None, timeout=SEARCH_TIMEOUT, grace=GRACE_SECONDS):
+    """Query several backends in parallel and return their fused results
+
+    Returns once the fused results hold `enough` high-quality hits (default `num_results`),
+    plus a short grace period for backends finishing at the same moment, or when every
+    backend has answered, or after `timeout` seconds. Backend calls that haven't started
+    (their backend is still busy with an earlier query) are cancelled; calls already
+    running finish in the background and their results are dropped.
+    """
+    table = _backend_table(backends)
+    enough = num_results if enough is None else enough
+    answered = {}
+
+    with tracing.span("search.fusion", query=query) as span:
+        if not table:
+            return []
+
+        futures = {_executor(name).submit(contextvars.copy_context().run, _run_backend, name, func, query,
+                                          num_results): name
+                   for name, func in table.items()}
+        pending = set(futures)
+        deadline = time.monotonic() + timeout
+        sufficient_at = None
+        try:
+            while pending:
+                wait_until = deadline if sufficient_at is None else min(deadline, sufficient_at + grace)
+                done, pending = wait(pending, timeout=max(0.0, wait_until - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    answered[futures[future]] = future.result()
+                if sufficient_at is None:
+                    fused = fuse({name: answered[name] for name in table if name in answered})
+                    if sum(is_quality_hit(a) for a in fused) >= enough:
+                        sufficient_at = time.monotonic()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # Fuse in backend order so ties don't depend on which backend was fastest
+        fused = fuse({name: answered[name] for name in table if name in answered})[:num_results]
+        skipped = [name for name in table if name not in answered]
+        if skipped:
+            print(f"    Returned without waiting for: {', '.join(skipped)}")
+        span.set("backends", ",".join(answered))
+        span.set("results", len(fused))
+        return fused
+
+# --------------------- Borrower searches ---------------------
+
+@tracing.traced("query")
+def search_single_query(query, borrower_id, output_dir="clean_articles", backends=None):
+    """Fused search for one query, saved in the same format as the SERP_/DDG_ files"""
+    from borrower_ddg_searcher import rank_articles_with_gemini
+
+    tracing.current_span().set("query", query)
+    print(f"  Searching: {query}")
+    articles = search(query, num_results=10, backends=backends)
+
+    if not articles:
+        print(f"    No articles found for: {query}")
+        return None
+
+    top_articles = rank_articles_with_gemini(articles, query, top_k=3)
+    engines = sorted({engine for article in articles for engine in article['engines']})
+
+    content = f"Search Query: {query}\n"
+    content += f"Search Engine: Fused ({', '.join(engines)})\n"
+    content += f"Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+    content += f"Borrower ID: {borrower_id}\n"
+    content += "=" * 80 + "\n\n"
+
+    for i, article in enumerate(top_articles):
+        content += f"{i+1}. {article['title']}\n"
+        content += f"   URL: {article['link']}\n"
+        content += f"   Summary: {article['snippet']}\n\n"
+
+    safe_query = re.sub(r'[^\w\s-]', '', query).replace(' ', '_')[:50]
+    filename = f"{output_dir}/FUSED_{borrower_id}_{safe_query}.txt"
+
+    try:
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"    Saved: {filename}")
+        return filename
+    except Exception as e:
+        print(f"    Error saving: {e}")
+        return None
+
+@tracing.traced("borrower")
+def process_borrower(borrower_row, output_dir="clean_articles", signal_table=None, backends=None):
+    """Fused search for every query of one borrower, skipping precomputed attributes"""
+    from borrower_ddg_searcher import generate_queries
+    from entity_signals import QUERY_ATTRIBUTES, known_attributes
+
+    borrower_id = borrower_row['borrower_id']
+    print(f"\n=== Processing Borrower {borrower_id}: {borrower_row['borrower_name']} ===")
+    os.makedirs(output_dir, exist_ok=True)
+
+    queries = generate_queries(borrower_row['job_title'], borrower_row['company'], borrower_row['industry'])
+    known = known_attributes(borrower_row, signal_table) if signal_table is not None else set()
+    tracing.current_span().set("borrower_id", str(borrower_id))
+    tracing.current_span().set("cache_hits", len(known))
+
+    saved_files = []
+    for i, query in enumerate(queries):
+        if QUERY_ATTRIBUTES[i] in known:
+            print(f"  Query {i+1}/{len(queries)}: skipped ({QUERY_ATTRIBUTES[i]} precomputed)")
+            continue
+        filename = search_single_query(query, borrower_id, output_dir, backends)
+        if filename:
+            saved_files.append(filename)
+        cassette.sleep(1)
+
+    print(f"  Completed: {len(saved_files)}/{len(queries) - len(known)} queries saved ({len(known)} precomputed)")
+    return saved_files
+
+def process_borrowers_from_csv(csv_file, output_dir="clean_articles", backends=None):
+    """Fused search for all borrowers in a CSV/Parquet file"""
+    import priority_scheduler
+    from entity_signals import load_signal_table
+
+    print(f"Fused Borrower Article Searcher ({', '.join(_backend_table(backends))})")
+    print("=" * 60)
+    signal_table = load_signal_table()
+
+    total_files = 0
+    for index, row in enumerate(priority_scheduler.iter_prioritized(csv_file)):
+        try:
+            if index > 0:
+                cassette.sleep(3)
+            total_files += len(process_borrower(row, output_dir, signal_table, backends))
+        except Exception as e:
+            print(f"  Error processing borrower {row.get('borrower_id', 'unknown')}: {e}")
+
+    print(f"\n=== Processing Complete ===")
+    print(f"Total files saved: {total_files}")
+    llm_router.print_usage_report()
+    tracing.flush()
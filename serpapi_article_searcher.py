@@ -3,12 +3,9 @@ import re
 import time
 import requests
 import json
-import google.generativeai as genai
-from keys import SERP_KEY, GEMINI_KEY
-
-# Configure Gemini
-genai.configure(api_key=GEMINI_KEY)
-model = genai.GenerativeModel("gemini-2.0-flash-exp")
+from keys import SERP_KEY
+import llm_router
+import cassette
 
 def search_serpapi(query, num_results=10):
     """Search using SerpAPI Google Search"""
@@ -29,7 +26,7 @@ def search_serpapi(query, num_results=10):
         print(f"Searching SerpAPI for: {query}")
         
         # Make API request
-        response = requests.get("https://serpapi.com/search", params=params)
+        response = cassette.get("https://serpapi.com/search", params=params)
         response.raise_for_status()
         
         data = response.json()
@@ -126,7 +123,7 @@ Your response (just the numbers):
 """
     
     try:
-        response = model.generate_content(ranking_prompt)
+        response = llm_router.generate_content("ranking", ranking_prompt)
         ranking_text = response.text.strip()
         
         # Parse the ranking
@@ -190,7 +187,7 @@ Create a clean, informative summary:
 """
     
     try:
-        response = model.generate_content(summary_prompt)
+        response = llm_router.generate_content("article_summary", summary_prompt)
         return response.text.strip()
     except Exception as e:
         print(f"Error creating summary with Gemini: {e}")
@@ -254,7 +251,7 @@ def search_and_save_articles(query, output_dir="clean_articles", top_k=5):
 def check_serpapi_quota():
     """Check SerpAPI quota and usage"""
     try:
-        response = requests.get(f"https://serpapi.com/account?api_key={SERP_KEY}")
+        response = cassette.get(f"https://serpapi.com/account?api_key={SERP_KEY}")
         if response.status_code == 200:
             data = response.json()
             print(f"SerpAPI Account Info:")
@@ -307,7 +304,7 @@ def main():
                 print(f"✗ Failed: {query}")
             
             # Be polite to the API
-            time.sleep(2)
+            cassette.sleep(2)
             
         except Exception as e:
             print(f"Error processing query '{query}': {e}")
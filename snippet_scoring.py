@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import argparse
+import llm_router
+import tracing
+from risk_attributes import RISK_ATTRIBUTES, RISK_LEVELS
+
+# Attributes below this confidence get their pages scraped and are re-extracted
+CONFIDENCE_THRESHOLD = float(os.environ.get("LOAN_SNIPPET_CONFIDENCE", "0.6"))
+
+SNIPPETS_PER_ATTRIBUTE = 5     # search results shown to the model per attribute
+FULL_EVIDENCE_SNIPPETS = 3     # fewer non-empty snippets than this scales confidence down
+FULL_EVIDENCE_PAGES = 1        # ... and the same for scraped pages
+PAGES_PER_ATTRIBUTE = 2        # pages scraped for a low-confidence attribute
+PAGE_CHARS = 4000              # page text sent per page
+OUTPUT_PATH = "fast_scores.csv"
+
+def attribute_queries(row):
+    """{attribute: query} for the eleven criticality attributes of a borrower"""
+    from borrower_ddg_searcher import generate_queries
+    from query_pruning import QUERY_FEATURES
+
+    queries = generate_queries(row['job_title'], row['company'], row['industry'])
+    return {feature: query for feature, query in zip(QUERY_FEATURES, queries) if feature in RISK_ATTRIBUTES}
+
+def saved_evidence(row, urls_data):
+    """{attribute: [articles]} from a borrower's saved search result files"""
+    by_query = {}
+    for url_data in urls_data:
+        if str(url_data['borrower_id']) == str(row['borrower_id']):
+            by_query.setdefault(url_data['search_query'], []).append(
+                {'title': url_data['title'], 'link': url_data['url'], 'snippet': url_data['summary']})
+    return {attribute: by_query.get(query, []) for attribute, query in attribute_queries(row).items()}
+
+def search_evidence(row, backends=None):
+    """{attribute: [articles]} straight from the search backends, without ranking calls"""
+    import search_fusion
+    return {attribute: search_fusion.search(query, SNIPPETS_PER_ATTRIBUTE, backends=backends)
+            for attribute, query in attribute_queries(row).items()}
+
+def build_prompt(row, evidence, source="search result titles and snippets"):
+    """Criticality + confidence prompt for the attributes in `evidence`"""
+    sections = ""
+    for attribute, items in evidence.items():
+        sections += f"\nAttribute: {attribute}\n"
+        for item in items or [{'title': '(no results)', 'snippet': ''}]:
+            sections += f"- {item['title']}: {item['snippet']}\n"
+
+    keys = ", ".join(f'"{attribute}": {{"criticality": "Low|Medium|High", "confidence": 0.0-1.0, '
+                     f'"explanation": "one sentence"}}' for attribute in evidence)
+    return f"""
+You are assessing loan repayment risk for a {row['job_title']} at {row['company']} in the {row['industry']} industry.
+
+For each attribute below, rate how critical it is for the borrower (Low, Medium or High) using ONLY the
+{source} given for it. Also give your confidence from 0 to 1 that the text supports the rating:
+use a low confidence when it is vague, off-topic, contradictory or missing.
+{sections}
+Return only JSON:
+{{{keys}}}
+"""
+
+def parse_extraction(text, attributes):
+    """{attribute: {criticality, confidence, explanation}}; unusable answers get confidence 0"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+    if text.startswith("json"):
+        text = text[len("json"):].strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        try:
+            data = json.loads(match.group(0)) if match else {}
+        except ValueError:
+            data = {}
+
+    parsed = {}
+    for attribute in attributes:
+        item = data.get(attribute) if isinstance(data, dict) else None
+        item = item if isinstance(item, dict) else {}
+        level = str(item.get("criticality", "")).strip().capitalize()
+        try:
+            confidence = min(1.0, max(0.0, float(item.get("confidence", 0))))
+        except (TypeError, ValueError):
+            confidence = 0.0
+        parsed[attribute] = {
+            'criticality': level if level in RISK_LEVELS else None,
+            'confidence': confidence if level in RISK_LEVELS else 0.0,
+            'explanation': str(item.get("explanation", ""))
+        }
+    return parsed
+
+def extract_attributes(row, evidence, source="search result titles and snippets", full_evidence=FULL_EVIDENCE_SNIPPETS):
+    """One LLM call rating every attribute in `evidence`, confidence scaled by how much evidence there was"""
+    response = llm_router.generate_content("snippet_extraction", build_prompt(row, evidence, source))
+    parsed = parse_extraction(response.text, list(evidence))
+    for attribute, items in evidence.items():
+        support = sum(1 for item in items if item.get('snippet'))
+        parsed[attribute]['confidence'] = round(
+            parsed[attribute]['confidence'] * min(1.0, support / full_evidence), 2)
+    return parsed
+
+def page_evidence(evidence, attributes, queries=None):
+    """Scraped page text for the top results of each low-confidence attribute
+    (document pages are picked by the attribute's query)"""
+    from advanced_web_scraper import scrape_website_content
+
+    pages = {}
+    for attribute in attributes:
+        pages[attribute] = []
+        for item in evidence[attribute][:PAGES_PER_ATTRIBUTE]:
+            web_content = scrape_website_content(item['link'], query=(queries or {}).get(attribute))
+            if web_content['status'] == 'success':
+                pages[attribute].append({'title': item['title'], 'link': item['link'],
+                                         'snippet': web_content['content'][:PAGE_CHARS]})
+    return pages
+
+@tracing.traced("fast_score")
+def fast_score_borrower(row, urls_data=None, scrape=True, threshold=CONFIDENCE_THRESHOLD, model=None):
+    """Provisional attributes and score for one borrower from search snippets
+
+    Snippets come from the saved search files when the borrower has them, otherwise
+    from a live search. Only attributes rated below `threshold` confidence get their
+    pages scraped and re-rated.
+    """
+    start = time.perf_counter()
+    tracing.current_span().set("borrower_id", str(row['borrower_id']))
+
+    evidence = saved_evidence(row, urls_data) if urls_data is not None else {}
+    if not any(evidence.values()):
+        evidence = search_evidence(row)
+    evidence = {attribute: items[:SNIPPETS_PER_ATTRIBUTE] for attribute, items in evidence.items()}
+
+    attributes = extract_attributes(row, evidence)
+    for value in attributes.values():
+        value['source'] = 'snippet'
+
+    low = [attribute for attribute, value in attributes.items() if value['confidence'] < threshold]
+    if scrape and low:
+        pages = page_evidence(evidence, low, attribute_queries(row))
+        pages = {attribute: items for attribute, items in pages.items() if items}
+        if pages:
+            for attribute, value in extract_attributes(row, pages, "web page excerpts", FULL_EVIDENCE_PAGES).items():
+                if value['confidence'] >= attributes[attribute]['confidence']:
+                    attributes[attribute] = dict(value, source='page')
+    tracing.current_span().set("scraped_attributes", len(low) if scrape else 0)
+
+    result = {'borrower_id': row['borrower_id']}
+    for attribute in RISK_ATTRIBUTES:
+        value = attributes.get(attribute, {'criticality': None, 'confidence': 0.0, 'source': ''})
+        result[attribute] = value['criticality']
+        result[f"{attribute}_confidence"] = value['confidence']
+    result['low_confidence'] = ", ".join(a for a in RISK_ATTRIBUTES
+                                         if attributes.get(a, {}).get('confidence', 0.0) < threshold)
+    result['scraped_attributes'] = ", ".join(a for a in RISK_ATTRIBUTES if attributes.get(a, {}).get('source') == 'page')
+    result['provisional_likelihood'] = provisional_likelihood(row, result, model)
+    result['seconds'] = round(time.perf_counter() - start, 2)
+    return result
+
+def provisional_likelihood(row, attributes, model=None):
+    """Model prediction from the loan fields plus provisional attributes, or None without a model"""
+    if model is None:
+        return None
+    import pandas as pd
+    from predict_likelihood import prepare_features
+    from query_pruning import FIELD_ALIASES
+
+    values = {feature: row.get(feature, row.get(FIELD_ALIASES.get(feature, feature))) for feature in model.feature_names}
+    values.update({attribute: attributes[attribute] for attribute in RISK_ATTRIBUTES if attribute in values})
+    X = prepare_features(pd.DataFrame([values], columns=model.feature_names), model.feature_names)
+    return model.predict(X)[0].item()
+
+def fast_score(input_path="loan_data.csv", output_path=OUTPUT_PATH, articles_dir="clean_articles", scrape=True,
+               threshold=CONFIDENCE_THRESHOLD, model_path="trained_model_xgb.pkl"):
+    """Provisional scores for every borrower, highest exposure first"""
+    import pandas as pd
+    import borrower_io
+    import priority_scheduler
+    from advanced_web_scraper import extract_urls_from_files
+
+    model = None
+    if os.path.exists(model_path):
+        from compile_model import load_fast_predictor
+        model = load_fast_predictor(model_path)
+    else:
+        print(f"⚠️ No model at {model_path}, attributes only (no provisional likelihood)")
+
+    urls_data = extract_urls_from_files(articles_dir)
+    with borrower_io.TableWriter(output_path) as writer:
+        batch = []
+        for row in priority_scheduler.iter_prioritized(input_path):
+            try:
+                result = fast_score_borrower(row, urls_data, scrape, threshold, model)
+            except Exception as e:
+                print(f"⚠️ Error scoring borrower {row.get('borrower_id', 'unknown')}: {e}")
+                continue
+            print(f"⚡ Borrower {result['borrower_id']}: likelihood {result['provisional_likelihood']} in "
+                  f"{result['seconds']}s (low confidence: {result['low_confidence'] or 'none'})")
+            batch.append(result)
+            if len(batch) >= priority_scheduler.WRITE_EVERY:
+                writer.write(pd.DataFrame(batch))
+                batch = []
+        if batch:
+            writer.write(pd.DataFrame(batch))
+
+    print(f"✅ {writer.rows} provisional scores saved to {output_path}")
+    llm_router.print_usage_report()
+    tracing.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Provisional borrower scores from search snippets")
+    parser.add_argument("input", nargs="?", default="loan_data.csv")
+    parser.add_argument("output", nargs="?", default=OUTPUT_PATH)
+    parser.add_argument("--articles-dir", default="clean_articles")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD,
+                        help="Scrape pages for attributes below this confidence")
+    parser.add_argument("--no-scrape", action="store_true", help="Snippets only, never scrape")
+    args = parser.parse_args()
+    fast_score(args.input, args.output, args.articles_dir, not args.no_scrape, args.threshold)
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,80 @@
 import streamlit as st
 import pandas as pd
 import os
-from main_serp import generate_queries, search_and_save  # Calls your actual search logic
-
-SERPAPI_API_KEY = "YOUR_SERPAPI_KEY"  # <-- Replace with your real key
-
-# Mapping keys to query list positions
-QUERY_KEYS = [
-    "Stock performance outlook",
-    "Industry recession/growth",
-    "Job automation risk",
-    "Job market demand",
-    "Company M&A possibility",
-    "Product relevance",
-    "Skill obsolescence",
-    "Replaceability risk",
-    "Pollution projection",
-    "Disease risk in polluted zones",
-    "College education cost",
-    "Financial burden of children"
-]
-
-KEY_TO_INDEX = {k: i for i, k in enumerate(QUERY_KEYS)}
+import job_queue
+from batch_process import QUERY_KEYS
+from ui_cache import cached_search, load_uploaded_csv, load_table, upload_hash, cache_controls
+from result_browser import render_result_browser
 
-def perform_web_search(borrower_info, selected_keys, years_ahead):
-    job_title = borrower_info["job_title"]
-    company = borrower_info["company"]
-    industry = borrower_info["industry"]
-    borrower_id = borrower_info["borrower_id"]
-
-    # Get all queries
-    all_queries = generate_queries(job_title, company, industry, years_ahead)
-
-    # Filter queries by user-selected keys
-    selected_queries = [all_queries[KEY_TO_INDEX[key]] for key in selected_keys]
+UPLOAD_DIR = "uploads"
 
-    all_saved_files = []
-    for query in selected_queries:
-        saved_files = search_and_save(query, borrower_id, SERPAPI_API_KEY)
-        all_saved_files.extend(saved_files)
-
-    return all_saved_files
+def perform_web_search(borrower_info, selected_keys, years_ahead):
+    # Repeating the same search for the same borrower reuses the saved files
+    return cached_search(borrower_info["job_title"], borrower_info["company"], borrower_info["industry"],
+                         borrower_info["borrower_id"], tuple(selected_keys), years_ahead)
+
+def save_upload(csv_file):
+    """Keep the uploaded CSV on disk so the background worker can read it"""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, upload_hash(csv_file)[:16] + ".csv")
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(csv_file.getvalue())
+    return path
+
+@st.fragment(run_every="2s")
+def show_job(job_id):
+    """Live progress of a background search job, refreshed without rerunning the page"""
+    job = job_queue.get_job(job_id)
+    if job is None:
+        st.warning(f"Job {job_id} not found.")
+        return
+
+    st.write(f"**Job {job_id}** - {job['status']}")
+    if job['total']:
+        st.progress(min(job['done'] / job['total'], 1.0), text=f"{job['done']}/{job['total']} borrowers")
+    if job['message'] and job['status'] != 'failed':
+        st.caption(job['message'])
+
+    if job['status'] in ('queued', 'running'):
+        if st.button("Cancel Job", key=f"cancel_{job_id}"):
+            job_queue.cancel_job(job_id)
+            st.info("Cancellation requested.")
+    elif job['status'] == 'done':
+        st.success(f"Completed web search for {job['result']['borrowers']} borrowers.")
+        results = job['result']['results']
+        render_result_browser(
+            pd.DataFrame([{"borrower_id": r["borrower_id"], "articles_saved": len(r["saved_files"])} for r in results]),
+            key=f"job_{job_id}",
+            evidence_files={str(r["borrower_id"]): r["saved_files"] for r in results}
+        )
+    elif job['status'] == 'failed':
+        st.error(f"Job failed: {job['message'].splitlines()[0]}")
+        with st.expander("Details"):
+            st.code(job['message'])
 
 # ---------------- Streamlit UI ----------------
 st.title("Borrower Risk Assessment Web Search Tool")
 
 st.sidebar.header("Options")
 
-input_mode = st.sidebar.radio("Choose Input Mode:", ("Manual Form", "Upload CSV File"))
+input_mode = st.sidebar.radio("Choose Input Mode:", ("Manual Form", "Upload CSV File", "Browse Results"))
 
 years_ahead = st.sidebar.number_input("Years Ahead to Analyze", min_value=1, max_value=50, value=5)
 
 # Add hidden debug mode toggle
 debug_mode = st.sidebar.checkbox("Enable Debug Mode (Upload articles manually)")
 
+cache_controls()
+
+# Jobs live in the queue database, so they survive reruns and page reloads
+recent_jobs = job_queue.list_jobs(limit=10)
+if recent_jobs:
+    st.sidebar.subheader("Background Jobs")
+    for job in recent_jobs:
+        if st.sidebar.button(f"Job {job['id']}: {job['status']} ({job['done']}/{job['total']})", key=f"job_{job['id']}"):
+            st.session_state["search_job_id"] = job['id']
+
 if input_mode == "Manual Form":
     st.subheader("Borrower Information")
 
@@ -141,15 +162,15 @@ if input_mode == "Manual Form":
                 else:
                     st.warning("No articles saved.")
 
-else:
+elif input_mode == "Upload CSV File":
     st.subheader("Upload Borrower CSV File")
     csv_file = st.file_uploader("Upload CSV", type=["csv"])
 
     if csv_file is not None:
-        df = pd.read_csv(csv_file)
+        df = load_uploaded_csv(csv_file)
 
         st.write("CSV Preview:")
-        st.dataframe(df)
+        render_result_browser(df, key="upload")
 
         st.subheader("Select Query Attributes")
         selected_keys = [key for key in QUERY_KEYS if st.checkbox(key)]
@@ -171,28 +192,24 @@ else:
                     st.success("Files saved to articles/ folder.")
         else:
             if st.button("Submit and Search for All Borrowers"):
-                progress_bar = st.progress(0)
-                total = len(df)
-
-                for idx, row in df.iterrows():
-                    borrower_info = {
-                        "borrower_id": str(row["borrower_id"]),
-                        "borrower_name": row["borrower_name"],
-                        "loan_amount": row["loan_amount"],
-                        "loan_start_year": row["loan_start_year"],
-                        "job_title": row["job_title"],
-                        "company": row["company"],
-                        "industry": row["industry"],
-                        "repayments_on_time": row["repayments_on_time"],
-                        "late_payments": row["late_payments"],
-                        "avg_days_late": row["avg_days_late"],
-                        "age": row["age"],
-                        "location": row["location"]
-                    }
-
-                    saved_files = perform_web_search(borrower_info, selected_keys, years_ahead)
-                    st.write(f"Borrower ID {borrower_info['borrower_id']} - Saved {len(saved_files)} articles.")
-
-                    progress_bar.progress((idx + 1) / total)
-
-                st.success("Completed web search for all borrowers.")
+                # Searching runs in the background worker; the page only polls its progress
+                job_queue.ensure_worker()
+                st.session_state["search_job_id"] = job_queue.submit_job(
+                    "borrower_search",
+                    {"csv_path": save_upload(csv_file), "selected_keys": selected_keys, "years_ahead": years_ahead},
+                    total=len(df)
+                )
+
+else:
+    st.subheader("Browse Scored Borrowers")
+    results_path = st.text_input("Results file", value="repayability_results.csv")
+
+    if os.path.exists(results_path):
+        # Explanations of Parquet results stay on disk until a borrower is opened
+        render_result_browser(load_table(results_path), key="browse", results_path=results_path)
+    else:
+        st.info(f"{results_path} not found. Run loan_repay_predictor.py first.")
+
+if "search_job_id" in st.session_state:
+    st.subheader("Search Progress")
+    show_job(st.session_state["search_job_id"])
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test that the offline benchmark runs the pipeline on fixtures without network access
+"""
+import os
+import json
+import tempfile
+import benchmark
+
+def test_offline_benchmark():
+    """Every borrower goes through run_pipeline using only recorded responses"""
+    print("Testing offline benchmark run...")
+    result = benchmark.run_benchmark(3)
+
+    assert result["borrowers"] == 3
+    assert result["scored"] == 3
+    assert result["stages"]["borrower"]["count"] == 3
+    assert result["stages"]["search"]["count"] == 3 * 12
+    assert result["stages"]["prune"]["count"] == 3
+    assert result["stages"]["analyze"]["count"] == 3 * 2
+    assert result["stages"]["write"]["count"] >= 1
+    assert result["llm_calls"]["ranking"] == 3 * 12
+    assert result["llm_calls"]["json_extraction"] == 3
+    assert result["borrowers_per_second"] > 0
+
+def test_incremental_benchmark():
+    """A second, incremental run reuses the first run's features without LLM calls"""
+    print("Testing incremental benchmark run...")
+    result = benchmark.run_benchmark(2, incremental=True)
+
+    assert result["scored"] == 2
+    assert result["stages"]["search"]["count"] == 2 * 12
+    assert "analyze" not in result["stages"]
+    assert "json_extraction" not in result["llm_calls"]
+
+def test_baseline_regression():
+    """A large throughput drop against the baseline is reported"""
+    print("Testing baseline comparison...")
+    current = [{"borrowers": 10, "borrowers_per_second": 5.0,
+                "stages": {"search": {"p95_ms": 30.0}}}]
+    baseline = {"results": [{"borrowers": 10, "borrowers_per_second": 10.0,
+                             "stages": {"search": {"p95_ms": 10.0}}}]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baseline.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f)
+        regressions = benchmark.compare_to_baseline(current, path, tolerance=0.2)
+
+    assert len(regressions) == 2
+
+if __name__ == "__main__":
+    test_offline_benchmark()
+    test_incremental_benchmark()
+    test_baseline_regression()
+    print("\n✅ Benchmark tests passed")
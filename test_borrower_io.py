@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test borrower table I/O: typed CSV/Parquet round trips and chunked reads
+"""
+import os
+import tempfile
+import pandas as pd
+import borrower_io
+
+def sample_results():
+    return pd.DataFrame({
+        "borrower_id": ["101", "102", "103", None],
+        "borrower_name": ["Jane Doe", "John Smith", "Ravi Kumar", "No Id"],
+        "job_title": ["Software Engineer", "Mechanical Engineer", "Teacher", "Nurse"],
+        "company": ["Infosys", "Bosch", "DPS", "Apollo"],
+        "industry": ["IT", "Automotive", "Education", "Healthcare"],
+        "late_payments": [0, 6, "n/a", 1],
+        "risk_score": [0, 2, 1, 0],
+        "explanation": ["Stable.", "Automation risk.\n\nSecond paragraph.", "", "x"]
+    })
+
+def test_chunked_csv_validation():
+    """Rows without a borrower_id are dropped and bad numbers become missing"""
+    print("Testing chunked CSV reads...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "loan_data.csv")
+        sample_results().to_csv(path, index=False)
+
+        chunks = list(borrower_io.iter_borrower_chunks(path, chunksize=2))
+        rows = pd.concat(chunks)
+
+        assert len(chunks) == 2
+        assert rows["borrower_id"].tolist() == ["101", "102", "103"]
+        assert str(rows["late_payments"].dtype) == "Int32"
+        assert rows["late_payments"].isna().sum() == 1
+
+def test_alphanumeric_ids():
+    """IDs are text: "B-101" and "007" survive CSV and Parquet, blank IDs are dropped"""
+    print("Testing alphanumeric borrower ids...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "loan_data.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("borrower_id,job_title,company,industry\n"
+                    "B-101,Teacher,DPS,Education\n007,Nurse,Apollo,Healthcare\n  ,Driver,Uber,Transport\n")
+
+        rows = list(borrower_io.iter_borrowers(path))
+        assert [row["borrower_id"] for row in rows] == ["B-101", "007"]
+
+        skip_without_pyarrow()
+        parquet = os.path.join(tmp, "loan_data.parquet")
+        borrower_io.convert(path, parquet)
+        assert [row["borrower_id"] for row in borrower_io.iter_borrowers(parquet)] == ["B-101", "007"]
+
+def test_parquet_results_round_trip():
+    """Explanations live in a side file and are only joined on request"""
+    print("Testing Parquet result tables...")
+    skip_without_pyarrow()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.parquet")
+        df = borrower_io.coerce_dtypes(sample_results().iloc[:3])
+
+        with borrower_io.TableWriter(path, split_text=True) as writer:
+            writer.write(df.iloc[:2])
+            writer.write(df.iloc[2:])
+
+        scores = borrower_io.read_results(path)
+        full = borrower_io.read_results(path, with_explanations=True)
+
+        assert "explanation" not in scores.columns
+        assert isinstance(scores["company"].dtype, pd.CategoricalDtype)
+        assert full["explanation"].tolist() == df["explanation"].tolist()
+        assert borrower_io.read_explanations(path, [102])["explanation"].iloc[0].startswith("Automation")
+
+def skip_without_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        import pytest
+        pytest.skip("pyarrow not installed")
+
+if __name__ == "__main__":
+    test_chunked_csv_validation()
+    test_alphanumeric_ids()
+    test_parquet_results_round_trip()
+    print("\n✅ Borrower I/O tests passed")
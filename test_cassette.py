@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test recording and replaying HTTP and LLM traffic with cassettes
+"""
+import os
+import types
+import tempfile
+import functools
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import cassette
+import llm_router
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def test_http_record_replay():
+    """A recorded GET replays without the server and without the API key on disk"""
+    print("Testing HTTP record/replay...")
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = os.path.join(tmp, "pages")
+        os.makedirs(pages)
+        with open(os.path.join(pages, "search.json"), "w", encoding="utf-8") as f:
+            f.write('{"organic_results": [{"title": "Outlook", "link": "https://example.com"}]}')
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=pages))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/search.json"
+
+        try:
+            cassette.configure("record", os.path.join(tmp, "cassettes"))
+            recorded = cassette.get(url, params={"q": "Infosys outlook", "api_key": "secret"})
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        try:
+            cassette.configure("replay")
+            replayed = cassette.get(url, params={"q": "Infosys outlook", "api_key": "other"})
+            assert replayed.json() == recorded.json()
+            assert replayed.status_code == 200
+
+            try:
+                cassette.get(url, params={"q": "something else"})
+                assert False, "expected a cassette miss"
+            except cassette.CassetteMiss:
+                pass
+        finally:
+            cassette.configure("off")
+
+        for root, _, files in os.walk(os.path.join(tmp, "cassettes")):
+            for name in files:
+                with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                    assert "secret" not in f.read()
+
+def test_llm_record_replay():
+    """LLM responses replay through llm_router without creating a Gemini client"""
+    print("Testing LLM record/replay...")
+    fake_model = types.SimpleNamespace(generate_content=lambda prompt: types.SimpleNamespace(
+        text="2,1,3", usage_metadata=types.SimpleNamespace(prompt_token_count=40, candidates_token_count=3)))
+
+    def no_client(model_name):
+        raise AssertionError("replay must not create a client")
+
+    original = llm_router._get_model
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            cassette.configure("record", tmp)
+            llm_router._get_model = lambda model_name: fake_model
+            assert llm_router.generate_content("ranking", "Rank these articles").text == "2,1,3"
+
+            cassette.configure("replay")
+            llm_router._get_model = no_client
+            response = llm_router.generate_content("ranking", "Rank these articles")
+            assert response.text == "2,1,3"
+            assert response.usage_metadata.prompt_token_count == 40
+            assert cassette.summary(tmp) == {"llm": 1}
+        finally:
+            llm_router._get_model = original
+            cassette.configure("off")
+
+if __name__ == "__main__":
+    test_http_record_replay()
+    test_llm_record_replay()
+    print("\n✅ Cassette tests passed")
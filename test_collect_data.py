@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized synthetic borrower generator
+"""
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import collect_data
+
+def label_row(row):
+    """Repayment likelihood of one borrower, as the original row-by-row generator computed it"""
+    level_score = {'Low': 1, 'Medium': 0, 'High': -1}
+    score = row['repayments_on_time'] / 10 - row['late_payments'] * 0.5 - row['average_days_late'] * 0.2
+    for column, weight in collect_data.score_weights.items():
+        score += level_score[row[column]] * weight
+    if score >= 6:
+        return 2
+    elif score >= 3:
+        return 1
+    elif score >= 0:
+        return 0
+    elif score >= -3:
+        return -1
+    return -2
+
+def test_generate_records():
+    """Columns, value ranges, labels and seeding match the row-by-row generator"""
+    print("Testing generated borrower records...")
+    df = collect_data.generate_records(101, 500)
+    assert list(df.columns) == collect_data.columns
+    assert list(df['borrower_id']) == list(range(101, 601))
+    assert df['borrower_name'].iloc[0] == 'Borrower_101'
+    assert df['company'].astype(str).str.match(r'^Company_(1[0-9]|[1-9])$').all()
+    assert df['loan_amount'].between(5000, 99999).all()
+    assert df['loan_start_year'].between(2010, 2023).all()
+    for column in collect_data.categorical_columns:
+        assert set(df[column].astype(str)) <= {'Low', 'Medium', 'High'}
+
+    expected = df.apply(label_row, axis=1)
+    assert (df['loan_repayment_likelihood'].astype(int) == expected).all()
+    assert df['loan_repayment_likelihood'].nunique() > 1
+
+    assert df.equals(collect_data.generate_records(101, 500))
+    assert not df.equals(collect_data.generate_records(101, 500, seed=collect_data.SEED + 1))
+
+def test_generate_portfolio():
+    """A portfolio written in several chunks has every borrower once and honours concentration"""
+    print("Testing portfolio generation...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "portfolio.parquet")
+        collect_data.generate_portfolio(path, 2500, chunk_size=1000, company_concentration=2.0)
+        df = pd.read_parquet(path)
+        assert len(df) == 2500
+        assert list(df['borrower_id']) == list(range(1, 2501))
+        assert list(df.columns) == collect_data.columns
+        # With a Zipf exponent of 2 the largest company holds well over its uniform 1/19 share
+        assert df['company'].astype(str).value_counts(normalize=True).iloc[0] > 0.4
+
+if __name__ == "__main__":
+    test_generate_records()
+    test_generate_portfolio()
+    print("\n✅ Collect data tests passed")
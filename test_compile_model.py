@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test that every prediction backend gives the same probabilities for the same model
+"""
+import os
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import compile_model
+
+def train_model(path):
+    """A softprob model whose early stopping leaves unused trailing rounds"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.integers(0, 3, size=(400, 6)).astype(np.float32), columns=[f"x{i}" for i in range(6)])
+    y = (X['x0'] + rng.integers(0, 2, 400)).clip(0, 2).astype(int)
+    model = xgb.XGBClassifier(objective='multi:softprob', n_estimators=200, max_depth=4,
+                              learning_rate=0.5, early_stopping_rounds=5)
+    model.fit(X[:300], y[:300], eval_set=[(X[300:], y[300:])], verbose=False)
+    assert model.best_iteration + 1 < model.get_booster().num_boosted_rounds()
+    joblib.dump(model, path)
+    return model, X.to_numpy()
+
+def test_backend_parity():
+    """XGBoost, treelite and ONNX predictors agree with XGBClassifier up to the best iteration"""
+    print("Testing prediction backend parity...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        model, X = train_model(path)
+        expected = model.predict_proba(X)
+
+        predictors = [compile_model.XGBoostPredictor(model)]
+        try:
+            predictors.append(compile_model.TreelitePredictor(compile_model.export_treelite(path)))
+        except ImportError:
+            print("  treelite not installed, skipping")
+        try:
+            predictors.append(compile_model.OnnxPredictor(compile_model.export_onnx(path)))
+        except ImportError:
+            print("  onnxmltools/onnxruntime not installed, skipping")
+
+        for predictor in predictors:
+            fast = compile_model.FastModel(model, predictor)
+            probabilities = fast.predict_proba(X)
+            assert np.abs(probabilities - expected).max() < 1e-5, predictor.backend
+            assert (fast.predict(X) == model.predict(X)).all(), predictor.backend
+
+if __name__ == "__main__":
+    test_backend_parity()
+    print("\n✅ Compile model tests passed")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test detecting and extracting PDF/text documents ahead of the browser scrapers
+"""
+import os
+import types
+import tempfile
+import functools
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import cassette
+import document_extractor
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve(directory):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def make_pdf(texts):
+    """Minimal PDF with one line of text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(len(texts)))}] /Count {len(texts)} >>",
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for i, text in enumerate(texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    pdf, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return pdf
+
+def test_relevant_pages():
+    """Pages mentioning the query most are kept, in document order"""
+    print("Testing relevant page selection...")
+    pages = [(1, "Contents"), (2, "Semiconductor demand outlook: semiconductor fabs expand"),
+             (3, "Appendix"), (4, "Semiconductor exports"), (5, "   ")]
+    kept = document_extractor.relevant_pages(pages, "semiconductor industry outlook next 5 years", limit=2)
+    assert [number for number, _ in kept] == [2, 4]
+    assert [number for number, _ in document_extractor.relevant_pages(pages, None, limit=2)] == [1, 2]
+    assert [number for number, _ in document_extractor.relevant_pages(pages, "fisheries", limit=3)] == [1, 2, 3]
+
+def test_download_cap():
+    """Bodies over the byte cap are dropped, by header or while streaming"""
+    print("Testing download size cap...")
+    chunks = [b"x" * 100] * 5
+    response = types.SimpleNamespace(headers={}, iter_content=lambda size: iter(chunks))
+    assert document_extractor.download(response, max_bytes=400) is None
+    with document_extractor.download(response, max_bytes=500) as f:
+        assert len(f.read()) == 500
+    declared = types.SimpleNamespace(headers={"Content-Length": "9999"}, iter_content=lambda size: iter(chunks))
+    assert document_extractor.download(declared, max_bytes=500) is None
+
+def test_extract_document():
+    """Text documents are extracted, HTML goes to the browser, binaries fail fast"""
+    print("Testing document detection and extraction...")
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = ["Table of contents", "Automation risk for analysts is rising as tools improve. " * 5,
+                 "Methodology notes", "Analysts face automation of routine reporting work. " * 5]
+        with open(os.path.join(tmp, "report.txt"), "w", encoding="utf-8") as f:
+            f.write("\f".join(pages))
+        with open(os.path.join(tmp, "page.html"), "w", encoding="utf-8") as f:
+            f.write("<html><body>Hello</body></html>")
+        with open(os.path.join(tmp, "chart.png"), "wb") as f:
+            f.write(b"\x89PNG\r\n")
+        with open(os.path.join(tmp, "outlook.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4 not really a pdf")
+
+        server, base = serve(tmp)
+        try:
+            result = document_extractor.extract_document(f"{base}/report.txt", "data analyst automation risk")
+            assert result['status'] == 'success' and result['content_type'] == 'text/plain'
+            assert result['pages'] == 4 and result['title'] == 'report'
+            assert "[Page 2]" in result['content'] and "[Page 4]" in result['content']
+            assert "Methodology" not in result['content'] and "Table of contents" not in result['content']
+
+            assert document_extractor.extract_document(f"{base}/page.html") is None
+
+            result = document_extractor.extract_document(f"{base}/chart.png")
+            assert result['status'] == 'failed' and "image/png" in result['error']
+
+            # Unreadable either way: not a real PDF, or pypdf missing
+            result = document_extractor.extract_document(f"{base}/outlook.pdf")
+            assert result['content_type'] == 'application/pdf' and result['status'] == 'failed'
+
+            result = document_extractor.extract_document(f"{base}/missing.pdf")
+            assert result['status'] == 'failed' and result['error'] == "HTTP 404"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+def test_probe_record_replay():
+    """Recorded runs replay the document/browser decision for every URL without the network"""
+    print("Testing document probe record/replay...")
+    with tempfile.TemporaryDirectory() as tmp:
+        site = os.path.join(tmp, "site")
+        os.makedirs(site)
+        with open(os.path.join(site, "page.html"), "w", encoding="utf-8") as f:
+            f.write("<html><body>Hello</body></html>")
+        with open(os.path.join(site, "notes.txt"), "w", encoding="utf-8") as f:
+            f.write("Automation outlook for analysts. " * 10)
+
+        server, base = serve(site)
+        try:
+            cassette.configure("record", os.path.join(tmp, "cassettes"))
+            assert document_extractor.extract_document(f"{base}/page.html") is None
+            recorded = document_extractor.extract_document(f"{base}/notes.txt", "automation")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        try:
+            cassette.configure("replay")
+            assert cassette.summary(os.path.join(tmp, "cassettes")) == {"document": 2}
+            assert document_extractor.extract_document(f"{base}/page.html") is None
+            assert document_extractor.extract_document(f"{base}/notes.txt", "automation") == recorded
+        finally:
+            cassette.configure("off")
+
+def test_pdf_pages():
+    """PDF pages are read up to the page cap and filtered by the query"""
+    print("Testing PDF page extraction...")
+    skip_without_pypdf()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "outlook.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(["Contents", "Chip demand outlook for analysts", "Appendix", "Analysts in chip design"]))
+
+        with open(path, "rb") as f:
+            title, content, pages = document_extractor.extract_pages(f, "application/pdf",
+                                                                    "https://example.com/outlook.pdf", "chip analysts")
+        assert (title, pages) == ("outlook", 4)
+        assert content == "[Page 2]\nChip demand outlook for analysts\n\n[Page 4]\nAnalysts in chip design"
+
+        from pypdf import PdfReader
+        with open(path, "rb") as f:
+            assert [n for n, _ in document_extractor.iter_pdf_pages(PdfReader(f), max_pages=2)] == [1, 2]
+
+def skip_without_pypdf():
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        import pytest
+        pytest.skip("pypdf not installed")
+
+if __name__ == "__main__":
+    test_relevant_pages()
+    test_download_cap()
+    test_extract_document()
+    test_probe_record_replay()
+    test_pdf_pages()
+    print("\n✅ Document extractor tests passed")
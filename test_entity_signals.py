@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test that borrowers at known entities reuse the entity signal table instead of searching
+"""
+import types
+import pandas as pd
+import entity_signals
+import llm_router
+import query_pruning
+import loan_repay_predictor
+
+BORROWER = pd.Series({'borrower_id': 'B1', 'loan_amount': 20000, 'job_title': 'Data Analyst',
+                      'company': 'Infosys', 'industry': 'IT Services', 'college_education_cost': 30000})
+
+def signal_table(attributes):
+    table = entity_signals.load_signal_table("no_such_table.csv")
+    return entity_signals.add_borrower_signals(table, BORROWER, {a: "High" for a in attributes})
+
+def run_analysis(table, searches, prompts=None):
+    """analyze_borrower without a pruning model, recording searches and LLM prompts
+    (any LLM call fails without `prompts`)"""
+    def llm(model_name):
+        if prompts is None:
+            raise AssertionError("no LLM call expected")
+        def generate_content(prompt):
+            prompts.append(prompt)
+            return types.SimpleNamespace(text="{}", usage_metadata=None)
+        return types.SimpleNamespace(generate_content=generate_content)
+
+    def search(query, *args, **kwargs):
+        searches.append(query)
+        return "results"
+
+    original = (query_pruning._models.get(query_pruning.MODEL_PATH), llm_router._get_model,
+                loan_repay_predictor.search_web)
+    try:
+        query_pruning._models[query_pruning.MODEL_PATH] = None
+        llm_router._get_model = llm
+        loan_repay_predictor.search_web = search
+        return loan_repay_predictor.analyze_borrower(BORROWER, signal_table=table)
+    finally:
+        query_pruning._models[query_pruning.MODEL_PATH], llm_router._get_model, \
+            loan_repay_predictor.search_web = original
+
+def test_known_borrower_needs_no_calls():
+    """Every attribute in the signal table: no search, summary or extraction, features from the table"""
+    print("Testing fully known borrowers...")
+    searches = []
+    features, summary, decided_class = run_analysis(signal_table(entity_signals.ATTRIBUTE_ENTITY), searches)
+    assert searches == [] and decided_class is None and "No search needed" in summary
+    assert features == {'stock_projection': 'negative', 'industry_health': 'shrinking', 'automation_risk': 'high',
+                        'acquisition_risk': 'high', 'skill_relevance': 'obsolete', 'product_demand': 'declining'}
+    assert loan_repay_predictor.compute_risk_score(features) == 7
+
+def test_known_attributes_skip_queries():
+    """Only the queries for attributes the table doesn't hold are searched"""
+    print("Testing partially known borrowers...")
+    searches, prompts = [], []
+    known = [a for a in entity_signals.ATTRIBUTE_ENTITY if a != "job_automation_risk"]
+    features, _, _ = run_analysis(signal_table(known), searches, prompts)
+    assert len(prompts) == 2                      # summary and extraction for the open query
+    assert 'automation_risk' not in features and features['skill_relevance'] == 'obsolete'
+    queries = loan_repay_predictor.generate_queries(BORROWER['job_title'], BORROWER['company'], BORROWER['industry'])
+    assert searches == [queries[entity_signals.QUERY_ATTRIBUTES.index("job_automation_risk")]]
+
+if __name__ == "__main__":
+    test_known_borrower_needs_no_calls()
+    test_known_attributes_skip_queries()
+    print("\n✅ Entity signal tests passed")
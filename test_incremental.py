@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test fingerprinting and the saved state used by incremental rescoring
+"""
+import os
+import json
+import tempfile
+import pandas as pd
+import incremental
+
+def test_fingerprints():
+    """Loan hashes ignore dtype noise, evidence hashes ignore whitespace and run headers"""
+    print("Testing fingerprints...")
+    row = pd.Series({"borrower_id": 1, "loan_amount": 5000, "late_payments": 2, "name": "Ana"})
+    same = pd.Series({"borrower_id": 1, "loan_amount": 5000.0, "late_payments": 2.0, "name": "Bo"})
+    changed = pd.Series({"borrower_id": 1, "loan_amount": 6000, "late_payments": 2})
+    assert incremental.fingerprint_loan_fields(row) == incremental.fingerprint_loan_fields(same)
+    assert incremental.fingerprint_loan_fields(row) != incremental.fingerprint_loan_fields(changed)
+
+    assert incremental.fingerprint_evidence("Tesla  beats\nestimates ") == incremental.fingerprint_evidence("Tesla beats estimates")
+    assert incremental.fingerprint_evidence("Tesla beats") != incremental.fingerprint_evidence("Tesla misses")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        articles = os.path.join(tmp, "clean_articles")
+        os.makedirs(articles)
+        path = os.path.join(articles, "SERP_7_Tesla.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Date: 2024-01-01\nTesla beats estimates\n")
+        before = incremental.fingerprint_evidence_files(7, articles, os.path.join(tmp, "web_content"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Date: 2024-02-01\nTesla beats estimates\n")
+        assert incremental.fingerprint_evidence_files(7, articles, os.path.join(tmp, "web_content")) == before
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Date: 2024-02-01\nTesla misses estimates\n")
+        assert incremental.fingerprint_evidence_files(7, articles, os.path.join(tmp, "web_content")) != before
+
+def test_check_borrower():
+    """Unchanged borrowers are skipped and changes are reported with a reason"""
+    print("Testing borrower checks...")
+    state = {"borrowers": {}}
+    assert incremental.check_borrower(state, 1, "loan", "evidence") == (True, ["new borrower"])
+
+    incremental.record_borrower(state, 1, "loan", "evidence", {"automation_risk": "high"}, "why")
+    assert incremental.check_borrower(state, 1, "loan", "evidence") == (False, [])
+    assert incremental.check_borrower(state, 1, "loan2", "evidence") == (True, ["loan fields changed"])
+    assert incremental.check_borrower(state, "1", "loan", "evidence2") == (True, ["evidence changed"])
+    assert incremental.previous_result(state, 1) == ({"automation_risk": "high"}, "why")
+
+    # Fingerprints recorded without features can't be reused as a result
+    incremental.record_borrower(state, 2, "loan", "evidence")
+    assert incremental.check_borrower(state, 2, "loan", "evidence") == (False, [])
+    assert incremental.check_borrower(state, 2, "loan", "evidence", need_features=True) == (True, ["no stored features"])
+
+def test_state_versions():
+    """Saved state round-trips, and entries from version 1 (stored risk_score) are rescored"""
+    print("Testing state versions...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.json")
+        assert incremental.load_state(path) == {"borrowers": {}}
+
+        state = {"borrowers": {}}
+        incremental.record_borrower(state, 1, "loan", "evidence", {"automation_risk": "high"}, "why")
+        incremental.save_state(state, path)
+        loaded = incremental.load_state(path)
+        assert loaded["version"] == incremental.STATE_VERSION
+        assert incremental.check_borrower(loaded, 1, "loan", "evidence") == (False, [])
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"borrowers": {"1": {"loan_hash": "loan", "evidence_hash": "evidence", "risk_score": 4}}}, f)
+        old = incremental.load_state(path)
+        assert incremental.check_borrower(old, 1, "loan", "evidence") == (True, ["stored by an older version"])
+
+if __name__ == "__main__":
+    test_fingerprints()
+    test_check_borrower()
+    test_state_versions()
+    print("\n✅ Incremental state tests passed")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite job queue with an in-process worker and a fake handler
+"""
+import os
+import tempfile
+import job_queue
+
+def count_handler(payload, progress):
+    for i in range(payload["n"]):
+        progress(i + 1, payload["n"], message=f"item {i + 1}")
+    return {"counted": payload["n"]}
+
+def failing_handler(payload, progress):
+    raise RuntimeError("search backend down")
+
+def test_job_lifecycle():
+    """Queued jobs run in order, report progress and store results or errors"""
+    print("Testing job lifecycle...")
+    handlers = dict(job_queue.JOB_HANDLERS)
+    job_queue.JOB_HANDLERS.update({"count": "test_job_queue:count_handler",
+                                   "fail": "test_job_queue:failing_handler"})
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, "jobs.db")
+            ok = job_queue.submit_job("count", {"n": 3}, total=3, db_path=db)
+            bad = job_queue.submit_job("fail", {}, db_path=db)
+            cancelled = job_queue.submit_job("count", {"n": 1}, db_path=db)
+            job_queue.cancel_job(cancelled, db_path=db)
+
+            job_queue.run_worker(once=True, db_path=db)
+
+            assert job_queue.get_job(ok, db_path=db)["status"] == "done"
+            assert job_queue.get_job(ok, db_path=db)["done"] == 3
+            assert job_queue.get_job(ok, db_path=db)["result"] == {"counted": 3}
+            assert job_queue.get_job(bad, db_path=db)["status"] == "failed"
+            assert "search backend down" in job_queue.get_job(bad, db_path=db)["message"]
+            assert job_queue.get_job(cancelled, db_path=db)["status"] == "cancelled"
+            assert [job["id"] for job in job_queue.list_jobs(db_path=db)] == [cancelled, bad, ok]
+    finally:
+        job_queue.JOB_HANDLERS.clear()
+        job_queue.JOB_HANDLERS.update(handlers)
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    print("\n✅ Job queue tests passed")
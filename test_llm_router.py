@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the LLM model router without calling Gemini
+"""
+import llm_router
+
+class FakeUsage:
+    prompt_token_count = 1000
+    candidates_token_count = 200
+
+class FakeResponse:
+    text = "1,2,3"
+    usage_metadata = FakeUsage()
+
+class FakeModel:
+    def generate_content(self, prompt):
+        return FakeResponse()
+
+def test_task_mapping():
+    """Cheap tasks go to the small model, the borrower summary to the large one"""
+    print("Testing task mapping...")
+    config = llm_router.load_routing_config()
+
+    for task in ["ranking", "json_extraction", "page_cleaning", "borrower_summary"]:
+        print(f"  {task} -> {llm_router.model_for_task(task)}")
+
+    assert llm_router.model_for_task("ranking") == config["tasks"]["ranking"]
+    assert llm_router.model_for_task("unknown_task") == config["tasks"][config["default_task"]]
+    assert llm_router.model_for_task("ranking") != llm_router.model_for_task("borrower_summary")
+
+def test_usage_accounting():
+    """Calls are counted per task with tokens and cost"""
+    print("Testing usage accounting...")
+    llm_router.reset_usage()
+
+    # Swap in fake clients so no API key is needed
+    for model_name in llm_router.get_routing_config()["models"]:
+        llm_router._models[model_name] = FakeModel()
+
+    try:
+        llm_router.generate_content("ranking", "rank these")
+        llm_router.generate_content("ranking", "rank these too")
+        llm_router.generate_content("borrower_summary", "summarize")
+
+        report = {row['task']: row for row in llm_router.get_usage_report()}
+        llm_router.print_usage_report()
+
+        assert report["ranking"]["calls"] == 2
+        assert report["ranking"]["input_tokens"] == 2000
+        assert report["borrower_summary"]["cost_usd"] > report["ranking"]["cost_usd"]
+    finally:
+        llm_router._models.clear()
+        llm_router.reset_usage()
+
+if __name__ == "__main__":
+    test_task_mapping()
+    test_usage_accounting()
+    print("\n✅ Router tests passed")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test the unified command line entry point
+"""
+import os
+import ast
+import sys
+import tempfile
+import subprocess
+import loan_cli
+
+def test_urls_command():
+    """`urls` lists unique URLs from the saved search results"""
+    print("Testing urls command...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, url in [("SERP_1_a.txt", "https://example.com/a"), ("SERP_2_b.txt", "https://example.com/a"),
+                          ("SERP_2_c.txt", "https://example.com/c")]:
+            with open(os.path.join(tmp, name), "w", encoding="utf-8") as f:
+                f.write(f"Search Query: q\nBorrower ID: 1\n{'=' * 80}\n\n1. Title\n   URL: {url}\n   Summary: s\n")
+
+        result = subprocess.run([sys.executable, "loan_cli.py", "--timing", "urls", "--articles-dir", tmp],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.returncode == 0, result.stderr
+        assert "Found 2 unique URLs" in result.stdout
+        assert "⏱️ urls" in result.stdout
+
+def test_commands_import_lazily():
+    """Parsing arguments does not import any pipeline module"""
+    print("Testing lazy command imports...")
+    args = loan_cli.build_parser().parse_args(["jobs", "list", "--limit", "5"])
+    assert args.command == "jobs" and args.args == ["list", "--limit", "5"]
+
+    check = ("import sys, loan_cli; loan_cli.build_parser().parse_args(['urls']); "
+             "print(','.join(m for m in ['pandas', 'requests', 'advanced_web_scraper', 'job_queue'] if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+def test_passthrough_modules_have_main():
+    """Every pass-through command's module defines the main() it is run with"""
+    print("Testing pass-through entry points...")
+    root = os.path.dirname(os.path.abspath(__file__))
+    for command, (module_name, _) in loan_cli.PASSTHROUGH.items():
+        with open(os.path.join(root, f"{module_name}.py"), "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        functions = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+        assert "main" in functions, f"{command}: {module_name}.py has no main()"
+
+if __name__ == "__main__":
+    test_urls_command()
+    test_commands_import_lazily()
+    test_passthrough_modules_have_main()
+    print("\n✅ Loan CLI tests passed")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the bulk merge of per-borrower Gemini responses
+"""
+import os
+import json
+import tempfile
+import pandas as pd
+import merge
+
+def make_response(levels):
+    return {attr: {"criticality": level, "explanation": f"reason {i}"}
+            for i, (attr, level) in enumerate(zip(merge.RISK_ATTRIBUTES, levels))}
+
+def write_borrowers(path):
+    pd.DataFrame({
+        "borrower_id": [101, 102, 103],
+        "borrower_name": ["Jane Doe", "John Smith", "Ravi Kumar"],
+        "job_title": ["Software Engineer", "Mechanical Engineer", "Teacher"],
+        "company": ["Infosys", "Bosch", "DPS"],
+        "industry": ["IT", "Automotive", "Education"]
+    }).to_csv(path, index=False)
+
+def test_merge_jsonl_responses():
+    """Responses join by borrower_id; invalid and unknown ones are reported, not merged"""
+    print("Testing JSONL bulk merge...")
+    with tempfile.TemporaryDirectory() as tmp:
+        borrowers = os.path.join(tmp, "loan_data.csv")
+        responses = os.path.join(tmp, "responses.jsonl")
+        output = os.path.join(tmp, "processed.csv")
+        write_borrowers(borrowers)
+
+        with open(responses, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"borrower_id": 103, "response": make_response(["high"] * 11)}) + "\n")
+            f.write(json.dumps({"borrower_id": 101, "response": make_response(["Low"] * 11)}) + "\n")
+            f.write(json.dumps({"borrower_id": 102, "response": make_response(["Severe"] + ["Low"] * 10)}) + "\n")
+            f.write(json.dumps({"borrower_id": 999, "response": make_response(["Low"] * 11)}) + "\n")
+            f.write(json.dumps({"borrower_id": 101, "response": make_response(["Medium"] * 3)}) + "\n")
+
+        summary = merge.merge_csv_with_responses(borrowers, responses, output, workers=1)
+        merged = pd.read_csv(output)
+
+        assert summary["matched"] == 2
+        assert summary["unused_responses"] == 1
+        assert len(summary["errors"]) == 2
+        assert merged["borrower_id"].tolist() == [101, 102, 103]
+        assert merged.loc[0, "stock_performance_outlook"] == "Low"
+        assert pd.isna(merged.loc[1, "stock_performance_outlook"])
+        assert merged.loc[2, "financial_burden_children"] == "High"
+        assert merged.loc[2, "skilled_obsolescence"] == "High"
+
+def test_merge_response_directory():
+    """Borrower ids come from the response file names"""
+    print("Testing response directory merge...")
+    with tempfile.TemporaryDirectory() as tmp:
+        borrowers = os.path.join(tmp, "loan_data.csv")
+        responses = os.path.join(tmp, "responses")
+        output = os.path.join(tmp, "processed.csv")
+        write_borrowers(borrowers)
+
+        os.makedirs(responses)
+        with open(os.path.join(responses, "response_102.txt"), "w", encoding="utf-8") as f:
+            f.write("json\n" + json.dumps(make_response(["Medium"] * 11)))
+
+        summary = merge.merge_csv_with_responses(borrowers, responses, output, workers=1)
+        merged = pd.read_csv(output)
+
+        assert summary["matched"] == 1
+        assert merged.loc[1, "job_market_demand"] == "Medium"
+        assert merged["job_market_demand"].isna().sum() == 2
+
+def test_parse_response_by_key():
+    """Values follow their key names; unknown or missing keys are rejected"""
+    print("Testing response key matching...")
+    response = make_response(["Low"] * 5 + ["High"] + ["Low"] * 5)
+    reordered = dict(reversed(list(response.items())))
+    reordered["Company M&A Possibility"] = reordered.pop("company_M_and_A_possibility")
+
+    signals = merge.parse_response_json(reordered)
+    assert signals["product_relevance"]["criticality"] == "High"
+    assert signals["company_M_and_A_possibility"]["explanation"] == "reason 2"
+
+    renamed = dict(response)
+    renamed["attribute_6"] = renamed.pop("skilled_obsolescence")
+    try:
+        merge.parse_response_json(renamed)
+        assert False, "expected a ValueError"
+    except ValueError as e:
+        assert "unknown attributes: attribute_6" in str(e) and "missing attributes: skilled_obsolescence" in str(e)
+
+if __name__ == "__main__":
+    test_merge_jsonl_responses()
+    test_merge_response_directory()
+    test_parse_response_by_key()
+    print("\n✅ Merge tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the shared model server's batching, reloading and softmax handling
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import model_server
+from risk_attributes import RISK_ATTRIBUTES
+
+def make_borrowers(n=60):
+    rng = np.random.default_rng(0)
+    levels = np.array(["Low", "Medium", "High"], dtype=object)
+    return pd.DataFrame({
+        "borrower_id": range(n),
+        "borrower_name": [f"Borrower {i}" for i in range(n)],
+        "loan_amount": rng.integers(1000, 90000, n).astype(float),
+        "late_payments": rng.integers(0, 10, n),
+        RISK_ATTRIBUTES[0]: levels[rng.integers(0, 3, n)]
+    })
+
+def train_model(path, objective="multi:softprob"):
+    borrowers = make_borrowers()
+    X = model_server.prepare_features(borrowers, ["loan_amount", "late_payments", RISK_ATTRIBUTES[0]])
+    y = (X[RISK_ATTRIBUTES[0]] + (X["late_payments"] > 5)).clip(0, 2).astype(int)
+    model = xgb.XGBClassifier(objective=objective, n_estimators=10, max_depth=3)
+    model.fit(X, y)
+    joblib.dump(model, path)
+    return model, borrowers, X
+
+def test_batched_predictions_match_model():
+    """Queued requests from many threads get the same rows back as one direct model call"""
+    print("Testing model server predictions...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        model, borrowers, X = train_model(path)
+        server = model_server.ModelServer(path)
+        try:
+            labels, probabilities = server.predict_batch(borrowers)
+            assert np.abs(probabilities - model.predict_proba(X)).max() < 1e-5
+            assert (labels == model.predict(X)).all()
+
+            rows = [borrowers.iloc[[i]] for i in range(len(borrowers))]
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(server.predict, rows))
+            assert np.allclose(np.vstack([p for _, p in results]), probabilities)
+            assert server.predict(borrowers.iloc[0].to_dict())[0][0] == labels[0]
+            assert server.latency_stats()['requests'] == len(rows) + 1
+        finally:
+            server.close()
+
+def test_softmax_has_no_probabilities():
+    """multi:softmax models return labels and None instead of probabilities"""
+    print("Testing softmax models...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        model, borrowers, X = train_model(path, objective="multi:softmax")
+        server = model_server.ModelServer(path)
+        try:
+            labels, probabilities = server.predict(borrowers)
+            assert probabilities is None
+            assert (labels == model.predict(X)).all()
+        finally:
+            server.close()
+
+def test_shared_server_reload():
+    """The shared server is reused until the model file changes, reload or close replaces it"""
+    print("Testing shared server reloading...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        train_model(path)
+        try:
+            server = model_server.get_model_server(path)
+            assert model_server.get_model_server(path) is server
+
+            reloaded = model_server.reload(path)
+            assert reloaded is not server
+
+            train_model(path)
+            os.utime(path, (reloaded.model_mtime + 10, reloaded.model_mtime + 10))
+            assert model_server.get_model_server(path) is not reloaded
+        finally:
+            model_server.close(path)
+        assert path not in model_server._servers
+
+if __name__ == "__main__":
+    test_batched_predictions_match_model()
+    test_softmax_has_no_probabilities()
+    test_shared_server_reload()
+    print("\n✅ Model server tests passed")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test exposure-weighted borrower scheduling
+"""
+import os
+import time
+import tempfile
+from datetime import datetime
+import pandas as pd
+import priority_scheduler
+
+BORROWERS = pd.DataFrame([
+    {'borrower_id': 1, 'loan_amount': 10000, 'repayments_on_time': 36, 'late_payments': 0, 'avg_days_late': 0,
+     'job_title': 'Engineer', 'company': 'A', 'industry': 'IT'},
+    {'borrower_id': 2, 'loan_amount': 10000, 'repayments_on_time': 20, 'late_payments': 16, 'avg_days_late': 45,
+     'job_title': 'Engineer', 'company': 'A', 'industry': 'IT'},
+    {'borrower_id': 3, 'loan_amount': 50000, 'repayments_on_time': 36, 'late_payments': 0, 'avg_days_late': 0,
+     'job_title': 'Engineer', 'company': 'A', 'industry': 'IT'},
+])
+
+def test_exposure_scores():
+    """Larger, more delinquent and staler loans get higher exposure"""
+    print("Testing exposure scores...")
+    now = datetime(2025, 6, 30)
+    scores = priority_scheduler.exposure_scores(BORROWERS, scored_at={'3': '2025-06-30 00:00:00'}, now=now)
+    assert scores[1] > scores[0]                    # delinquent beats clean at the same amount
+    assert scores[2] > scores[1]                    # 5x the amount, even when freshly scored
+    assert scores[0] == 10000 * 2                   # never scored: fully stale
+    assert scores[2] == 50000
+
+def test_scheduler_preemption():
+    """Work submitted mid-run with higher priority is served before queued work"""
+    print("Testing scheduler preemption...")
+    scheduler = priority_scheduler.PriorityScheduler()
+    for key, priority in [("a", 1), ("b", 3), ("c", 2)]:
+        scheduler.submit(key, key, priority)
+    scheduler.submit("a", "a", 0.5)                 # reprioritized, not duplicated
+
+    order = []
+    for key, _, _ in scheduler.drain():
+        order.append(key)
+        if key == "b":
+            scheduler.submit("urgent", "urgent", 10)
+    assert order == ["b", "urgent", "c", "a"]
+
+    scheduler.submit("late", "late", 1)
+    assert list(scheduler.drain(deadline=time.time() - 1)) == []
+    assert len(scheduler) == 1
+
+def test_iter_prioritized_chunks():
+    """A borrower file comes back highest exposure first, in small chunks"""
+    print("Testing prioritized file order...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "borrowers.csv")
+        BORROWERS.assign(borrower_name="x", loan_start_year=2020).to_csv(path, index=False)
+        chunks = list(priority_scheduler.iter_prioritized_chunks(path, chunksize=2))
+        assert [len(c) for c in chunks] == [2, 1]
+        assert [int(b) for c in chunks for b in c['borrower_id']] == [3, 2, 1]
+
+def test_repeated_borrower_ids():
+    """Several loans of one borrower are all scheduled"""
+    print("Testing repeated borrower ids...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "borrowers.csv")
+        BORROWERS.assign(borrower_id=[1, 1, 2]).to_csv(path, index=False)
+        rows = list(priority_scheduler.iter_prioritized(path))
+        assert [(row['borrower_id'], row['loan_amount']) for row in rows] == [("2", 50000), ("1", 10000), ("1", 10000)]
+
+def test_streamed_windows():
+    """Ordering streams the file in windows, never reading it whole, and falls back to file order"""
+    print("Testing streamed priority windows...")
+    import borrower_io
+
+    def no_full_read(*args, **kwargs):
+        raise AssertionError("the whole table should not be read")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "borrowers.csv")
+        borrowers = pd.concat([BORROWERS] * 4, ignore_index=True)
+        borrowers['borrower_id'] = [f"B{i}" for i in range(len(borrowers))]
+        borrowers['loan_amount'] = [1000 * (i % 5 + 1) for i in range(len(borrowers))]
+        borrowers.loc[3, 'company'] = None                    # invalid, skipped
+        borrowers.to_csv(path, index=False)
+        expected = (priority_scheduler.load_borrowers(path)
+                    .assign(exposure=lambda df: priority_scheduler.exposure_scores(df))
+                    .sort_values('exposure', ascending=False, kind='stable')['borrower_id'].tolist())
+
+        original = (borrower_io.read_table, priority_scheduler.PRIORITY_WINDOW,
+                    priority_scheduler.READ_CHUNK, priority_scheduler.MAX_PRIORITIZED_ROWS)
+        try:
+            borrower_io.read_table = no_full_read
+            priority_scheduler.PRIORITY_WINDOW, priority_scheduler.READ_CHUNK = 4, 3
+            chunks = list(priority_scheduler.iter_prioritized_chunks(path, chunksize=3))
+            assert [len(c) for c in chunks] == [3, 1, 3, 1, 3]
+            assert [b for c in chunks for b in c['borrower_id']] == expected
+
+            priority_scheduler.MAX_PRIORITIZED_ROWS = 5
+            rows = list(priority_scheduler.iter_prioritized(path))
+            assert [row['borrower_id'] for row in rows] == [b for b in borrowers['borrower_id'] if b != "B3"]
+        finally:
+            (borrower_io.read_table, priority_scheduler.PRIORITY_WINDOW,
+             priority_scheduler.READ_CHUNK, priority_scheduler.MAX_PRIORITIZED_ROWS) = original
+
+if __name__ == "__main__":
+    test_exposure_scores()
+    test_scheduler_preemption()
+    test_iter_prioritized_chunks()
+    test_repeated_borrower_ids()
+    test_streamed_windows()
+    print("\n✅ Priority scheduler tests passed")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test pruning queries whose answers can't change the model's predicted class
+"""
+import os
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import query_pruning
+
+def train_model(path):
+    """A model whose class depends only on product_relevance"""
+    rng = np.random.default_rng(0)
+    features = ['loan_amount'] + sorted(set(query_pruning.QUERY_FEATURES))
+    X = pd.DataFrame({f: rng.integers(0, 3, 600).astype(float) for f in features})
+    X['loan_amount'] = rng.integers(5000, 100000, 600).astype(float)
+    X['college_education_cost'] = rng.integers(10000, 50000, 600).astype(float)
+    model = xgb.XGBClassifier(objective='multi:softprob', n_estimators=20, max_depth=2)
+    model.fit(X, X['product_relevance'].astype(int))
+    joblib.dump(model, path)
+
+def test_prune_queries():
+    """Irrelevant queries are pruned, the deciding one is kept unless already known"""
+    print("Testing query pruning...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        train_model(path)
+        model = query_pruning.load_model(path)
+
+        borrower = pd.Series({'borrower_id': 1, 'loan_amount': 20000})
+        result = query_pruning.prune_queries(borrower, model)
+        kept = [query_pruning.QUERY_FEATURES[i] for i in result['unknown'] if i not in result['pruned']]
+        assert kept == ['product_relevance']
+        assert result['decided_class'] is None
+        assert query_pruning.savings(len(result['pruned']), len(result['unknown'])) == (11, 11)
+
+        # Eleven open queries are too many to enumerate, so pruning them is an estimate
+        assert result['exact'] is False
+
+        result = query_pruning.prune_queries(borrower, model, known={'product_relevance': 'High'})
+        assert len(result['pruned']) == 11 and result['decided_class'] == 2
+        assert query_pruning.savings(11, 11) == (11, 13)
+
+def test_exact_pruning():
+    """With few open queries every answer combination is checked"""
+    print("Testing exhaustive pruning checks...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        train_model(path)
+        model = query_pruning.load_model(path)
+
+        open_features = ['product_relevance', 'job_automation_risk', 'pollution_projection']
+        known = {f: 'Medium' for f in query_pruning.QUERY_FEATURES if f not in open_features}
+        known['college_education_cost'] = 30000.0
+        result = query_pruning.prune_queries(pd.Series({'borrower_id': 1, 'loan_amount': 20000}), model, known)
+        kept = [query_pruning.QUERY_FEATURES[i] for i in result['unknown'] if i not in result['pruned']]
+        assert kept == ['product_relevance'] and result['exact'] is True
+
+def test_decided_borrower_skips_llm_calls():
+    """A borrower whose class is decided gets no search, summary or extraction call"""
+    print("Testing decided borrowers in the pipeline...")
+    import llm_router
+    import loan_repay_predictor
+
+    def no_call(*args, **kwargs):
+        raise AssertionError("no search or LLM call expected")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        train_model(path)
+        borrower = pd.Series({'borrower_id': 1, 'loan_amount': 20000, 'product_relevance': 'High',
+                              'job_title': 'Teacher', 'company': 'DPS', 'industry': 'Education'})
+
+        original = (query_pruning._models.get(query_pruning.MODEL_PATH), llm_router._get_model,
+                    loan_repay_predictor.search_web)
+        try:
+            query_pruning._models[query_pruning.MODEL_PATH] = query_pruning.load_model(path)
+            llm_router._get_model = no_call
+            loan_repay_predictor.search_web = no_call
+            features, summary, decided_class = loan_repay_predictor.analyze_borrower(borrower)
+        finally:
+            query_pruning._models[query_pruning.MODEL_PATH], llm_router._get_model, \
+                loan_repay_predictor.search_web = original
+        assert features == {'product_demand': 'declining'} and decided_class == 2 and "class 2" in summary
+
+def test_pipeline_reports_decided_class():
+    """A borrower decided from the entity signal table gets its class, not a rule score of 0"""
+    print("Testing decided borrowers in the pipeline output...")
+    import llm_router
+    import loan_repay_predictor
+    import entity_signals
+
+    def no_call(*args, **kwargs):
+        raise AssertionError("no search or LLM call expected")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        train_model(path)
+        pd.DataFrame([{'borrower_id': 'B1', 'loan_amount': 20000, 'job_title': 'Teacher', 'company': 'DPS',
+                       'industry': 'Education'}]).to_csv(os.path.join(tmp, "borrowers.csv"), index=False)
+        table = entity_signals.add_signals(entity_signals.load_signal_table(os.path.join(tmp, "none.csv")),
+                                           "company", "DPS", {"product_relevance": "High"})
+
+        original = (query_pruning._models.get(query_pruning.MODEL_PATH), llm_router._get_model,
+                    loan_repay_predictor.search_web)
+        try:
+            os.chdir(tmp)
+            entity_signals.save_signal_table(table)
+            query_pruning._models[query_pruning.MODEL_PATH] = query_pruning.load_model(path)
+            llm_router._get_model = no_call
+            loan_repay_predictor.search_web = no_call
+            loan_repay_predictor.run_pipeline("borrowers.csv", "results.csv")
+            results = pd.read_csv("results.csv")
+        finally:
+            os.chdir(cwd)
+            query_pruning._models[query_pruning.MODEL_PATH], llm_router._get_model, \
+                loan_repay_predictor.search_web = original
+        assert results['decided_class'].tolist() == [2] and results['pruned'].tolist() == [True]
+        assert results['risk_score'].isna().all()
+
+if __name__ == "__main__":
+    test_prune_queries()
+    test_exact_pruning()
+    test_decided_borrower_skips_llm_calls()
+    test_pipeline_reports_decided_class()
+    print("\n✅ Query pruning tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test SerpAPI budget planning: cache hits, dedupe, priority and overflow routing
+"""
+import os
+import sys
+import types
+import tempfile
+import pandas as pd
+
+sys.modules.setdefault("keys", types.SimpleNamespace(SERP_KEY="test", GEMINI_KEY="test"))
+
+import quota_planner
+import entity_signals
+import borrower_ddg_searcher
+import borrower_serp_searcher
+
+BORROWERS = pd.DataFrame([
+    {'borrower_id': 101, 'borrower_name': 'Small', 'loan_amount': 5000, 'job_title': 'Software Engineer',
+     'company': 'Infosys', 'industry': 'IT'},
+    {'borrower_id': 102, 'borrower_name': 'Large', 'loan_amount': 90000, 'job_title': 'Software Engineer',
+     'company': 'Infosys', 'industry': 'IT'},
+])
+EMPTY_SIGNALS = pd.DataFrame(columns=entity_signals.SIGNAL_COLUMNS)
+
+def write_result(directory, prefix, borrower_id, query):
+    filename = f"{directory}/{prefix}_{borrower_id}_{quota_planner.safe_query(query)}.txt"
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(f"Search Query: {query}\nBorrower ID: {borrower_id}\n{'=' * 80}\n\n1. Title\n   URL: https://example.com\n   Summary: s\n")
+    return filename
+
+def test_plan_dedupes_and_respects_budget():
+    """Identical borrowers need one set of searches; the larger loan gets the SerpAPI calls"""
+    print("Testing plan...")
+    with tempfile.TemporaryDirectory() as tmp:
+        queries = borrower_ddg_searcher.generate_queries('Software Engineer', 'Infosys', 'IT')
+        write_result(tmp, "SERP", 101, queries[0])
+
+        plan = quota_planner.plan_searches(BORROWERS, quota=8, articles_dir=tmp, signal_table=EMPTY_SIGNALS, reserve=3)
+        counts = plan['action'].value_counts().to_dict()
+        assert counts == {'serpapi': 5, 'free': 6, 'duplicate': 11, 'cached': 1, 'copy': 1}
+        assert set(plan[plan['action'].isin(['serpapi', 'free'])]['borrower_id']) == {'102'}
+        assert plan.iloc[0]['borrower_id'] == '102'
+
+def test_execute_copies_shared_results():
+    """Only unique queries are searched; everyone else gets a copy"""
+    print("Testing plan execution...")
+    calls = []
+    def fake_search(engine):
+        def search(query, borrower_id, output_dir):
+            calls.append(engine)
+            return write_result(output_dir, engine, borrower_id, query)
+        return search
+
+    originals = borrower_serp_searcher.search_single_query, borrower_ddg_searcher.search_single_query
+    borrower_serp_searcher.search_single_query = fake_search("SERP")
+    borrower_ddg_searcher.search_single_query = fake_search("DDG")
+    quota_planner.cassette.configure("replay")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            plan = quota_planner.plan_searches(BORROWERS, quota=4, articles_dir=tmp, signal_table=EMPTY_SIGNALS, reserve=0)
+            saved = quota_planner.execute_plan(plan, tmp)
+            assert calls.count("SERP") == 4 and calls.count("DDG") == 8
+            assert len(saved['101']) == len(saved['102']) == 12
+            with open(saved['101'][0], encoding="utf-8") as f:
+                assert "Borrower ID: 101" in f.read()
+    finally:
+        borrower_serp_searcher.search_single_query, borrower_ddg_searcher.search_single_query = originals
+        quota_planner.cassette.configure("off")
+
+if __name__ == "__main__":
+    test_plan_dedupes_and_respects_budget()
+    test_execute_copies_shared_results()
+    print("\n✅ Quota planner tests passed")
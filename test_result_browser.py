@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test filtering, sorting and paging of the result browser on a large table
+"""
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import borrower_io
+import result_browser
+
+def make_results(n):
+    rng = np.random.default_rng(0)
+    scores = rng.normal(0, 3, n).astype("float32")
+    scores[::1000] = np.nan
+    return borrower_io.coerce_dtypes(pd.DataFrame({
+        "borrower_id": np.arange(1, n + 1),
+        "job_title": rng.choice(["Software Engineer", "Teacher", "Nurse"], n),
+        "company": rng.choice(["Infosys", "Bosch", "DPS"], n),
+        "industry": rng.choice(["IT", "Automotive", "Education"], n),
+        "risk_score": scores,
+        "explanation": [f"reason {i}" for i in range(1, n + 1)]
+    }))
+
+def test_filter_sort_page():
+    """Filters combine, missing scores sort last and pages slice the ordered rows"""
+    print("Testing filter/sort/page on 100k rows...")
+    df = make_results(100_000)
+
+    start = time.time()
+    positions = result_browser.row_order(df, "risk_score", ascending=False, search="bosch",
+                                         min_score=-2.0, industries=["IT"])
+    elapsed = time.time() - start
+
+    expected = df[(df["company"] == "Bosch") & (df["industry"] == "IT") & (df["risk_score"] >= -2.0)]
+    assert len(positions) == len(expected)
+    ordered = df["risk_score"].to_numpy()[positions]
+    assert np.all(np.diff(ordered) <= 0)
+
+    all_rows = result_browser.row_order(df, "risk_score", ascending=True)
+    assert len(all_rows) == len(df)
+    assert df["risk_score"].iloc[all_rows[-100:]].isna().all()
+
+    page = result_browser.get_page(df, positions, 2, 50)
+    assert page["borrower_id"].tolist() == df["borrower_id"].iloc[positions[50:100]].tolist()
+    assert result_browser.page_count(len(positions), 50) == -(-len(positions) // 50)
+    assert result_browser.page_count(0, 50) == 1
+    print(f"  {len(positions)} matching rows ordered in {elapsed * 1000:.1f} ms")
+
+def test_lazy_explanation():
+    """Explanations come from the Parquet side file only for the requested borrower"""
+    print("Testing lazy explanation loading...")
+    df = make_results(1000)
+    assert result_browser.load_explanation(7, df) == "reason 7"
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("  pyarrow not installed, skipping Parquet part")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.parquet")
+        borrower_io.write_results(df, path)
+        table = borrower_io.read_results(path)
+        assert "explanation" not in table.columns
+        assert result_browser.load_explanation(42, table, path) == "reason 42"
+
+if __name__ == "__main__":
+    test_filter_sort_page()
+    test_lazy_explanation()
+    print("\n✅ Result browser tests passed")
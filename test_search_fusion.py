@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test parallel multi-engine search with reciprocal-rank fusion
+"""
+import time
+import search_fusion
+
+SNIPPET = "A detailed outlook for the company over the next five years."
+
+def article(title, link, snippet=SNIPPET):
+    return {'title': title, 'link': link, 'snippet': snippet}
+
+def test_fuse_dedupes_urls():
+    """The same page from two engines is merged and ranked above single-engine hits"""
+    print("Testing RRF fusion and URL dedupe...")
+    fused = search_fusion.fuse({
+        "serpapi": [article("A", "https://www.example.com/a/?utm_source=x"), article("B", "https://example.com/b")],
+        "duckduckgo": [article("C", "https://example.com/c"),
+                       article("A", "https://duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fa", SNIPPET * 2)],
+    })
+    assert [a['title'] for a in fused] == ["A", "C", "B"]
+    assert fused[0]['engines'] == ["serpapi", "duckduckgo"]
+    assert fused[0]['snippet'] == SNIPPET * 2
+    assert search_fusion.normalize_url("http://WWW.Example.com/a#top") == "example.com/a"
+
+def test_search_returns_before_slow_backend():
+    """Enough quality hits from a fast backend return without waiting for a slow one"""
+    print("Testing early return...")
+    def fast(query, num_results):
+        return [article(f"Fast {i}", f"https://fast.example/{i}") for i in range(num_results)]
+
+    def slow(query, num_results):
+        time.sleep(2)
+        return [article("Slow", "https://slow.example/1")]
+
+    def broken(query, num_results):
+        raise RuntimeError("blocked")
+
+    start = time.perf_counter()
+    results = search_fusion.search("Infosys outlook", num_results=5,
+                                   backends={"fast": fast, "slow": slow, "broken": broken}, grace=0.05)
+    assert time.perf_counter() - start < 1.5
+    assert len(results) == 5
+    assert all(a['engines'] == ["fast"] for a in results)
+
+    # Without enough quality hits it waits for every backend
+    results = search_fusion.search("Infosys outlook", num_results=5, enough=10,
+                                   backends={"fast": fast, "slow": slow})
+    assert [a['title'] for a in results[:2]] == ["Fast 0", "Slow"]
+
+def test_abandoned_calls_are_bounded():
+    """Slow backend calls left running by earlier searches don't pile up"""
+    print("Testing abandoned backend calls...")
+    import threading
+    release = threading.Event()
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def stuck(query, num_results):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(5)
+        with lock:
+            running[0] -= 1
+        return []
+
+    def fast(query, num_results):
+        return [article(f"Fast {i}", f"https://fast.example/{i}") for i in range(num_results)]
+
+    try:
+        for i in range(6):
+            results = search_fusion.search(f"query {i}", num_results=3, backends={"fast": fast, "stuck": stuck},
+                                           grace=0.01)
+            assert len(results) == 3
+        assert peak[0] <= search_fusion.BACKEND_THREADS
+    finally:
+        release.set()
+
+if __name__ == "__main__":
+    test_fuse_dedupes_urls()
+    test_search_returns_before_slow_backend()
+    test_abandoned_calls_are_bounded()
+    print("\n✅ Search fusion tests passed")
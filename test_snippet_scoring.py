@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the snippet-only fast scoring mode and its page-scraping fallback
+"""
+import os
+import json
+import types
+import tempfile
+import pandas as pd
+import llm_router
+import advanced_web_scraper
+import snippet_scoring
+from risk_attributes import RISK_ATTRIBUTES
+
+BORROWER = pd.Series({'borrower_id': 7, 'job_title': 'Data Analyst', 'company': 'Infosys', 'industry': 'IT Services'})
+SNIPPET = "Analysts expect steady demand for IT services over the next five years."
+
+def saved_urls(thin_attribute):
+    """Saved search results for BORROWER: three snippets per query, one for `thin_attribute`"""
+    urls_data = []
+    for attribute, query in snippet_scoring.attribute_queries(BORROWER).items():
+        for n in range(1 if attribute == thin_attribute else 3):
+            urls_data.append({'url': f"https://example.com/{attribute}/{n}", 'title': f"{attribute} {n}",
+                              'summary': SNIPPET, 'borrower_id': '7', 'search_query': query})
+    return urls_data
+
+def fake_model(prompts):
+    """Rates every attribute High with confidence 0.9; page prompts rate Low"""
+    def generate_content(prompt):
+        prompts.append(prompt)
+        level = "Low" if "web page excerpts" in prompt else "High"
+        answer = {a: {"criticality": level, "confidence": 0.9, "explanation": "x"} for a in RISK_ATTRIBUTES if a in prompt}
+        return types.SimpleNamespace(text="```json\n" + json.dumps(answer) + "\n```", usage_metadata=None)
+    return types.SimpleNamespace(generate_content=generate_content)
+
+def test_parse_extraction():
+    """Fenced JSON parses; bad levels and confidences come back unusable"""
+    print("Testing snippet extraction parsing...")
+    parsed = snippet_scoring.parse_extraction(
+        '```json\n{"product_relevance": {"criticality": "high ", "confidence": 1.4},'
+        ' "automation_risk": {"criticality": "Severe", "confidence": 0.8}}\n```',
+        ["product_relevance", "automation_risk", "trade_exposure"])
+    assert parsed["product_relevance"]["criticality"] == "High"
+    assert parsed["product_relevance"]["confidence"] == 1.0
+    assert parsed["automation_risk"] == {'criticality': None, 'confidence': 0.0, 'explanation': ''}
+    assert parsed["trade_exposure"]["confidence"] == 0.0
+
+    parsed = snippet_scoring.parse_extraction('Here: {a: High}', ["product_relevance"])
+    assert parsed["product_relevance"] == {'criticality': None, 'confidence': 0.0, 'explanation': ''}
+
+def test_fast_score_continues_after_errors():
+    """One borrower's failed LLM call doesn't stop the portfolio run"""
+    print("Testing fast scoring error handling...")
+    calls = []
+
+    def generate_content(prompt):
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise RuntimeError("quota exceeded")
+        return types.SimpleNamespace(text="not json at all", usage_metadata=None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path, output_path = os.path.join(tmp, "borrowers.csv"), os.path.join(tmp, "fast.csv")
+        pd.DataFrame([BORROWER, BORROWER]).assign(borrower_id=['7', '8'], loan_amount=[2000, 1000]) \
+            .to_csv(input_path, index=False)
+        evidence = [{'title': 'Outlook', 'link': 'https://example.com', 'snippet': SNIPPET}] * 3
+
+        original = llm_router._get_model, snippet_scoring.search_evidence
+        try:
+            llm_router._get_model = lambda model_name: types.SimpleNamespace(generate_content=generate_content)
+            snippet_scoring.search_evidence = lambda row: {a: evidence for a in snippet_scoring.attribute_queries(row)}
+            snippet_scoring.fast_score(input_path, output_path, articles_dir=tmp, scrape=False,
+                                       model_path=os.path.join(tmp, "no_model.pkl"))
+        finally:
+            llm_router._get_model, snippet_scoring.search_evidence = original
+        scores = pd.read_csv(output_path)
+        assert len(calls) == 2 and len(scores) == 1
+        assert scores['low_confidence'].iloc[0].count(",") == len(RISK_ATTRIBUTES) - 1
+
+def test_fast_score_scrapes_only_low_confidence():
+    """Only the attribute with thin evidence is scraped and re-rated from its pages"""
+    print("Testing fast scoring with page fallback...")
+    thin = RISK_ATTRIBUTES[0]
+    prompts, scraped = [], []
+
+    def scrape(url, query=None):
+        scraped.append(url)
+        return {'url': url, 'title': '', 'content': "Full article text. " * 50, 'content_length': 950,
+                'status': 'success', 'error': None}
+
+    original_model, original_scrape = llm_router._get_model, advanced_web_scraper.scrape_website_content
+    try:
+        llm_router._get_model = lambda model_name: fake_model(prompts)
+        advanced_web_scraper.scrape_website_content = scrape
+        result = snippet_scoring.fast_score_borrower(BORROWER, saved_urls(thin), threshold=0.6)
+
+        assert len(prompts) == 2
+        assert all(f"Attribute: {a}\n" in prompts[0] for a in RISK_ATTRIBUTES)
+        assert [a for a in RISK_ATTRIBUTES if f"Attribute: {a}\n" in prompts[1]] == [thin]
+        assert scraped == [f"https://example.com/{thin}/0"]
+        assert result[thin] == "Low" and result['scraped_attributes'] == thin
+        assert all(result[a] == "High" and result[f"{a}_confidence"] == 0.9 for a in RISK_ATTRIBUTES[1:])
+        assert result['low_confidence'] == "" and result['provisional_likelihood'] is None
+
+        prompts.clear()
+        scraped.clear()
+        result = snippet_scoring.fast_score_borrower(BORROWER, saved_urls(thin), scrape=False)
+        assert len(prompts) == 1 and scraped == []
+        assert result[thin] == "High" and result[f"{thin}_confidence"] == 0.3
+        assert result['low_confidence'] == thin and result['scraped_attributes'] == ""
+    finally:
+        llm_router._get_model, advanced_web_scraper.scrape_website_content = original_model, original_scrape
+
+if __name__ == "__main__":
+    test_parse_extraction()
+    test_fast_score_scrapes_only_low_confidence()
+    test_fast_score_continues_after_errors()
+    print("\n✅ Snippet scoring tests passed")
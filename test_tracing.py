@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test span recording, OTLP/JSON export and Prometheus metrics
+"""
+import os
+import tempfile
+import tracing
+
+def test_spans_and_export():
+    """Nested spans keep their parent, errors are marked and both export files are written"""
+    print("Testing span export...")
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = os.path.join(tmp, "traces.jsonl")
+        tracing.enable(trace_path)
+        try:
+            with tracing.span("borrower", borrower_id="101"):
+                for i in range(3):
+                    with tracing.span("query") as query:
+                        query.set("bytes", 100)
+                        query.add("cache_hits")
+                try:
+                    with tracing.span("llm.generate", task="ranking"):
+                        raise RuntimeError("quota exceeded")
+                except RuntimeError:
+                    pass
+        finally:
+            tracing.disable()
+            tracing.reset()
+
+        spans = tracing.load_spans(trace_path)
+        by_name = {}
+        for s in spans:
+            by_name.setdefault(s["name"], []).append(s)
+
+        borrower = by_name["borrower"][0]
+        assert len(by_name["query"]) == 3
+        assert all(s["parent_id"] == borrower["span_id"] for s in by_name["query"])
+        assert by_name["llm.generate"][0]["error"]
+
+        rows = {row["name"]: row for row in tracing.time_breakdown(spans)}
+        assert rows["borrower"]["self_seconds"] <= rows["borrower"]["total_seconds"]
+
+        with open(os.path.join(tmp, "traces.prom"), "r", encoding="utf-8") as f:
+            metrics = f.read()
+        assert 'loan_span_duration_seconds_count{span="query"} 3' in metrics
+        assert 'loan_bytes_total{span="query"} 300' in metrics
+        assert 'loan_cache_hits_total{span="query"} 3' in metrics
+        assert 'loan_span_errors_total{span="llm.generate"} 1' in metrics
+
+def test_disabled_is_noop():
+    """Without enable() nothing is recorded"""
+    print("Testing disabled tracing...")
+    with tracing.span("query") as query:
+        query.set("bytes", 1)
+    tracing.current_span().set("bytes", 1)
+    assert tracing.prometheus_text().count("span=") == 0
+
+if __name__ == "__main__":
+    test_spans_and_export()
+    test_disabled_is_noop()
+    print("\n✅ Tracing tests passed")
@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Set LOAN_TRACE_FILE=traces.jsonl to record spans; metrics go next to it as .prom unless LOAN_METRICS_FILE is set
+TRACE_PATH = os.environ.get("LOAN_TRACE_FILE")
+METRICS_PATH = os.environ.get("LOAN_METRICS_FILE")
+
+SERVICE_NAME = "loan_monitoring"
+
+# Upper bounds (seconds) of the Prometheus duration histogram
+DURATION_BUCKETS = [0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# Finished spans are written out in batches of this size during long runs
+FLUSH_EVERY = 1000
+
+# Numeric span attributes that are also summed into Prometheus counters
+COUNTERS = ["bytes", "input_tokens", "output_tokens", "cache_hits", "results"]
+
+_enabled = False
+_spans = []
+_metrics = {}
+_lock = threading.Lock()
+_current = contextvars.ContextVar("current_span", default=None)
+_trace_id = os.urandom(16).hex()
+
+class Span:
+    """One timed operation; attributes are set while it runs"""
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name, parent_id, attributes):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def add(self, key, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+class _NoSpan:
+    """Returned when tracing is off, so instrumented code doesn't need to check"""
+    def set(self, key, value):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+_NO_SPAN = _NoSpan()
+
+def enable(trace_path="traces.jsonl", metrics_path=None):
+    """Start recording spans to trace_path (and Prometheus metrics to metrics_path)"""
+    global _enabled, TRACE_PATH, METRICS_PATH
+    TRACE_PATH = trace_path
+    METRICS_PATH = metrics_path or METRICS_PATH or os.path.splitext(trace_path)[0] + ".prom"
+    if not _enabled:
+        atexit.register(flush)
+    _enabled = True
+
+def disable():
+    """Stop recording; spans still buffered are written out first"""
+    global _enabled, TRACE_PATH, METRICS_PATH
+    flush()
+    _enabled = False
+    TRACE_PATH = METRICS_PATH = None
+
+def is_enabled():
+    return _enabled
+
+@contextmanager
+def span(name, **attributes):
+    """Time a block as a child of the current span; yields the span for setting bytes, tokens, ..."""
+    if not _enabled:
+        yield _NO_SPAN
+        return
+
+    parent = _current.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        _record(current)
+
+def current_span():
+    """The innermost active span, for adding attributes from inside traced functions"""
+    return (_current.get() if _enabled else None) or _NO_SPAN
+
+def traced(name):
+    """Decorator form of span()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _record(current):
+    seconds = (current.end_ns - current.start_ns) / 1e9
+    with _lock:
+        _spans.append(current)
+        full = len(_spans) >= FLUSH_EVERY
+        stats = _metrics.setdefault(current.name, {
+            'count': 0,
+            'errors': 0,
+            'seconds': 0.0,
+            'buckets': [0] * len(DURATION_BUCKETS),
+            'counters': {}
+        })
+        stats['count'] += 1
+        stats['errors'] += 1 if current.error else 0
+        stats['seconds'] += seconds
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                stats['buckets'][i] += 1
+        for key in COUNTERS:
+            value = current.attributes.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stats['counters'][key] = stats['counters'].get(key, 0) + value
+    if full:
+        flush()
+
+# ---------------- Export ----------------
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+def _otlp_span(current):
+    otlp = {
+        "traceId": _trace_id,
+        "spanId": current.span_id,
+        "name": current.name,
+        "kind": 1,
+        "startTimeUnixNano": str(current.start_ns),
+        "endTimeUnixNano": str(current.end_ns),
+        "attributes": [_attribute(key, value) for key, value in current.attributes.items()],
+        "status": {"code": 2, "message": current.error} if current.error else {"code": 1}
+    }
+    if current.parent_id:
+        otlp["parentSpanId"] = current.parent_id
+    return otlp
+
+def otlp_request(spans):
+    """OTLP/JSON ExportTraceServiceRequest for a batch of spans"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", SERVICE_NAME),
+                                    _attribute("process.pid", os.getpid())]},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [_otlp_span(s) for s in spans]}]
+    }]}
+
+def prometheus_text():
+    """Span metrics in the Prometheus text exposition format"""
+    with _lock:
+        metrics = {name: dict(stats, buckets=list(stats['buckets']), counters=dict(stats['counters']))
+                   for name, stats in _metrics.items()}
+
+    lines = ["# HELP loan_span_duration_seconds Wall time of traced operations",
+             "# TYPE loan_span_duration_seconds histogram"]
+    for name, stats in sorted(metrics.items()):
+        for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+            lines.append(f'loan_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+        lines.append(f'loan_span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {stats["count"]}')
+        lines.append(f'loan_span_duration_seconds_sum{{span="{name}"}} {stats["seconds"]:.6f}')
+        lines.append(f'loan_span_duration_seconds_count{{span="{name}"}} {stats["count"]}')
+
+    lines += ["# HELP loan_span_errors_total Traced operations that raised",
+              "# TYPE loan_span_errors_total counter"]
+    lines += [f'loan_span_errors_total{{span="{name}"}} {stats["errors"]}' for name, stats in sorted(metrics.items())]
+
+    for key in COUNTERS:
+        rows = [(name, stats['counters'][key]) for name, stats in sorted(metrics.items()) if key in stats['counters']]
+        if rows:
+            lines += [f"# HELP loan_{key}_total Sum of the '{key}' span attribute",
+                      f"# TYPE loan_{key}_total counter"]
+            lines += [f'loan_{key}_total{{span="{name}"}} {value}' for name, value in rows]
+    return "\n".join(lines) + "\n"
+
+def flush():
+    """Append finished spans to the trace file and rewrite the metrics file"""
+    if not TRACE_PATH:
+        return
+    with _lock:
+        spans = list(_spans)
+        _spans.clear()
+
+    if spans:
+        with open(TRACE_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(otlp_request(spans)) + "\n")
+    if METRICS_PATH:
+        with open(METRICS_PATH, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+
+def reset():
+    """Drop recorded spans and metrics"""
+    with _lock:
+        _spans.clear()
+        _metrics.clear()
+
+# ---------------- Reading traces ----------------
+
+def load_spans(path):
+    """Spans from an OTLP/JSON lines file as plain dicts"""
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    for s in scope["spans"]:
+                        spans.append({
+                            "name": s["name"],
+                            "span_id": s["spanId"],
+                            "parent_id": s.get("parentSpanId"),
+                            "seconds": (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e9,
+                            "error": s.get("status", {}).get("code") == 2
+                        })
+    return spans
+
+def time_breakdown(spans):
+    """Per span name: calls, total and self time (total minus time spent in child spans)"""
+    child_seconds = {}
+    for s in spans:
+        if s["parent_id"]:
+            child_seconds[s["parent_id"]] = child_seconds.get(s["parent_id"], 0.0) + s["seconds"]
+
+    rows = {}
+    for s in spans:
+        row = rows.setdefault(s["name"], {"name": s["name"], "calls": 0, "errors": 0,
+                                          "total_seconds": 0.0, "self_seconds": 0.0})
+        row["calls"] += 1
+        row["errors"] += 1 if s["error"] else 0
+        row["total_seconds"] += s["seconds"]
+        row["self_seconds"] += max(s["seconds"] - child_seconds.get(s["span_id"], 0.0), 0.0)
+    return sorted(rows.values(), key=lambda row: row["self_seconds"], reverse=True)
+
+def print_breakdown(path):
+    """Print where a traced run's wall time went"""
+    spans = load_spans(path)
+    rows = time_breakdown(spans)
+    wall = sum(s["seconds"] for s in spans if not s["parent_id"])
+
+    print(f"{len(spans)} spans, {wall:.2f}s in top-level spans")
+    print(f"  {'Span':<22} {'Calls':>7} {'Errors':>6} {'Total s':>9} {'Self s':>9} {'Self %':>7}")
+    for row in rows:
+        share = 100 * row["self_seconds"] / wall if wall else 0.0
+        print(f"  {row['name']:<22} {row['calls']:>7} {row['errors']:>6} {row['total_seconds']:>9.2f} "
+              f"{row['self_seconds']:>9.2f} {share:>6.1f}%")
+
+if TRACE_PATH:
+    enable(TRACE_PATH, METRICS_PATH)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python tracing.py <traces.jsonl>")
+        sys.exit(1)
+    print_breakdown(sys.argv[1])
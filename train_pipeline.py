@@ -0,0 +1,257 @@
+import os
+import json
+import glob
+import time
+import shutil
+import argparse
+import resource
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import xgboost as xgb
+import joblib
+import borrower_io
+from predict_likelihood import prepare_features, DROP_COLS
+
+LABEL_COLUMN = "loan_repayment_likelihood"
+
+# Likelihood labels run from -2 to 2, XGBoost needs classes starting at 0
+LABEL_OFFSET = 2
+NUM_CLASSES = 5
+
+MODELS_DIR = "models"
+
+DEFAULT_SEARCH_SPACE = {
+    "max_depth": [3, 5, 7],
+    "learning_rate": [0.05, 0.1, 0.3],
+    "subsample": [0.8, 1.0],
+    "min_child_weight": [1, 5]
+}
+
+BASE_PARAMS = {
+    "objective": "multi:softprob",
+    "num_class": NUM_CLASSES,
+    "eval_metric": "mlogloss",
+    "tree_method": "hist",
+    "seed": 42
+}
+
+def expand_shards(patterns):
+    """Resolve shard globs (CSV or Parquet) to a sorted file list"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"No shards match {pattern}")
+        paths.extend(matches)
+    return paths
+
+def read_shard(path):
+    """Read one shard into features and shifted labels"""
+    # Risk attributes come back as int8 categoricals (borrower_io / risk_attributes)
+    df = borrower_io.read_table(path)
+
+    labels = df[LABEL_COLUMN].to_numpy(dtype=np.float32) + LABEL_OFFSET
+    features = df.drop(columns=[LABEL_COLUMN])
+    feature_names = [col for col in features.columns if col not in DROP_COLS]
+    return prepare_features(features, feature_names), labels
+
+class ShardIter(xgb.DataIter):
+    """Feeds shards to XGBoost one at a time so the full table is never in memory"""
+
+    def __init__(self, paths, cache_prefix=None):
+        self.paths = paths
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._position == len(self.paths):
+            return False
+        X, y = read_shard(self.paths[self._position])
+        input_data(data=X, label=y)
+        self._position += 1
+        return True
+
+    def reset(self):
+        self._position = 0
+
+def build_dmatrix(paths, external_memory=False, cache_dir=None, ref=None):
+    """Quantized DMatrix built from a shard iterator.
+
+    With `external_memory`, the quantized pages are cached on disk instead of RAM.
+    """
+    if external_memory:
+        cache_prefix = os.path.join(cache_dir or tempfile.gettempdir(), "xgb_cache")
+        return xgb.ExtMemQuantileDMatrix(ShardIter(paths, cache_prefix), ref=ref)
+    return xgb.QuantileDMatrix(ShardIter(paths), ref=ref)
+
+def parameter_grid(search_space, max_trials=None, seed=42):
+    """All combinations of the search space, randomly subsampled to max_trials"""
+    keys = sorted(search_space)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(search_space[k] for k in keys))]
+    if max_trials and max_trials < len(combos):
+        rng = np.random.default_rng(seed)
+        combos = [combos[i] for i in rng.choice(len(combos), max_trials, replace=False)]
+    return combos
+
+# Per-process training data, built once by each worker
+_worker_data = {}
+
+def _init_worker(train_paths, valid_paths, external_memory, cache_dir):
+    dtrain = build_dmatrix(train_paths, external_memory, cache_dir)
+    dvalid = build_dmatrix(valid_paths, external_memory, cache_dir, ref=dtrain)
+    _worker_data['train'] = dtrain
+    _worker_data['valid'] = dvalid
+
+def _run_trial(trial):
+    """Train one parameter set with early stopping on the validation shards"""
+    params = dict(BASE_PARAMS, **trial['params'], nthread=trial['nthread'])
+    start = time.perf_counter()
+    booster = xgb.train(
+        params,
+        _worker_data['train'],
+        num_boost_round=trial['num_boost_round'],
+        evals=[(_worker_data['valid'], "valid")],
+        early_stopping_rounds=trial['early_stopping_rounds'],
+        verbose_eval=False
+    )
+    return {
+        'params': trial['params'],
+        'best_iteration': booster.best_iteration,
+        'valid_mlogloss': float(booster.best_score),
+        'train_seconds': time.perf_counter() - start,
+        'booster': bytes(booster.save_raw("json"))
+    }
+
+def _peak_memory_mb():
+    """Peak RSS of this process and of finished worker processes (Linux reports KB)"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+def make_version_dir(models_dir=MODELS_DIR):
+    """Create a new, empty version directory named by timestamp
+
+    Runs finishing in the same second get "-2", "-3", ... suffixes instead of
+    overwriting each other's artifacts.
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    version, n = stamp, 1
+    while True:
+        try:
+            os.mkdir(os.path.join(models_dir, version))
+            return version, os.path.join(models_dir, version)
+        except FileExistsError:
+            n += 1
+            version = f"{stamp}-{n}"
+
+def save_artifacts(booster, metrics, models_dir=MODELS_DIR, promote_to=None):
+    """Write a versioned model directory (booster JSON, sklearn pickle, metrics)"""
+    version, version_dir = make_version_dir(models_dir)
+
+    booster.set_attr(label_offset=str(LABEL_OFFSET))
+    booster_path = os.path.join(version_dir, "model.json")
+    booster.save_model(booster_path)
+
+    # Same format as trained_model_xgb.pkl so the predictors can load it
+    classifier = xgb.XGBClassifier()
+    classifier.load_model(booster_path)
+    pickle_path = os.path.join(version_dir, "trained_model_xgb.pkl")
+    joblib.dump(classifier, pickle_path)
+
+    metrics['version'] = version
+    with open(os.path.join(version_dir, "metrics.json"), "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+
+    if promote_to:
+        shutil.copyfile(pickle_path, promote_to)
+        print(f"Promoted model {version} to {promote_to}")
+
+    return version_dir
+
+def train(train_patterns, valid_patterns, search_space=None, max_trials=None, workers=None,
+          num_boost_round=500, early_stopping_rounds=20, external_memory=False,
+          cache_dir=None, models_dir=MODELS_DIR, promote_to=None):
+    """Parallel hyperparameter search over streamed shards, saving the best model"""
+    train_paths = expand_shards(train_patterns)
+    valid_paths = expand_shards(valid_patterns)
+    trials = parameter_grid(search_space or DEFAULT_SEARCH_SPACE, max_trials)
+
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, len(trials)))
+    nthread = max(1, cores // workers)
+
+    print(f"Training on {len(train_paths)} shard(s), validating on {len(valid_paths)}")
+    print(f"{len(trials)} trials across {workers} worker(s) x {nthread} thread(s)"
+          f"{' with external memory' if external_memory else ''}")
+
+    start = time.perf_counter()
+    jobs = [{
+        'params': params,
+        'nthread': nthread,
+        'num_boost_round': num_boost_round,
+        'early_stopping_rounds': early_stopping_rounds
+    } for params in trials]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(train_paths, valid_paths, external_memory, cache_dir)) as pool:
+        for i, result in enumerate(pool.map(_run_trial, jobs), 1):
+            print(f"  Trial {i}/{len(jobs)}: mlogloss={result['valid_mlogloss']:.4f} "
+                  f"iter={result['best_iteration']} {result['params']}")
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    best = min(results, key=lambda r: r['valid_mlogloss'])
+    booster = xgb.Booster()
+    booster.load_model(bytearray(best['booster']))
+    # Keep only the rounds up to the best iteration: the rounds early stopping ran past it
+    # only overfit, and the exported artifacts would otherwise use them
+    booster = booster[:best['best_iteration'] + 1]
+
+    own_mb, workers_mb = _peak_memory_mb()
+    metrics = {
+        'train_shards': train_paths,
+        'valid_shards': valid_paths,
+        'best_params': best['params'],
+        'best_iteration': best['best_iteration'],
+        'saved_rounds': booster.num_boosted_rounds(),
+        'valid_mlogloss': best['valid_mlogloss'],
+        'label_offset': LABEL_OFFSET,
+        'external_memory': external_memory,
+        'workers': workers,
+        'threads_per_worker': nthread,
+        'search_seconds': elapsed,
+        'peak_memory_mb': own_mb,
+        'peak_worker_memory_mb': workers_mb,
+        'trials': [{k: v for k, v in r.items() if k != 'booster'} for r in results]
+    }
+
+    version_dir = save_artifacts(booster, metrics, models_dir, promote_to)
+    print(f"\n✅ Best mlogloss {best['valid_mlogloss']:.4f} with {best['params']}")
+    print(f"Search took {elapsed:.1f}s, peak memory {own_mb:.0f} MB (workers {workers_mb:.0f} MB)")
+    print(f"Artifacts saved to {version_dir}")
+    return version_dir, metrics
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the repayment model on CSV/Parquet shards")
+    parser.add_argument("--train", nargs="+", default=["borrowers_train.csv"], help="Training shard globs")
+    parser.add_argument("--valid", nargs="+", default=["borrowers_test.csv"], help="Validation shard globs")
+    parser.add_argument("--max-trials", type=int, default=None, help="Randomly sample this many parameter sets")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel trials (default: all cores)")
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--early-stopping", type=int, default=20)
+    parser.add_argument("--external-memory", action="store_true", help="Cache quantized pages on disk")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--promote", action="store_true", help="Copy the best model to trained_model_xgb.pkl")
+    args = parser.parse_args()
+
+    train(args.train, args.valid, max_trials=args.max_trials, workers=args.workers,
+          num_boost_round=args.rounds, early_stopping_rounds=args.early_stopping,
+          external_memory=args.external_memory, cache_dir=args.cache_dir,
+          promote_to="trained_model_xgb.pkl" if args.promote else None)
+
+if __name__ == "__main__":
+    main()
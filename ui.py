@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 import os
-from main_serp import generate_queries  # Import your function
+from ui_cache import cached_queries, load_uploaded_csv, cache_controls
+from result_browser import render_result_browser
 
 # Mapping keys to query list positions
 QUERY_KEYS = [
@@ -30,7 +31,7 @@ def perform_web_search(borrower_info, selected_keys, years_ahead):
     industry = borrower_info["industry"]
 
     # Get all queries
-    all_queries = generate_queries(job_title, company, industry, years_ahead)
+    all_queries = cached_queries(job_title, company, industry, years_ahead)
 
     # Filter queries by user-selected keys
     selected_queries = [all_queries[KEY_TO_INDEX[key]] for key in selected_keys]
@@ -47,6 +48,8 @@ input_mode = st.sidebar.radio("Choose Input Mode:", ("Manual Form", "Upload CSV
 
 years_ahead = st.sidebar.number_input("Years Ahead to Analyze", min_value=1, max_value=50, value=5)
 
+cache_controls()
+
 if input_mode == "Manual Form":
     st.subheader("Borrower Information (Compact Form)")
 
@@ -121,10 +124,10 @@ else:
     csv_file = st.file_uploader("Upload CSV", type=["csv"])
 
     if csv_file is not None:
-        df = pd.read_csv(csv_file)
+        df = load_uploaded_csv(csv_file)
 
         st.write("CSV Preview:")
-        st.dataframe(df)
+        render_result_browser(df, key="upload")
 
         st.subheader("Select Query Attributes")
 
@@ -134,7 +137,9 @@ else:
                 selected_keys.append(key)
 
         if st.button("Submit and Search for All Borrowers"):
-            for idx, row in df.iterrows():
+            progress = st.progress(0.0)
+            results = []
+            for idx, (_, row) in enumerate(df.iterrows()):
                 borrower_info = {
                     "borrower_id": str(row["borrower_id"]),
                     "borrower_name": row["borrower_name"],
@@ -151,6 +156,13 @@ else:
                 }
 
                 article_file = perform_web_search(borrower_info, selected_keys, years_ahead)
-                st.write(f"Processed Borrower ID {borrower_info['borrower_id']}: Articles saved to {article_file}")
+                results.append({"borrower_id": borrower_info["borrower_id"], "article_file": article_file})
+                progress.progress((idx + 1) / len(df), text=f"Processed Borrower ID {borrower_info['borrower_id']}")
 
+            # Kept in the session so paging through the results doesn't lose them
+            st.session_state["search_results"] = pd.DataFrame(results)
             st.success("Completed web search for all borrowers in CSV.")
+
+        if "search_results" in st.session_state:
+            st.subheader("Search Results")
+            render_result_browser(st.session_state["search_results"], key="search_results")
@@ -0,0 +1,79 @@
+import os
+import io
+import hashlib
+import pandas as pd
+import streamlit as st
+import borrower_io
+
+def file_hash(path):
+    """Content hash of a file on disk, used as a cache key"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def upload_hash(uploaded_file):
+    """Content hash of a Streamlit upload"""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def _read_csv_bytes(content_hash, _data):
+    # Keyed on the hash only; the underscore keeps Streamlit from hashing the bytes again
+    return borrower_io.coerce_dtypes(pd.read_csv(io.BytesIO(_data), dtype=borrower_io.CSV_DTYPES), categories=False)
+
+def load_uploaded_csv(uploaded_file):
+    """Parsed borrower table for an upload, parsed once per distinct file content"""
+    return _read_csv_bytes(upload_hash(uploaded_file), uploaded_file.getvalue())
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def _read_table(path, content_hash):
+    return borrower_io.read_table(path)
+
+def load_table(path):
+    """Borrower/result table from disk, re-read only when the file content changes"""
+    return _read_table(path, file_hash(path))
+
+@st.cache_data(show_spinner=False)
+def cached_queries(job_title, company, industry, years_ahead):
+    """generate_queries() output for one borrower profile"""
+    from main_serp import generate_queries
+    return generate_queries(job_title, company, industry, years_ahead)
+
+@st.cache_data(show_spinner="Searching...", ttl=24 * 3600, max_entries=500)
+def cached_search(job_title, company, industry, borrower_id, selected_keys, years_ahead):
+    """Saved article files for a borrower search; the same search within a day isn't repeated"""
+    from batch_process import search_borrower
+    borrower_info = {"borrower_id": borrower_id, "job_title": job_title, "company": company, "industry": industry}
+    return search_borrower(borrower_info, list(selected_keys), years_ahead)
+
+@st.cache_resource(show_spinner="Loading model...")
+def _model_server(model_path, model_mtime):
+    from model_server import get_model_server
+    return get_model_server(model_path)
+
+def get_cached_model_server(model_path):
+    """Shared model server, reloaded when the model file changes"""
+    return _model_server(model_path, os.path.getmtime(model_path))
+
+@st.cache_data(show_spinner="Predicting...", max_entries=20)
+def _predictions(csv_path, model_path, content_hash, model_mtime):
+    from predict_likelihood import load_borrowers
+    return _model_server(model_path, model_mtime).predict(load_borrowers(csv_path))
+
+def cached_predictions(csv_path, model_path):
+    """(labels, probabilities) for a borrower file, recomputed only when the file or model changes"""
+    return _predictions(csv_path, model_path, file_hash(csv_path), os.path.getmtime(model_path))
+
+def cache_controls():
+    """Sidebar buttons to drop cached data (CSVs, predictions, searches) or cached resources (model)"""
+    st.sidebar.subheader("Cache")
+    if st.sidebar.button("Clear cached data"):
+        st.cache_data.clear()
+        st.sidebar.success("Cached data cleared.")
+    if st.sidebar.button("Reload model"):
+        import model_server
+        model_server.close()
+        st.cache_resource.clear()
+        _predictions.clear()
+        st.sidebar.success("Model will be reloaded.")
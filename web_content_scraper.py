@@ -3,13 +3,10 @@ import re
 import time
 import json
 from urllib.parse import urlparse, urljoin
-from playwright.sync_api import sync_playwright
-import google.generativeai as genai
-from keys import GEMINI_KEY
-
-# Configure Gemini
-genai.configure(api_key=GEMINI_KEY)
-model = genai.GenerativeModel("gemini-2.0-flash-exp")
+import llm_router
+import tracing
+import cassette
+import document_extractor
 
 def extract_urls_from_article_files(articles_dir="clean_articles"):
     """Extract all URLs from article files"""
@@ -61,8 +58,15 @@ def extract_urls_from_article_files(articles_dir="clean_articles"):
     print(f"Extracted {len(urls_data)} URLs from article files")
     return urls_data
 
-def scrape_web_content(url, max_retries=3):
-    """Scrape full content from a webpage"""
+@tracing.traced("scrape.url")
+def scrape_web_content(url, max_retries=3, query=None):
+    """Scrape full content from a webpage; PDFs and other documents skip the browser"""
+    tracing.current_span().set("url", url)
+    document = document_extractor.extract_document(url, query)
+    if document is not None:
+        return document
+
+    from playwright.sync_api import sync_playwright
     
     for attempt in range(max_retries):
         try:
@@ -80,8 +84,7 @@ def scrape_web_content(url, max_retries=3):
                 })
                 
                 # Navigate to page
-                page.goto(url, wait_until="networkidle", timeout=30000)
-                page.wait_for_timeout(2000)
+                cassette.goto(page, url, wait_ms=2000, wait_until="networkidle", timeout=30000)
                 
                 # Get page title
                 title = page.title()
@@ -154,6 +157,8 @@ def scrape_web_content(url, max_retries=3):
                 
                 if len(content) < 100:
                     print(f"  Warning: Very short content ({len(content)} chars) for {url}")
+                tracing.current_span().set("bytes", len(content))
+                tracing.current_span().set("attempts", attempt + 1)
                 
                 return {
                     'url': url,
@@ -166,9 +171,10 @@ def scrape_web_content(url, max_retries=3):
         except Exception as e:
             print(f"  Attempt {attempt + 1} failed for {url}: {e}")
             if attempt < max_retries - 1:
-                time.sleep(2)  # Wait before retry
+                cassette.sleep(2)  # Wait before retry
             continue
     
+    tracing.current_span().set("status", "failed")
     return {
         'url': url,
         'title': '',
@@ -205,7 +211,7 @@ Please provide a clean, well-organized summary:
 """
     
     try:
-        response = model.generate_content(prompt)
+        response = llm_router.generate_content("page_cleaning", prompt)
         return response.text.strip()
     except Exception as e:
         print(f"  Error summarizing content with Gemini: {e}")
@@ -286,7 +292,7 @@ def scrape_all_urls(articles_dir="clean_articles", output_dir="web_content", use
         print(f"\n[{i}/{len(unique_urls)}] Scraping: {url}")
         
         # Scrape content
-        web_content = scrape_web_content(url)
+        web_content = scrape_web_content(url, query=url_data['search_query'])
         
         if web_content['status'] == 'success':
             # Optionally clean and summarize with Gemini
@@ -312,7 +318,7 @@ def scrape_all_urls(articles_dir="clean_articles", output_dir="web_content", use
             failed += 1
         
         # Be polite to servers
-        time.sleep(2)
+        cassette.sleep(2)
     
     print(f"\n" + "=" * 80)
     print(f"SCRAPING COMPLETED")
@@ -321,6 +327,8 @@ def scrape_all_urls(articles_dir="clean_articles", output_dir="web_content", use
     print(f"Total: {successful + failed}")
     print(f"Output directory: {output_dir}")
     print("=" * 80)
+    llm_router.print_usage_report()
+    tracing.flush()
 
 def main():
     """Main function with options"""